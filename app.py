@@ -9,13 +9,15 @@ from dotenv import load_dotenv
 import os
 import logging
 
+# Load environment variables before the backend modules read them at import time
+load_dotenv()
+
 # Import blueprints
 from backend.api.routes import api_bp
 from backend.auth.routes import auth_bp
 from backend.ai.routes import ai_bp
-
-# Load environment variables
-load_dotenv()
+from backend.metrics import init_metrics
+from backend.lazy import warm_up_from_env
 
 # Configure logging
 logging.basicConfig(
@@ -48,6 +50,12 @@ app.register_blueprint(api_bp, url_prefix='/api')
 app.register_blueprint(auth_bp, url_prefix='/auth')
 app.register_blueprint(ai_bp, url_prefix='/ai')
 
+# Request metrics and the /metrics scrape endpoint
+init_metrics(app)
+
+# Heavy dependencies load on first use; LAZY_WARMUP preloads them in the background
+warm_up_from_env()
+
 # Main routes
 @app.route('/')
 def index():
@@ -89,9 +97,19 @@ def get_user_analytics(user_id):
 @app.route('/api/analytics/leaderboard')
 def get_leaderboard():
     """Get global leaderboard"""
-    from backend.analytics import analytics_tracker
-    leaderboard = analytics_tracker.get_leaderboard(limit=10)
-    return jsonify({'leaderboard': leaderboard})
+    from backend.analytics import analytics_tracker, LEADERBOARD_WINDOWS
+    
+    window = request.args.get('window', 'all')
+    if window not in LEADERBOARD_WINDOWS:
+        return jsonify({'error': f"window must be one of: {', '.join(LEADERBOARD_WINDOWS)}"}), 400
+    try:
+        limit = min(max(int(request.args.get('limit', 10)), 1), 100)
+        offset = max(int(request.args.get('offset', 0)), 0)
+    except ValueError:
+        return jsonify({'error': 'limit and offset must be integers'}), 400
+    
+    leaderboard = analytics_tracker.get_leaderboard(limit=limit, offset=offset, window=window)
+    return jsonify({'leaderboard': leaderboard, 'window': window, 'limit': limit, 'offset': offset})
 
 # Error handlers
 @app.errorhandler(404)
@@ -0,0 +1,14 @@
+from a2wsgi import WSGIMiddleware
+from app import app
+import os
+
+# ASGI entry point: uvicorn asgi:asgi_app
+# Flask views are synchronous: each in-flight request holds one of these threads while
+# it waits on the shared AI event loop, so ASGI_THREADS is the per-worker limit on
+# concurrent requests. It defaults to AI_MAX_CONCURRENCY, the offload pool that
+# blocking model calls queue on, so neither pool is left idle waiting on the other.
+asgi_app = WSGIMiddleware(app, workers=int(os.getenv('ASGI_THREADS', os.getenv('AI_MAX_CONCURRENCY', 64))))
+
+if __name__ == "__main__":
+    import uvicorn
+    uvicorn.run(asgi_app, host=os.getenv('HOST', '0.0.0.0'), port=int(os.getenv('PORT', 5000)))
@@ -0,0 +1,135 @@
+"""
+ContextGuard Backend - Batch Execution
+Run many AI jobs from one request with deduplication and a concurrency cap
+"""
+
+import asyncio
+import logging
+from typing import AsyncIterator, Callable, Dict, List, Tuple
+
+from backend.ai.cache import cache_options, make_cache_key
+
+logger = logging.getLogger(__name__)
+
+MAX_TEXT_LENGTH = 50000
+
+
+def _budget(options: Dict, base: Dict = None) -> Dict:
+    """Carry an optional latencyBudgetMs job option through to the processor"""
+    if options.get('latencyBudgetMs'):
+        return {**(base or {}), 'latencyBudgetMs': float(options['latencyBudgetMs'])}
+    return base
+
+
+def _action_table(processor) -> Dict[str, Callable]:
+    """Map batch action names to processor calls taking (text, options)"""
+    return {
+        'summarize': lambda text, o: processor.summarize(text, _budget(o, {
+            'type': o.get('type', 'key-points'),
+            'length': o.get('length', 'medium'),
+            'algorithm': o.get('algorithm', 'tfidf')
+        })),
+        'rewrite': lambda text, o: processor.rewrite(text, _budget(o, {
+            'tone': o.get('tone', 'neutral'),
+            'readingLevel': o.get('readingLevel', 'intermediate')
+        })),
+        'proofread': lambda text, o: processor.proofread(text, _budget(o)),
+        'translate': lambda text, o: processor.translate(text, o.get('targetLanguage', 'es'), _budget(o)),
+        'generate-alt-text': lambda text, o: processor.generate_alt_text(text, o.get('currentAlt', ''), _budget(o)),
+        'eli5': lambda text, o: processor.eli5(text, _budget(o)),
+        'side-by-side-translate': lambda text, o: processor.side_by_side_translate(
+            text, o.get('targetLanguage', 'es')
+        ),
+        'generate-quiz': lambda text, o: processor.generate_quiz(text, _budget(o, {
+            'num_questions': o.get('num_questions', 5)
+        }))
+    }
+
+
+class BatchExecutor:
+    """Deduplicate identical jobs and run the rest concurrently"""
+
+    def __init__(self, processor, concurrency: int = 8):
+        self.processor = processor
+        self.concurrency = concurrency
+        self.actions = _action_table(processor)
+
+    def validate(self, job) -> str:
+        """Return an error message for an invalid job, or an empty string"""
+        if not isinstance(job, dict):
+            return 'Job must be an object'
+        if job.get('action') not in self.actions:
+            return f"Unsupported action: {job.get('action')}"
+
+        text = job.get('text', '')
+        if not isinstance(text, str):
+            return 'Text must be a string'
+        if job['action'] != 'generate-alt-text' and not text.strip():
+            return 'Text is required'
+        if len(text) > MAX_TEXT_LENGTH:
+            return 'Text too long (maximum 50,000 characters)'
+        if not isinstance(job.get('options') or {}, dict):
+            return 'Options must be an object'
+        return ''
+
+    def plan(self, jobs: List) -> Tuple[Dict[str, Tuple[Dict, List[int]]], Dict[int, Dict]]:
+        """
+        Group jobs by content key.
+        Returns unique jobs with the indexes they answer, and per-index errors.
+        """
+        unique = {}
+        errors = {}
+
+        for index, job in enumerate(jobs):
+            error = self.validate(job)
+            if error:
+                errors[index] = {'success': False, 'error': error}
+                continue
+
+            key = make_cache_key(job['action'], job.get('text', '').strip(), cache_options(job.get('options')))
+            if key in unique:
+                unique[key][1].append(index)
+            else:
+                unique[key] = (job, [index])
+
+        return unique, errors
+
+    async def _execute(self, job: Dict, indexes: List[int],
+                       semaphore: asyncio.Semaphore) -> Tuple[List[int], Dict]:
+        async with semaphore:
+            try:
+                call = self.actions[job['action']]
+                result = await call(job.get('text', '').strip(), job.get('options') or {})
+            except Exception as e:
+                logger.error(f"Batch job {job['action']} error: {e}")
+                result = {'success': False, 'error': str(e)}
+        return indexes, result
+
+    async def run(self, jobs: List, concurrency: int = None) -> List[Dict]:
+        """Run all jobs and return results in request order"""
+        results = [None] * len(jobs)
+        async for index, result in self.stream(jobs, concurrency):
+            results[index] = result
+        return results
+
+    async def stream(self, jobs: List, concurrency: int = None) -> AsyncIterator[Tuple[int, Dict]]:
+        """Yield (index, result) pairs as each job completes"""
+        unique, errors = self.plan(jobs)
+
+        for index, error in errors.items():
+            yield index, error
+
+        semaphore = asyncio.Semaphore(min(concurrency or self.concurrency, self.concurrency))
+        tasks = [
+            asyncio.ensure_future(self._execute(job, indexes, semaphore))
+            for job, indexes in unique.values()
+        ]
+
+        try:
+            for finished in asyncio.as_completed(tasks):
+                indexes, result = await finished
+                for index in indexes:
+                    yield index, result
+        finally:
+            for task in tasks:
+                task.cancel()
@@ -0,0 +1,323 @@
+"""
+ContextGuard Backend - AI Result Cache
+Content-addressed cache in front of AIProcessor actions
+"""
+
+import os
+import json
+import time
+import sqlite3
+import inspect
+import hashlib
+import logging
+import functools
+import threading
+import unicodedata
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+
+def normalize_text(text: str) -> str:
+    """Normalize text so trivially different selections share a cache entry"""
+    if not isinstance(text, str):
+        return text
+    text = unicodedata.normalize('NFC', text)
+    return text.replace('\r\n', '\n').replace('\r', '\n').strip()
+
+
+# Options that only steer backend selection; they never change a cached answer
+ROUTING_OPTIONS = frozenset({'latencyBudgetMs'})
+
+
+def cache_options(options: Optional[Dict]) -> Optional[Dict]:
+    """Options without routing hints, so requests differing only in those share a key"""
+    options = {k: v for k, v in (options or {}).items() if k not in ROUTING_OPTIONS}
+    return options or None
+
+
+def make_cache_key(action: str, text: str, options: Dict = None) -> str:
+    """Hash of action + normalized text + options"""
+    options = {k: v for k, v in (options or {}).items() if v is not None}
+    payload = json.dumps({
+        'action': action,
+        'text': normalize_text(text),
+        'options': options
+    }, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+def _entry_size(value: Any) -> int:
+    """Approximate size of a cached value in bytes"""
+    if isinstance(value, (bytes, bytearray)):
+        return len(value)
+    return len(json.dumps(value, ensure_ascii=False, default=str).encode('utf-8'))
+
+
+class LRUCache:
+    """In-process LRU cache bounded by entry count, byte size and TTL"""
+
+    def __init__(self, max_entries: int = 1024, max_bytes: int = 32 * 1024 * 1024,
+                 ttl: float = 3600):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self._data = OrderedDict()  # key -> (value, expires_at, size)
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def get(self, key: str) -> Optional[Any]:
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+
+            value, expires_at, size = entry
+            if expires_at and expires_at < time.monotonic():
+                del self._data[key]
+                self._bytes -= size
+                self.expirations += 1
+                self.misses += 1
+                return None
+
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key: str, value: Any, ttl: float = None):
+        size = _entry_size(value)
+        if size > self.max_bytes:
+            return
+
+        ttl = self.ttl if ttl is None else ttl
+        expires_at = time.monotonic() + ttl if ttl else 0
+
+        with self._lock:
+            old = self._data.pop(key, None)
+            if old is not None:
+                self._bytes -= old[2]
+
+            self._data[key] = (value, expires_at, size)
+            self._bytes += size
+
+            while self._data and (len(self._data) > self.max_entries or self._bytes > self.max_bytes):
+                _, (_, _, evicted_size) = self._data.popitem(last=False)
+                self._bytes -= evicted_size
+                self.evictions += 1
+
+    def delete(self, key: str):
+        with self._lock:
+            entry = self._data.pop(key, None)
+            if entry is not None:
+                self._bytes -= entry[2]
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self._bytes = 0
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {
+                'entries': len(self._data),
+                'bytes': self._bytes,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'expirations': self.expirations
+            }
+
+
+class SQLiteCache:
+    """On-disk cache tier, shared by every worker process on the host"""
+
+    def __init__(self, path: str, ttl: float = 3600, table: str = 'ai_cache'):
+        self.path = path
+        self.ttl = ttl
+        self.table = table
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=5)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute(
+            f'CREATE TABLE IF NOT EXISTS {table} ('
+            'key TEXT PRIMARY KEY, value TEXT NOT NULL, expires_at REAL NOT NULL)'
+        )
+        self._conn.commit()
+        self._writes = 0
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: str) -> Optional[Any]:
+        with self._lock:
+            row = self._conn.execute(
+                f'SELECT value, expires_at FROM {self.table} WHERE key = ?', (key,)
+            ).fetchone()
+
+            if row is None or (row[1] and row[1] < time.time()):
+                self.misses += 1
+                return None
+
+            self.hits += 1
+            return json.loads(row[0])
+
+    def set(self, key: str, value: Any, ttl: float = None):
+        ttl = self.ttl if ttl is None else ttl
+        expires_at = time.time() + ttl if ttl else 0
+
+        with self._lock:
+            self._conn.execute(
+                f'INSERT OR REPLACE INTO {self.table} (key, value, expires_at) VALUES (?, ?, ?)',
+                (key, json.dumps(value, ensure_ascii=False, default=str), expires_at)
+            )
+            self._writes += 1
+
+            # Purge expired rows every so often instead of on every write
+            if self._writes % 500 == 0:
+                self._conn.execute(
+                    f'DELETE FROM {self.table} WHERE expires_at > 0 AND expires_at < ?', (time.time(),)
+                )
+            self._conn.commit()
+
+    def delete(self, key: str):
+        with self._lock:
+            self._conn.execute(f'DELETE FROM {self.table} WHERE key = ?', (key,))
+            self._conn.commit()
+
+    def clear(self):
+        with self._lock:
+            self._conn.execute(f'DELETE FROM {self.table}')
+            self._conn.commit()
+
+    def stats(self) -> Dict:
+        with self._lock:
+            entries = self._conn.execute(f'SELECT COUNT(*) FROM {self.table}').fetchone()[0]
+        return {
+            'entries': entries,
+            'hits': self.hits,
+            'misses': self.misses
+        }
+
+
+class ResultCache:
+    """Two-tier cache: in-process LRU backed by an optional SQLite tier"""
+
+    def __init__(self, memory: LRUCache, disk: Optional[SQLiteCache] = None, enabled: bool = True):
+        self.memory = memory
+        self.disk = disk
+        self.enabled = enabled
+
+    def get(self, key: str) -> Optional[Any]:
+        if not self.enabled:
+            return None
+
+        value = self.memory.get(key)
+        if value is not None or self.disk is None:
+            return value
+
+        try:
+            value = self.disk.get(key)
+        except sqlite3.Error as e:
+            logger.warning(f"Disk cache read failed: {e}")
+            return None
+
+        if value is not None:
+            self.memory.set(key, value)
+        return value
+
+    def set(self, key: str, value: Any):
+        if not self.enabled:
+            return
+
+        self.memory.set(key, value)
+        if self.disk is not None:
+            try:
+                self.disk.set(key, value)
+            except sqlite3.Error as e:
+                logger.warning(f"Disk cache write failed: {e}")
+
+    def delete(self, key: str):
+        self.memory.delete(key)
+        if self.disk is not None:
+            self.disk.delete(key)
+
+    def clear(self):
+        self.memory.clear()
+        if self.disk is not None:
+            self.disk.clear()
+
+    def stats(self) -> Dict:
+        stats = {'enabled': self.enabled, 'memory': self.memory.stats()}
+        if self.disk is not None:
+            try:
+                stats['disk'] = self.disk.stats()
+            except sqlite3.Error as e:
+                stats['disk'] = {'error': str(e)}
+
+        lookups = stats['memory']['hits'] + stats['memory']['misses']
+        stats['hit_rate'] = round(stats['memory']['hits'] / lookups, 4) if lookups else 0.0
+        return stats
+
+    @classmethod
+    def from_env(cls) -> 'ResultCache':
+        """Build the cache from AI_CACHE_* environment variables"""
+        enabled = os.getenv('AI_CACHE_ENABLED', 'true').lower() == 'true'
+        ttl = float(os.getenv('AI_CACHE_TTL', 3600))
+        memory = LRUCache(
+            max_entries=int(os.getenv('AI_CACHE_MAX_ENTRIES', 1024)),
+            max_bytes=int(os.getenv('AI_CACHE_MAX_BYTES', 32 * 1024 * 1024)),
+            ttl=ttl
+        )
+
+        disk = None
+        db_path = os.getenv('AI_CACHE_DB_PATH')
+        if enabled and db_path:
+            try:
+                disk = SQLiteCache(db_path, ttl=ttl)
+                logger.info(f"AI result cache disk tier at {db_path}")
+            except sqlite3.Error as e:
+                logger.warning(f"Disk cache unavailable: {e}")
+
+        return cls(memory, disk, enabled=enabled)
+
+
+def cached_action(action: str):
+    """
+    Cache successful results of an async AIProcessor action and coalesce
+    concurrent misses for the same key.
+    The first argument is the text; the remaining bound arguments form the key.
+    """
+    def decorator(func):
+        signature = inspect.signature(func)
+
+        @functools.wraps(func)
+        async def wrapper(self, text, *args, **kwargs):
+            bound = signature.bind(self, text, *args, **kwargs)
+            bound.apply_defaults()
+            params = {name: cache_options(value) if name == 'options' else value
+                      for name, value in list(bound.arguments.items())[2:]}
+            key = make_cache_key(action, text, params)
+
+            cached = self.cache.get(key)
+            if cached is not None:
+                return dict(cached, cached=True)
+
+            async def compute():
+                result = await func(self, text, *args, **kwargs)
+                # Degraded fallbacks (remote backend configured but unused) are not cached
+                if isinstance(result, dict) and result.get('success') and not result.get('degraded'):
+                    self.cache.set(key, result)
+                return result
+
+            # Identical requests already in flight share that call instead of starting another
+            flights = getattr(self, 'flights', None)
+            if flights is None:
+                return await compute()
+            return await flights.do(key, compute)
+        return wrapper
+    return decorator
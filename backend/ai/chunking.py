@@ -0,0 +1,130 @@
+"""
+ContextGuard Backend - Document Chunking
+Sentence-aware splitting and bounded map-reduce for long inputs
+"""
+
+import re
+import asyncio
+from typing import Awaitable, Callable, List, NamedTuple
+
+# Sentence-sized pieces that concatenate back to the original text
+SENTENCE_CHUNK_RE = re.compile(r'.+?(?:[.!?]+(?:\s+|$)|$)', re.S)
+PARAGRAPH_BREAK_RE = re.compile(r'(\n\s*\n)')
+
+
+class Chunk(NamedTuple):
+    """A slice of the document; trailing is the whitespace that followed it"""
+    text: str
+    trailing: str
+
+
+def _hard_split(piece: str, max_chars: int) -> List[str]:
+    """Split an oversized sentence at whitespace, or mid-word as a last resort"""
+    parts = []
+    while len(piece) > max_chars:
+        cut = piece.rfind(' ', 0, max_chars)
+        if cut <= 0:
+            cut = max_chars
+        parts.append(piece[:cut + 1] if piece[cut:cut + 1] == ' ' else piece[:cut])
+        piece = piece[len(parts[-1]):]
+    if piece:
+        parts.append(piece)
+    return parts
+
+
+def _units(text: str, max_chars: int) -> List[str]:
+    """Paragraphs, falling back to sentences, each no longer than max_chars"""
+    pieces = PARAGRAPH_BREAK_RE.split(text)
+    # Re-attach each paragraph break to the paragraph before it
+    paragraphs = [pieces[i] + (pieces[i + 1] if i + 1 < len(pieces) else '')
+                  for i in range(0, len(pieces), 2)]
+
+    units = []
+    for paragraph in paragraphs:
+        if len(paragraph) <= max_chars:
+            units.append(paragraph)
+            continue
+        for sentence in SENTENCE_CHUNK_RE.findall(paragraph):
+            units.extend(_hard_split(sentence, max_chars))
+    return [unit for unit in units if unit]
+
+
+def _overlap(units: List[str], count: int, max_chars: int) -> List[str]:
+    """Up to `count` trailing units, as long as they stay within max_chars"""
+    carried = []
+    size = 0
+    for unit in reversed(units[-count:] if count else []):
+        if size + len(unit) > max_chars:
+            break
+        carried.insert(0, unit)
+        size += len(unit)
+    return carried
+
+
+def split_into_chunks(text: str, max_chars: int = 5000, overlap: int = 0) -> List[Chunk]:
+    """
+    Pack paragraphs/sentences greedily into chunks of at most max_chars.
+    Without overlap, ''.join(c.text + c.trailing) reproduces the input.
+    overlap repeats that many trailing units of the previous chunk as context.
+    """
+    if len(text) <= max_chars:
+        body = text.rstrip()
+        return [Chunk(body, text[len(body):])]
+
+    groups = []
+    current = []
+    size = 0
+    for unit in _units(text, max_chars):
+        if current and size + len(unit) > max_chars:
+            groups.append(current)
+            current = _overlap(current, overlap, max_chars // 4)
+            size = sum(len(u) for u in current)
+        current.append(unit)
+        size += len(unit)
+    if current:
+        groups.append(current)
+
+    chunks = []
+    for group in groups:
+        joined = ''.join(group)
+        body = joined.rstrip()
+        chunks.append(Chunk(body, joined[len(body):]))
+    return chunks
+
+
+def split_segments(text: str, max_chars: int = 1000) -> List[Chunk]:
+    """
+    Lines of text, with lines longer than max_chars packed into sentence groups.
+    Blank lines and surrounding whitespace go into the trailing separators, so
+    ''.join(s.text + s.trailing) reproduces the input minus leading whitespace.
+    """
+    segments = []
+    for line in re.findall(r'[^\n]*\n*', text.lstrip()):
+        body = line.strip()
+        if not body:
+            if segments:
+                segments[-1] = Chunk(segments[-1].text, segments[-1].trailing + line)
+            continue
+        start = line.index(body)
+        if segments:
+            segments[-1] = Chunk(segments[-1].text, segments[-1].trailing + line[:start])
+        pieces = split_into_chunks(body, max_chars)
+        pieces[-1] = Chunk(pieces[-1].text, pieces[-1].trailing + line[start + len(body):])
+        segments.extend(pieces)
+    return segments
+
+
+def join_chunks(chunks: List[Chunk], outputs: List[str]) -> str:
+    """Stitch per-chunk outputs back together with the original separators"""
+    return ''.join(output.strip() + chunk.trailing for chunk, output in zip(chunks, outputs)).strip()
+
+
+async def map_chunks(items: List, func: Callable[..., Awaitable], concurrency: int = 4) -> List:
+    """Apply an async function to every item with at most `concurrency` in flight, keeping order"""
+    semaphore = asyncio.Semaphore(max(1, concurrency))
+
+    async def run(item):
+        async with semaphore:
+            return await func(item)
+
+    return await asyncio.gather(*(run(item) for item in items))
@@ -0,0 +1,196 @@
+"""
+ContextGuard Backend - Incremental Proofreading
+Per-document paragraph state so repeated proofread calls only re-check what changed
+"""
+
+import re
+import difflib
+import hashlib
+import logging
+import threading
+from typing import Dict, List, Optional
+
+from backend.ai.cache import LRUCache
+from backend.ai.chunking import map_chunks
+
+logger = logging.getLogger(__name__)
+
+PARAGRAPH_RE = re.compile(r'[^\n]+')
+TOKEN_RE = re.compile(r'\w+|\s+|[^\w\s]')
+
+
+class StaleDocument(Exception):
+    """The server has no state for this document version; the client should resend the full text"""
+
+
+def apply_edits(text: str, edits: List, max_chars: int = None) -> str:
+    """
+    Apply edits in order; each is {'start', 'end', 'text'} and replaces text[start:end]
+    of the document as left by the previous edit. Raises ValueError on a malformed edit
+    or when the document grows beyond max_chars.
+    """
+    if not isinstance(edits, list):
+        raise ValueError('Edits must be a list')
+    for index, edit in enumerate(edits):
+        if not isinstance(edit, dict):
+            raise ValueError(f'Edit {index} must be an object')
+        start, end, replacement = edit.get('start'), edit.get('end', edit.get('start')), edit.get('text', '')
+        if not (isinstance(start, int) and isinstance(end, int) and isinstance(replacement, str)):
+            raise ValueError(f'Edit {index} needs integer start/end and string text')
+        if not 0 <= start <= end <= len(text):
+            raise ValueError(f'Edit {index} is out of range')
+        if max_chars is not None and len(text) - (end - start) + len(replacement) > max_chars:
+            raise ValueError(f'Text too long (maximum {max_chars:,} characters)')
+        text = text[:start] + replacement + text[end:]
+    return text
+
+
+def paragraphs(text: str) -> List[tuple]:
+    """(offset, text) of each non-blank line, without surrounding whitespace"""
+    found = []
+    for match in PARAGRAPH_RE.finditer(text):
+        body = match.group().strip()
+        if body:
+            found.append((match.start() + match.group().index(body), body))
+    return found
+
+
+def correction_spans(original: str, corrected: str) -> List[Dict]:
+    """Word-level differences as {'start', 'end', 'original', 'replacement'} over original"""
+    source = [m for m in TOKEN_RE.finditer(original)]
+    target = TOKEN_RE.findall(corrected)
+    matcher = difflib.SequenceMatcher(None, [m.group() for m in source], target, autojunk=False)
+
+    spans = []
+    for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+        if tag == 'equal':
+            continue
+        start = source[i1].start() if i1 < len(source) else len(original)
+        end = source[i2 - 1].end() if i2 > i1 else start
+        spans.append({
+            'start': start,
+            'end': end,
+            'original': original[start:end],
+            'replacement': ''.join(target[j1:j2])
+        })
+    return spans
+
+
+def _digest(paragraph: str) -> str:
+    return hashlib.sha256(paragraph.encode('utf-8')).hexdigest()
+
+
+class IncrementalProofreader:
+    """
+    Proofread documents that are edited between calls.
+    For each (owner, document id) the server keeps the current text, a version number
+    and the correction spans of every paragraph by content hash; the owner comes from
+    the server-side session, so one client can never read or replace another's state. A call carries either the
+    full text or edits against the last version. Only paragraphs whose hash has no
+    stored spans go through proofread (itself cached by content), several at once.
+    """
+
+    def __init__(self, processor, max_documents: int = 1000, ttl: float = 3600, concurrency: int = 4,
+                 max_chars: int = 50000, max_edits: int = 200):
+        self.processor = processor
+        self.concurrency = concurrency
+        self.max_chars = max_chars
+        self.max_edits = max_edits
+        self.documents = LRUCache(max_entries=max_documents, max_bytes=64 * 1024 * 1024, ttl=ttl)
+        self._lock = threading.Lock()
+
+    def _update(self, key: tuple, text: Optional[str], edits: Optional[List],
+                version: Optional[int]) -> Dict:
+        """Apply a full text or edits to the stored document; returns the new state"""
+        if text is not None and len(text) > self.max_chars:
+            raise ValueError(f'Text too long (maximum {self.max_chars:,} characters)')
+        if text is None and isinstance(edits, list) and len(edits) > self.max_edits:
+            raise ValueError(f'Too many edits (maximum {self.max_edits}); resend the full text')
+
+        with self._lock:
+            state = self.documents.get(key)
+            if text is None:
+                if state is None or state['version'] != version:
+                    raise StaleDocument('Document state unavailable; resend the full text')
+                text = apply_edits(state['text'], edits, self.max_chars)
+            corrections = state['corrections'] if state else {}
+            state = {
+                'text': text,
+                'version': (state['version'] if state else 0) + 1,
+                'corrections': corrections
+            }
+            self.documents.set(key, state)
+            return state
+
+    def _store(self, key: tuple, version: int, fresh: Dict[str, List[Dict]], current: set):
+        with self._lock:
+            state = self.documents.get(key)
+            if state is None:
+                return
+            # Spans are keyed by paragraph content, so they stay valid for newer versions too
+            state['corrections'].update(fresh)
+            if state['version'] == version:
+                corrections = {digest: spans for digest, spans in state['corrections'].items()
+                               if digest in current}
+                self.documents.set(key, {**state, 'corrections': corrections})
+
+    async def proofread(self, owner: str, doc_id: str, text: str = None, edits: List = None,
+                        version: int = None, options: Dict = None) -> Dict:
+        """
+        Proofread a document given in full (text) or as edits against `version`.
+        Returns correction spans with offsets into the updated document.
+        Raises StaleDocument, or ValueError for malformed edits, more than max_edits
+        edits, or a document longer than max_chars.
+        """
+        key = (owner, doc_id)
+        state = self._update(key, text, edits, version)
+        found = paragraphs(state['text'])
+        digests = [_digest(body) for _, body in found]
+
+        pending = {}
+        for (_, body), digest in zip(found, digests):
+            if digest not in state['corrections']:
+                pending.setdefault(digest, body)
+
+        results = await map_chunks(list(pending.values()),
+                                   lambda body: self.processor.proofread(body, options),
+                                   self.concurrency)
+
+        fresh = {}
+        fallback = {}
+        failed = []
+        methods = set()
+        for (digest, body), result in zip(pending.items(), results):
+            spans = correction_spans(body, (result.get('result') or body).strip())
+            if result.get('success') and not result.get('degraded'):
+                fresh[digest] = spans
+            else:
+                # Reported, but not stored, so the paragraph is retried next time
+                fallback[digest] = spans
+                if not result.get('success'):
+                    failed.append(result)
+            if not result.get('cached'):
+                methods.add(result.get('method'))
+        self._store(key, state['version'], fresh, set(digests))
+
+        known = {**state['corrections'], **fresh, **fallback}
+        corrections = []
+        for index, ((offset, _), digest) in enumerate(zip(found, digests)):
+            for span in known[digest]:
+                corrections.append({**span, 'start': span['start'] + offset,
+                                    'end': span['end'] + offset, 'paragraph': index})
+
+        response = {
+            'success': not failed,
+            'doc_id': doc_id,
+            'version': state['version'],
+            'corrections': corrections,
+            'method': methods.pop() if len(methods) == 1 else ('cache' if not methods else 'mixed'),
+            'paragraphs': {'total': len(found), 'rechecked': len(pending)}
+        }
+        if failed:
+            response['error'] = failed[0].get('error') or f"{len(failed)} paragraph(s) not proofread"
+        return response
+
+    def stats(self) -> Dict:
+        return self.documents.stats()
@@ -0,0 +1,151 @@
+"""
+ContextGuard Backend - Language Identification
+Cached n-gram language detection in front of translation
+"""
+
+import os
+import hashlib
+import logging
+import unicodedata
+from collections import Counter
+from typing import Dict
+
+from backend.ai.cache import LRUCache, normalize_text
+from backend.lazy import lazy
+
+logger = logging.getLogger(__name__)
+
+LANGUAGE_NAMES = {
+    'en': 'English', 'es': 'Spanish', 'fr': 'French', 'de': 'German',
+    'it': 'Italian', 'pt': 'Portuguese', 'ja': 'Japanese', 'zh': 'Chinese',
+    'ko': 'Korean', 'ru': 'Russian', 'ar': 'Arabic', 'nl': 'Dutch',
+    'pl': 'Polish', 'tr': 'Turkish', 'sv': 'Swedish', 'hi': 'Hindi',
+    'el': 'Greek', 'he': 'Hebrew', 'th': 'Thai', 'uk': 'Ukrainian', 'vi': 'Vietnamese'
+}
+UNDETERMINED = 'und'
+
+# Scripts used by a single language, so even a word or two identifies it
+SCRIPT_LANGUAGES = (
+    ('HANGUL', 'ko'), ('HIRAGANA', 'ja'), ('KATAKANA', 'ja'),
+    ('THAI', 'th'), ('GREEK', 'el'), ('HEBREW', 'he')
+)
+
+
+def language_name(code: str) -> str:
+    return LANGUAGE_NAMES.get(base_language(code), code)
+
+
+def base_language(code: str) -> str:
+    """'zh-cn' / 'pt_BR' -> 'zh' / 'pt'"""
+    return (code or '').replace('_', '-').split('-')[0].lower()
+
+
+def _script_counts(text: str) -> Counter:
+    """Letters per script: single-language scripts by language code, plus 'han' and 'other'"""
+    counts = Counter()
+    for char in text:
+        if not char.isalpha():
+            continue
+        name = unicodedata.name(char, '')
+        for script, code in SCRIPT_LANGUAGES:
+            if name.startswith(script):
+                counts[code] += 1
+                break
+        else:
+            counts['han' if name.startswith('CJK UNIFIED') else 'other'] += 1
+    return counts
+
+
+def _load_detector():
+    """Load langdetect's language profiles once; seeded so results are reproducible"""
+    from langdetect import DetectorFactory, detector_factory
+    DetectorFactory.seed = 0
+    detector_factory.init_factory()
+    return detector_factory._factory
+
+
+# Profiles are parsed on the first detection (or LAZY_WARMUP=langdetect)
+detector = lazy('langdetect', _load_detector)
+
+
+class LanguageIdentifier:
+    """
+    Detect the language of a text, caching results by text hash.
+    Texts with fewer than min_letters letters are not run through the n-gram model,
+    whose guesses on a few words vary: they resolve to their script's language when
+    it has only one (Hangul, Kana, Thai, Greek, Hebrew), to Chinese when written in
+    Han characters, and to 'und' otherwise.
+    Only the first sample_chars characters are examined.
+    """
+
+    def __init__(self, cache: LRUCache, min_letters: int = 12, sample_chars: int = 1000,
+                 min_confidence: float = 0.8):
+        self.cache = cache
+        self.min_letters = min_letters
+        self.sample_chars = sample_chars
+        self.min_confidence = min_confidence
+
+    def detect(self, text: str) -> Dict:
+        """{'language': ISO 639-1 code or 'und', 'confidence', 'reliable'}"""
+        sample = normalize_text(text or '')[:self.sample_chars]
+        key = hashlib.sha256(sample.encode('utf-8')).hexdigest()
+        result = self.cache.get(key)
+        if result is None:
+            result = self._detect(sample)
+            self.cache.set(key, result)
+        return result
+
+    def _detect(self, sample: str) -> Dict:
+        counts = _script_counts(sample)
+        letters = sum(counts.values())
+        han = counts.pop('han', 0)
+        other = counts.pop('other', 0)
+
+        if letters < self.min_letters:
+            if counts:
+                return {'language': counts.most_common(1)[0][0], 'confidence': 1.0, 'reliable': True}
+            if han > other:
+                return {'language': 'zh', 'confidence': 1.0, 'reliable': True}
+            return {'language': UNDETERMINED, 'confidence': 0.0, 'reliable': False}
+
+        # Mostly Han with no Kana or Hangul is Chinese; the n-gram model often says Korean
+        if han * 2 > letters and not (counts['ja'] or counts['ko']):
+            return {'language': 'zh', 'confidence': 1.0, 'reliable': True}
+
+        factory = detector.get()
+        if factory is None:
+            return {'language': UNDETERMINED, 'confidence': 0.0, 'reliable': False}
+
+        try:
+            model = factory.create()
+            model.append(sample)
+            best = model.get_probabilities()[0]
+        except Exception as e:
+            # langdetect raises when the text has no usable features (digits, symbols, URLs)
+            logger.debug(f"Language detection failed: {e}")
+            return {'language': UNDETERMINED, 'confidence': 0.0, 'reliable': False}
+
+        return {
+            'language': base_language(best.lang),
+            'confidence': round(best.prob, 4),
+            'reliable': best.prob >= self.min_confidence
+        }
+
+    def stats(self) -> Dict:
+        return self.cache.stats()
+
+    @classmethod
+    def from_env(cls) -> 'LanguageIdentifier':
+        """Build the identifier from LANGID_* environment variables"""
+        return cls(
+            LRUCache(max_entries=int(os.getenv('LANGID_CACHE_MAX_ENTRIES', 10000)),
+                     max_bytes=int(os.getenv('LANGID_CACHE_MAX_BYTES', 4 * 1024 * 1024)),
+                     ttl=0),
+            min_letters=int(os.getenv('LANGID_MIN_LETTERS', 12)),
+            sample_chars=int(os.getenv('LANGID_SAMPLE_CHARS', 1000)),
+            min_confidence=float(os.getenv('LANGID_MIN_CONFIDENCE', 0.8))
+        )
+
+
+# Global instance
+language_identifier = LanguageIdentifier.from_env()
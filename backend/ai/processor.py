@@ -5,46 +5,39 @@ Handles all AI operations with multiple fallbacks
 
 import os
 import re
+import json
+import time
 import logging
-from typing import Dict, Optional
+from typing import AsyncIterator, Dict, Optional
+
+from backend.ai.cache import ResultCache, cache_options, cached_action, make_cache_key
+from backend.ai.runtime import runtime
+from backend.ai.summarizer import extractive_summarizer, split_sentences
+from backend.ai.rules import get_engine
+from backend.ai.resilience import ResilientClient, BackendUnavailable
+from backend.ai.router import Backend, BackendRouter
+from backend.ai.singleflight import SingleFlight
+from backend.ai.chunking import SENTENCE_CHUNK_RE, split_into_chunks, split_segments, join_chunks, map_chunks
+from backend.ai.langid import base_language, language_identifier, language_name
+from backend.metrics import instrumented
+from backend.lazy import lazy
 
 logger = logging.getLogger(__name__)
 
-# Try to import optional dependencies
-try:
-    from langdetect import detect
-    LANGDETECT_AVAILABLE = True
-except ImportError:
-    LANGDETECT_AVAILABLE = False
-    logger.warning("langdetect not available")
+# Long inputs are processed in chunks of this size, a few in parallel
+CHUNK_CHARS = int(os.getenv('AI_CHUNK_CHARS', 5000))
+CHUNK_CONCURRENCY = int(os.getenv('AI_CHUNK_CONCURRENCY', 4))
+QUIZ_CHUNK_CHARS = 3000
+# Side-by-side translation works per line (long lines split at sentences), many at once
+SEGMENT_CHARS = int(os.getenv('AI_SEGMENT_CHARS', 1000))
+SEGMENT_CONCURRENCY = int(os.getenv('AI_SEGMENT_CONCURRENCY', 8))
+ALT_TEXT_CONTEXT_CHARS = 500
 
-try:
-    import nltk
-    from nltk.tokenize import sent_tokenize
-    from nltk.corpus import stopwords
-    NLTK_AVAILABLE = True
-    
-    # Download NLTK data if not present (skip in serverless)
-    if not os.environ.get('VERCEL'):
-        try:
-            nltk.data.find('tokenizers/punkt')
-        except LookupError:
-            try:
-                nltk.download('punkt', quiet=True)
-            except:
-                pass
-        
-        try:
-            nltk.data.find('corpora/stopwords')
-        except LookupError:
-            try:
-                nltk.download('stopwords', quiet=True)
-            except:
-                pass
-except ImportError:
-    NLTK_AVAILABLE = False
-    logger.warning("NLTK not available")
+# Default per-request latency budget; unset means always prefer the best backend
+DEFAULT_LATENCY_BUDGET_MS = float(os.getenv('AI_LATENCY_BUDGET_MS', 0)) or None
 
+AI_ACTIONS = ('summarize', 'rewrite', 'proofread', 'translate', 'generate-alt-text',
+              'eli5', 'generate-quiz')
 
 class AIProcessor:
     """
@@ -52,59 +45,292 @@ class AIProcessor:
     Priority: Google Gemini > Local Models > Fallback Heuristics
     """
     
-    def __init__(self):
-        self.gemini_available = False
+    def __init__(self, model=None):
+        self.cache = ResultCache.from_env()
+        self.flights = SingleFlight()
+        self.client = ResilientClient.from_env()
         self.api_key = os.getenv('GOOGLE_API_KEY') or os.getenv('GEMINI_API_KEY')
         
-        if self.api_key:
+        # The Gemini SDK is imported on first use; configured until that fails
+        self.gemini = lazy('gemini', self._load_gemini)
+        self.gemini_available = bool(self.api_key)
+        if model is not None:
+            # Injected model (e.g. a local fake exposing generate_content)
+            self.gemini.set(model)
+            self.gemini_available = True
+        
+        self.router = BackendRouter(error_half_life=float(os.getenv('AI_ROUTER_ERROR_HALF_LIFE', 60)))
+        self.router.register(Backend('gemini', AI_ACTIONS, quality=2, is_available=self._remote_ready,
+                                     base_ms=1500, per_char_ms=0.05))
+        # Translation has no offline implementation, so the heuristic backend doesn't claim it
+        self.router.register(Backend('heuristic', [a for a in AI_ACTIONS if a != 'translate'], quality=0,
+                                     base_ms=2, per_char_ms=0.0005))
+    
+    def _load_gemini(self):
+        try:
+            import google.generativeai as genai
+            genai.configure(api_key=self.api_key)
+            model = genai.GenerativeModel('gemini-pro')
+            logger.info("Google Gemini AI initialized successfully")
+            return model
+        except Exception:
+            self.gemini_available = False
+            raise
+    
+    @property
+    def model(self):
+        return self.gemini.get() if self.gemini_available else None
+    
+    def _remote_ready(self) -> bool:
+        """Gemini is configured, loads, and its circuit breaker is not open"""
+        return self.gemini_available and self.client.available() and self.model is not None
+    
+    def _fallback(self, result: Dict) -> Dict:
+        """
+        Mark a heuristic result as degraded while Gemini is configured, so it is served
+        but not cached: once Gemini is reachable again the next request gets its output
+        """
+        if self.gemini_available:
+            result['degraded'] = True
+        return result
+    
+    def _use_remote(self, action: str, text: str, options: Dict = None) -> bool:
+        """Ask the router whether this request should go to Gemini"""
+        budget = (options or {}).get('latencyBudgetMs') or DEFAULT_LATENCY_BUDGET_MS
+        backend = self.router.select(action, len(text or ''), budget)
+        return backend is not None and backend.name == 'gemini'
+    
+    async def _call_model(self, prompt: str) -> str:
+        """Call the model without blocking the event loop"""
+        if hasattr(self.model, 'generate_content_async'):
+            response = await self.model.generate_content_async(prompt)
+        else:
+            response = await runtime.offload(self.model.generate_content, prompt)
+        return response.text
+    
+    async def _call_model_stream(self, prompt: str) -> AsyncIterator[str]:
+        """Yield model output chunks as they are produced"""
+        if hasattr(self.model, 'generate_content_async'):
+            response = await self.model.generate_content_async(prompt, stream=True)
+            async for chunk in response:
+                yield chunk.text
+            return
+        
+        response = await runtime.offload(self.model.generate_content, prompt, stream=True)
+        chunks = iter(response)
+        while True:
+            chunk = await runtime.offload(next, chunks, None)
+            if chunk is None:
+                return
+            yield chunk.text
+    
+    async def _generate(self, prompt: str, action: str) -> str:
+        """Model call with deadline, retries and circuit breaking"""
+        start = time.perf_counter()
+        try:
+            result = await self.client.call(action, lambda: self._call_model(prompt))
+        except BackendUnavailable:
+            raise
+        except Exception:
+            self.router.record('gemini', len(prompt), time.perf_counter() - start, ok=False)
+            raise
+        self.router.record('gemini', len(prompt), time.perf_counter() - start)
+        return result
+    
+    def _generate_stream(self, prompt: str, action: str) -> AsyncIterator[str]:
+        return self.client.stream(action, lambda: self._call_model_stream(prompt))
+    
+    async def _generate_chunked(self, text: str, build_prompt, action: str) -> str:
+        """Run a per-chunk prompt over the whole text and stitch the outputs back together"""
+        chunks = split_into_chunks(text, CHUNK_CHARS)
+        if len(chunks) == 1:
+            return await self._generate(build_prompt(text), action)
+        
+        outputs = await map_chunks([chunk.text for chunk in chunks],
+                                   lambda chunk: self._generate(build_prompt(chunk), action),
+                                   CHUNK_CONCURRENCY)
+        return join_chunks(chunks, outputs)
+    
+    async def _stream_chunked(self, text: str, build_prompt, action: str) -> AsyncIterator[str]:
+        """Streaming counterpart of _generate_chunked; chunks are streamed in order"""
+        chunks = split_into_chunks(text, CHUNK_CHARS)
+        for i, chunk in enumerate(chunks):
+            async for piece in self._generate_stream(build_prompt(chunk.text), action):
+                yield piece
+            if i < len(chunks) - 1:
+                yield chunk.trailing
+    
+    async def _reduce_for_summary(self, text: str, options: Dict = None) -> str:
+        """Map step: summarize chunks until the combined partial summaries fit one prompt"""
+        for _ in range(3):
+            if len(text) <= CHUNK_CHARS:
+                break
+            chunks = split_into_chunks(text, CHUNK_CHARS, overlap=1)
+            partials = await map_chunks([chunk.text for chunk in chunks],
+                                        lambda chunk: self._generate(self._summarize_prompt(chunk, options),
+                                                                     'summarize'),
+                                        CHUNK_CONCURRENCY)
+            text = '\n\n'.join(partial.strip() for partial in partials)
+        return text[:CHUNK_CHARS]
+    
+    async def _stream_summary(self, text: str, options: Dict = None) -> AsyncIterator[str]:
+        reduced = await self._reduce_for_summary(text, options)
+        async for piece in self._generate_stream(self._summarize_prompt(reduced, options), 'summarize'):
+            yield piece
+    
+    def _summarize_prompt(self, text: str, options: Dict = None) -> str:
+        options = options or {}
+        summary_type = options.get('type', 'key-points')
+        length = options.get('length', 'medium')
+        return f"""Summarize the following text in {length} length focusing on {summary_type}.
+                
+Text: {text}
+
+Provide a clear, concise summary:"""
+    
+    def _rewrite_prompt(self, text: str, options: Dict = None) -> str:
+        options = options or {}
+        tone = options.get('tone', 'neutral')
+        reading_level = options.get('readingLevel', 'intermediate')
+        return f"""Rewrite the following text with a {tone} tone at a {reading_level} reading level.
+Keep the meaning the same but adjust the style and vocabulary appropriately.
+
+Text: {text}
+
+Rewritten version:"""
+    
+    def _eli5_prompt(self, text: str) -> str:
+        return f"""Explain the following text in very simple terms, as if explaining to a 5-year-old child. Use simple words, short sentences, and everyday examples.
+
+Text: {text}
+
+Simple explanation:"""
+    
+    def _proofread_prompt(self, text: str) -> str:
+        return f"""Proofread and correct the following text. Fix spelling, grammar, and punctuation errors.
+Return ONLY the corrected text, no explanations.
+
+Text: {text}
+
+Corrected version:"""
+    
+    def _translate_prompt(self, text: str, target_name: str, source_name: str = None) -> str:
+        source = f"{source_name} " if source_name else ''
+        return f"""Translate the following {source}text to {target_name}.
+Return ONLY the translation, no explanations.
+
+Text: {text}
+
+{target_name} translation:"""
+    
+    def _quiz_prompt(self, text: str, num_questions: int) -> str:
+        return f"""Generate {num_questions} multiple-choice quiz questions based on the following text. 
+Each question should have 4 options with one correct answer.
+Format as JSON array with structure: [{{"question": "...", "options": ["A", "B", "C", "D"], "correct": 0}}]
+
+Text: {text}
+
+Quiz questions (JSON):"""
+    
+    async def stream(self, action: str, text: str, options: Dict = None) -> AsyncIterator[Dict]:
+        """
+        Stream summarize/rewrite/eli5 output.
+        Yields {'delta': ...} events followed by one {'done': True, ...} event
+        carrying the same fields as the non-streaming result.
+        """
+        options = options or {}
+        if action == 'summarize':
+            model_stream = lambda: self._stream_summary(text, options)
+            fallback = lambda: (self._extractive_summarize(text, options.get('length', 'medium'),
+                                                           options.get('algorithm', 'tfidf')), 'extractive')
+        elif action == 'rewrite':
+            model_stream = lambda: self._stream_chunked(text, lambda chunk: self._rewrite_prompt(chunk, options),
+                                                        'rewrite')
+            fallback = lambda: (self._simple_rewrite(text, options.get('tone', 'neutral'),
+                                                     options.get('readingLevel')), 'heuristic')
+        elif action == 'eli5':
+            model_stream = lambda: self._stream_chunked(text, self._eli5_prompt, 'eli5')
+            fallback = lambda: (self._simple_simplify(text), 'basic')
+        else:
+            raise ValueError(f"Streaming not supported for {action}")
+        
+        key = make_cache_key(action, text, {'options': cache_options(options)})
+        cached = self.cache.get(key)
+        if cached is not None:
+            for sentence in SENTENCE_CHUNK_RE.findall(cached['result']):
+                yield {'delta': sentence}
+            yield {'done': True, **cached, 'cached': True}
+            return
+        
+        error = None
+        if self._use_remote(action, text, options):
+            parts = []
             try:
-                import google.generativeai as genai
-                genai.configure(api_key=self.api_key)
-                self.model = genai.GenerativeModel('gemini-pro')
-                self.gemini_available = True
-                logger.info("Google Gemini AI initialized successfully")
+                async for chunk in model_stream():
+                    parts.append(chunk)
+                    yield {'delta': chunk}
             except Exception as e:
-                logger.warning(f"Gemini initialization failed: {e}")
-                self.gemini_available = False
+                logger.error(f"Streaming {action} error: {e}")
+                if parts:
+                    yield {'done': True, 'success': False, 'error': str(e), 'result': ''.join(parts)}
+                    return
+                error = str(e)
+            else:
+                result = {'success': True, 'result': ''.join(parts), 'method': 'gemini'}
+                self.cache.set(key, result)
+                yield {'done': True, **result}
+                return
+        
+        # Heuristic fallbacks are computed at once but still delivered sentence by sentence
+        result_text, method = fallback()
+        for sentence in SENTENCE_CHUNK_RE.findall(result_text):
+            yield {'delta': sentence}
+        
+        if error:
+            yield {'done': True, 'success': False, 'error': error, 'result': result_text}
+        else:
+            result = self._fallback({'success': True, 'result': result_text, 'method': method})
+            if not result.get('degraded'):
+                self.cache.set(key, result)
+            yield {'done': True, **result}
     
+    @instrumented('summarize')
+    @cached_action('summarize')
     async def summarize(self, text: str, options: Dict = None) -> Dict:
         """Summarize text using AI or fallback"""
         try:
             options = options or {}
-            summary_type = options.get('type', 'key-points')
             length = options.get('length', 'medium')
+            algorithm = options.get('algorithm', 'tfidf')
             
             # Try Gemini API
-            if self.gemini_available:
-                prompt = f"""Summarize the following text in {length} length focusing on {summary_type}.
-                
-Text: {text[:5000]}
-
-Provide a clear, concise summary:"""
-                
-                response = self.model.generate_content(prompt)
+            if self._use_remote('summarize', text, options):
+                reduced = await self._reduce_for_summary(text, options)
+                response_text = await self._generate(self._summarize_prompt(reduced, options), 'summarize')
                 return {
                     'success': True,
-                    'result': response.text,
+                    'result': response_text,
                     'method': 'gemini'
                 }
             
             # Fallback to extractive summarization
-            summary = self._extractive_summarize(text, length)
-            return {
+            summary = self._extractive_summarize(text, length, algorithm)
+            return self._fallback({
                 'success': True,
                 'result': summary,
                 'method': 'extractive'
-            }
+            })
             
         except Exception as e:
             logger.error(f"Summarization error: {e}")
             return {
                 'success': False,
                 'error': str(e),
-                'result': self._extractive_summarize(text, length)
+                'result': self._extractive_summarize(text, length, algorithm)
             }
     
+    @instrumented('rewrite')
+    @cached_action('rewrite')
     async def rewrite(self, text: str, options: Dict = None) -> Dict:
         """Rewrite text with specified tone and reading level"""
         try:
@@ -113,63 +339,52 @@ Provide a clear, concise summary:"""
             reading_level = options.get('readingLevel', 'intermediate')
             
             # Try Gemini API
-            if self.gemini_available:
-                prompt = f"""Rewrite the following text with a {tone} tone at a {reading_level} reading level.
-Keep the meaning the same but adjust the style and vocabulary appropriately.
-
-Text: {text}
-
-Rewritten version:"""
-                
-                response = self.model.generate_content(prompt)
+            if self._use_remote('rewrite', text, options):
+                response_text = await self._generate_chunked(
+                    text, lambda chunk: self._rewrite_prompt(chunk, options), 'rewrite')
                 return {
                     'success': True,
-                    'result': response.text,
+                    'result': response_text,
                     'method': 'gemini'
                 }
             
             # Fallback to simple rewriting
-            rewritten = self._simple_rewrite(text, tone)
-            return {
+            rewritten = self._simple_rewrite(text, tone, reading_level)
+            return self._fallback({
                 'success': True,
                 'result': rewritten,
                 'method': 'heuristic'
-            }
+            })
             
         except Exception as e:
             logger.error(f"Rewrite error: {e}")
             return {
                 'success': False,
                 'error': str(e),
-                'result': self._simple_rewrite(text, tone)
+                'result': self._simple_rewrite(text, tone, reading_level)
             }
     
+    @instrumented('proofread')
+    @cached_action('proofread')
     async def proofread(self, text: str, options: Dict = None) -> Dict:
         """Proofread and correct text"""
         try:
             # Try Gemini API
-            if self.gemini_available:
-                prompt = f"""Proofread and correct the following text. Fix spelling, grammar, and punctuation errors.
-Return ONLY the corrected text, no explanations.
-
-Text: {text}
-
-Corrected version:"""
-                
-                response = self.model.generate_content(prompt)
+            if self._use_remote('proofread', text, options):
+                response_text = await self._generate_chunked(text, self._proofread_prompt, 'proofread')
                 return {
                     'success': True,
-                    'result': response.text,
+                    'result': response_text,
                     'method': 'gemini'
                 }
             
             # Fallback to basic corrections
             corrected = self._basic_proofread(text)
-            return {
+            return self._fallback({
                 'success': True,
                 'result': corrected,
                 'method': 'basic'
-            }
+            })
             
         except Exception as e:
             logger.error(f"Proofread error: {e}")
@@ -179,35 +394,48 @@ Corrected version:"""
                 'result': self._basic_proofread(text)
             }
     
+    @instrumented('translate')
+    @cached_action('translate')
     async def translate(self, text: str, target_lang: str, options: Dict = None) -> Dict:
         """Translate text to target language"""
         try:
-            lang_names = {
-                'es': 'Spanish', 'fr': 'French', 'de': 'German',
-                'it': 'Italian', 'pt': 'Portuguese', 'ja': 'Japanese',
-                'zh': 'Chinese', 'ko': 'Korean', 'ru': 'Russian', 'ar': 'Arabic'
-            }
+            target_name = language_name(target_lang)
+            
+            # Identify the source language (cached per text); unreliable guesses are not used
+            detected = await runtime.offload(language_identifier.detect, text)
+            source_lang = detected['language'] if detected['reliable'] else None
             
-            target_name = lang_names.get(target_lang, target_lang)
+            if source_lang and source_lang == base_language(target_lang):
+                return {
+                    'success': True,
+                    'result': text,
+                    'method': 'passthrough',
+                    'source_language': source_lang,
+                    'target_language': target_lang
+                }
             
             # Try Gemini API
-            if self.gemini_available:
-                prompt = f"""Translate the following English text to {target_name}.
-Return ONLY the translation, no explanations.
-
-Text: {text}
-
-{target_name} translation:"""
-                
-                response = self.model.generate_content(prompt)
+            if self._use_remote('translate', text, options):
+                source_name = language_name(source_lang) if source_lang else None
+                response_text = await self._generate_chunked(
+                    text, lambda chunk: self._translate_prompt(chunk, target_name, source_name), 'translate')
                 return {
                     'success': True,
-                    'result': response.text,
+                    'result': response_text,
                     'method': 'gemini',
+                    'source_language': source_lang,
                     'target_language': target_lang
                 }
             
-            # Fallback message
+            # No offline translation: say whether Gemini is missing or only unavailable right now
+            if self.gemini_available:
+                return {
+                    'success': False,
+                    'error': 'Translation is temporarily unavailable, please retry shortly',
+                    'result': f"[Translation to {target_name} temporarily unavailable. Original: {text}]",
+                    'method': 'none',
+                    'target_language': target_lang
+                }
             return {
                 'success': False,
                 'result': f"[Translation to {target_name} requires API key. Original: {text}]",
@@ -223,20 +451,24 @@ Text: {text}
                 'result': f"[Translation failed: {text}]"
             }
     
+    @instrumented('generate-alt-text')
+    @cached_action('generate-alt-text')
     async def generate_alt_text(self, context: str, current_alt: str = "", options: Dict = None) -> Dict:
         """Generate image alt text based on context"""
         try:
             # Try Gemini API
-            if self.gemini_available:
+            if self._use_remote('generate-alt-text', context, options):
+                # Sentence-bounded context window instead of a mid-word slice
+                context_window = split_into_chunks(context, ALT_TEXT_CONTEXT_CHARS)[0].text if context else ''
                 prompt = f"""Generate descriptive alt text for an image (max 125 characters).
 
-Context: {context[:500]}
+Context: {context_window}
 Current alt text: {current_alt}
 
 Provide improved alt text:"""
                 
-                response = self.model.generate_content(prompt)
-                alt_text = response.text[:125]  # Enforce limit
+                response_text = await self._generate(prompt, 'generate-alt-text')
+                alt_text = response_text[:125]  # Enforce limit
                 
                 return {
                     'success': True,
@@ -246,14 +478,14 @@ Provide improved alt text:"""
             
             # Fallback
             if current_alt:
-                return {'success': True, 'result': current_alt, 'method': 'existing'}
+                return self._fallback({'success': True, 'result': current_alt, 'method': 'existing'})
             
             alt_text = f"Image: {context[:100]}" if context else "Image description unavailable"
-            return {
+            return self._fallback({
                 'success': True,
                 'result': alt_text,
                 'method': 'context'
-            }
+            })
             
         except Exception as e:
             logger.error(f"Alt text generation error: {e}")
@@ -263,30 +495,26 @@ Provide improved alt text:"""
                 'result': current_alt or "Image"
             }
     
+    @instrumented('eli5')
+    @cached_action('eli5')
     async def eli5(self, text: str, options: Dict = None) -> Dict:
         """Explain Like I'm 5 - Simplify text for beginners"""
         try:
-            if self.gemini_available:
-                prompt = f"""Explain the following text in very simple terms, as if explaining to a 5-year-old child. Use simple words, short sentences, and everyday examples.
-
-Text: {text}
-
-Simple explanation:"""
-                
-                response = self.model.generate_content(prompt)
+            if self._use_remote('eli5', text, options):
+                response_text = await self._generate_chunked(text, self._eli5_prompt, 'eli5')
                 return {
                     'success': True,
-                    'result': response.text,
+                    'result': response_text,
                     'method': 'gemini'
                 }
             
             # Fallback: Simple text simplification
             simplified = self._simple_simplify(text)
-            return {
+            return self._fallback({
                 'success': True,
                 'result': simplified,
                 'method': 'basic'
-            }
+            })
             
         except Exception as e:
             logger.error(f"ELI5 error: {e}")
@@ -296,34 +524,42 @@ Simple explanation:"""
                 'result': text
             }
     
+    @instrumented('side-by-side-translate', cacheable=False)
     async def side_by_side_translate(self, text: str, target_lang: str, options: Dict = None) -> Dict:
-        """Translate with side-by-side comparison"""
+        """
+        Translate with side-by-side comparison.
+        Each segment goes through the cached translate, so resubmitting an edited
+        document only translates the segments that changed.
+        """
         try:
-            translation_result = await self.translate(text, target_lang, options)
-            
-            # Split into lines for side-by-side view
-            original_lines = text.split('\n')
-            translated_lines = translation_result.get('result', '').split('\n')
-            
-            # Align lines
-            aligned = []
-            max_lines = max(len(original_lines), len(translated_lines))
-            for i in range(max_lines):
-                original = original_lines[i] if i < len(original_lines) else ''
-                translated = translated_lines[i] if i < len(translated_lines) else ''
-                aligned.append({
-                    'original': original,
-                    'translated': translated
-                })
-            
-            return {
-                'success': True,
+            segments = split_segments(text, SEGMENT_CHARS)
+            results = await map_chunks([segment.text for segment in segments],
+                                       lambda segment: self.translate(segment, target_lang, options),
+                                       SEGMENT_CONCURRENCY)
+            
+            aligned = [{
+                'id': f"s{i}",
+                'original': segment.text,
+                'translated': result.get('result', '')
+            } for i, (segment, result) in enumerate(zip(segments, results))]
+            
+            methods = {result.get('method') for result in results if not result.get('cached')}
+            failed = [result for result in results if not result.get('success')]
+            response = {
+                'success': not failed,
                 'aligned': aligned,
                 'original': text,
-                'translated': translation_result.get('result'),
-                'method': translation_result.get('method'),
-                'target_language': target_lang
+                'translated': join_chunks(segments, [entry['translated'] for entry in aligned]),
+                'method': methods.pop() if len(methods) == 1 else ('cache' if not methods else 'mixed'),
+                'target_language': target_lang,
+                'segments': {
+                    'total': len(segments),
+                    'cached': sum(1 for result in results if result.get('cached'))
+                }
             }
+            if failed:
+                response['error'] = failed[0].get('error') or f"{len(failed)} segment(s) not translated"
+            return response
             
         except Exception as e:
             logger.error(f"Side-by-side translation error: {e}")
@@ -332,24 +568,16 @@ Simple explanation:"""
                 'error': str(e)
             }
     
+    @instrumented('generate-quiz')
+    @cached_action('generate-quiz')
     async def generate_quiz(self, text: str, options: Dict = None) -> Dict:
         """Generate quiz questions from text"""
         try:
             options = options or {}
-            num_questions = options.get('num_questions', 5)
+            num_questions = int(options.get('num_questions', 5))
             
-            if self.gemini_available:
-                prompt = f"""Generate {num_questions} multiple-choice quiz questions based on the following text. 
-Each question should have 4 options with one correct answer.
-Format as JSON array with structure: [{{"question": "...", "options": ["A", "B", "C", "D"], "correct": 0}}]
-
-Text: {text[:3000]}
-
-Quiz questions (JSON):"""
-                
-                response = self.model.generate_content(prompt)
-                import json
-                questions = json.loads(response.text)
+            if self._use_remote('generate-quiz', text, options):
+                questions = await self._generate_quiz_chunked(text, num_questions)
                 
                 return {
                     'success': True,
@@ -359,11 +587,11 @@ Quiz questions (JSON):"""
             
             # Fallback: Generate simple questions
             questions = self._generate_simple_quiz(text, num_questions)
-            return {
+            return self._fallback({
                 'success': True,
                 'questions': questions,
                 'method': 'basic'
-            }
+            })
             
         except Exception as e:
             logger.error(f"Quiz generation error: {e}")
@@ -373,35 +601,31 @@ Quiz questions (JSON):"""
                 'questions': []
             }
     
+    async def _generate_quiz_chunked(self, text: str, num_questions: int) -> list:
+        """Spread the requested questions over evenly spaced chunks of the whole text"""
+        chunks = split_into_chunks(text, QUIZ_CHUNK_CHARS)
+        picked = min(len(chunks), max(num_questions, 1))
+        selected = [chunks[i * len(chunks) // picked].text for i in range(picked)]
+        counts = [num_questions // picked + (1 if i < num_questions % picked else 0) for i in range(picked)]
+        
+        jobs = [(chunk, count) for chunk, count in zip(selected, counts) if count]
+        responses = await map_chunks(jobs,
+                                     lambda job: self._generate(self._quiz_prompt(*job), 'generate-quiz'),
+                                     CHUNK_CONCURRENCY)
+        
+        questions = []
+        for response_text in responses:
+            questions.extend(json.loads(response_text))
+        return questions[:num_questions]
+    
     def _simple_simplify(self, text: str) -> str:
         """Basic text simplification"""
         # Replace complex words with simpler ones
-        simplifications = {
-            'utilize': 'use',
-            'commence': 'start',
-            'terminate': 'end',
-            'approximately': 'about',
-            'consequently': 'so',
-            'therefore': 'so',
-            'however': 'but',
-            'nevertheless': 'but',
-            'additionally': 'also',
-            'furthermore': 'also'
-        }
-        
-        result = text
-        for complex_word, simple_word in simplifications.items():
-            result = re.sub(r'\b' + complex_word + r'\b', simple_word, result, flags=re.IGNORECASE)
-        
-        return result
+        return get_engine(reading_level='basic').apply(text)
     
     def _generate_simple_quiz(self, text: str, num_questions: int) -> list:
         """Generate basic quiz questions from text"""
-        # Fallback sentence splitting if NLTK not available
-        if NLTK_AVAILABLE:
-            sentences = sent_tokenize(text)
-        else:
-            sentences = text.split('. ')
+        sentences = split_sentences(text)
         
         questions = []
         
@@ -423,89 +647,17 @@ Quiz questions (JSON):"""
     
     # Fallback methods
     
-    def _extractive_summarize(self, text: str, length: str = 'medium') -> str:
+    def _extractive_summarize(self, text: str, length: str = 'medium', algorithm: str = 'tfidf') -> str:
         """Extractive summarization using sentence scoring"""
         try:
-            # Fallback sentence splitting if NLTK not available
-            if NLTK_AVAILABLE:
-                sentences = sent_tokenize(text)
-            else:
-                sentences = text.split('. ')
-            
-            if len(sentences) <= 3:
-                return text
-            
-            # Score sentences by word frequency and position
-            if NLTK_AVAILABLE:
-                stop_words = set(stopwords.words('english'))
-            else:
-                # Basic English stop words
-                stop_words = {'a', 'an', 'the', 'is', 'are', 'was', 'were', 'be', 'been', 
-                             'being', 'have', 'has', 'had', 'do', 'does', 'did', 'will', 
-                             'would', 'could', 'should', 'may', 'might', 'must', 'can',
-                             'of', 'at', 'by', 'for', 'with', 'about', 'against', 'between',
-                             'into', 'through', 'during', 'before', 'after', 'above', 'below',
-                             'to', 'from', 'up', 'down', 'in', 'out', 'on', 'off', 'over',
-                             'under', 'again', 'further', 'then', 'once', 'here', 'there',
-                             'when', 'where', 'why', 'how', 'all', 'both', 'each', 'few',
-                             'more', 'most', 'other', 'some', 'such', 'no', 'nor', 'not',
-                             'only', 'own', 'same', 'so', 'than', 'too', 'very', 's', 't',
-                             'just', 'don', 'now', 'and', 'but', 'or', 'if', 'because', 'as',
-                             'until', 'while', 'that', 'this', 'these', 'those', 'i', 'you',
-                             'he', 'she', 'it', 'we', 'they', 'them', 'their', 'what', 'which'}
-            
-            word_freq = {}
-            
-            for sentence in sentences:
-                words = re.findall(r'\w+', sentence.lower())
-                for word in words:
-                    if word not in stop_words:
-                        word_freq[word] = word_freq.get(word, 0) + 1
-            
-            # Score sentences
-            sentence_scores = []
-            for i, sentence in enumerate(sentences):
-                words = re.findall(r'\w+', sentence.lower())
-                score = sum(word_freq.get(word, 0) for word in words if word not in stop_words)
-                score += (len(sentences) - i) * 0.3  # Position bonus
-                sentence_scores.append((sentence, score))
-            
-            # Select top sentences
-            num_sentences = {'short': 2, 'medium': 3, 'long': 5}.get(length, 3)
-            num_sentences = min(num_sentences, len(sentences))
-            
-            top_sentences = sorted(sentence_scores, key=lambda x: x[1], reverse=True)[:num_sentences]
-            top_sentences = sorted(top_sentences, key=lambda x: sentences.index(x[0]))
-            
-            return ' '.join(s[0] for s in top_sentences)
-            
+            return extractive_summarizer.summarize(text, length, algorithm)
         except Exception as e:
             logger.error(f"Extractive summarization error: {e}")
             return text[:500] + "..." if len(text) > 500 else text
     
-    def _simple_rewrite(self, text: str, tone: str) -> str:
-        """Simple rewriting using pattern replacement"""
-        result = text
-        
-        if tone == 'formal':
-            replacements = {
-                r"\bdon't\b": "do not", r"\bcan't\b": "cannot",
-                r"\bwon't\b": "will not", r"\bit's\b": "it is",
-                r"\bthat's\b": "that is", r"\bI'm\b": "I am"
-            }
-        elif tone == 'friendly':
-            replacements = {
-                r"\bdo not\b": "don't", r"\bcannot\b": "can't",
-                r"\bwill not\b": "won't", r"\bit is\b": "it's",
-                r"\bthat is\b": "that's", r"\bI am\b": "I'm"
-            }
-        else:
-            return text
-        
-        for pattern, replacement in replacements.items():
-            result = re.sub(pattern, replacement, result, flags=re.IGNORECASE)
-        
-        return result
+    def _simple_rewrite(self, text: str, tone: str, reading_level: str = None) -> str:
+        """Simple rewriting using the compiled tone and reading level rule packs"""
+        return get_engine(tone, reading_level).apply(text)
     
     def _basic_proofread(self, text: str) -> str:
         """Basic proofreading corrections"""
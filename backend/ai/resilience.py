@@ -0,0 +1,250 @@
+"""
+ContextGuard Backend - Resilient Model Client
+Deadlines, jittered retries, circuit breaking and latency metrics for upstream AI calls
+"""
+
+import os
+import time
+import random
+import asyncio
+import logging
+import threading
+from collections import deque
+from typing import AsyncIterator, Awaitable, Callable, Dict
+
+from backend.metrics import record_upstream
+
+logger = logging.getLogger(__name__)
+
+try:
+    from google.api_core import exceptions as google_exceptions
+    TRANSIENT_ERRORS = (
+        asyncio.TimeoutError, ConnectionError,
+        google_exceptions.ServiceUnavailable, google_exceptions.DeadlineExceeded,
+        google_exceptions.ResourceExhausted, google_exceptions.InternalServerError,
+        google_exceptions.TooManyRequests
+    )
+except ImportError:
+    TRANSIENT_ERRORS = (asyncio.TimeoutError, ConnectionError)
+
+
+class BackendUnavailable(Exception):
+    """Raised without calling upstream while the circuit breaker is open"""
+
+
+class CircuitBreaker:
+    """
+    Opens after `failure_threshold` consecutive transient failures, rejects calls for
+    `reset_timeout` seconds, then lets a single trial call through (half-open).
+    """
+
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half_open'
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = self.CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self.trial_in_flight = False
+        self._lock = threading.Lock()
+
+    def allow(self) -> bool:
+        with self._lock:
+            if self.state == self.CLOSED:
+                return True
+            if self.state == self.OPEN and time.monotonic() - self.opened_at >= self.reset_timeout:
+                self.state = self.HALF_OPEN
+                self.trial_in_flight = False
+            if self.state == self.HALF_OPEN and not self.trial_in_flight:
+                self.trial_in_flight = True
+                return True
+            return False
+
+    def is_open(self) -> bool:
+        with self._lock:
+            return self.state == self.OPEN and time.monotonic() - self.opened_at < self.reset_timeout
+
+    def record_success(self):
+        with self._lock:
+            self.state = self.CLOSED
+            self.failures = 0
+            self.trial_in_flight = False
+
+    def release(self):
+        """Give back a half-open trial slot whose call ended without an outcome"""
+        with self._lock:
+            self.trial_in_flight = False
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            self.trial_in_flight = False
+            if self.state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+                if self.state != self.OPEN:
+                    logger.warning(f"Circuit breaker opened after {self.failures} failures")
+                self.state = self.OPEN
+                self.opened_at = time.monotonic()
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {'state': self.state, 'consecutive_failures': self.failures}
+
+
+class LatencyTracker:
+    """Recent latency samples and outcome counters per action"""
+
+    def __init__(self, window: int = 512):
+        self.window = window
+        self._samples: Dict[str, deque] = {}
+        self._counts: Dict[str, Dict[str, int]] = {}
+        self._lock = threading.Lock()
+
+    def record(self, action: str, seconds: float, outcome: str):
+        with self._lock:
+            if action not in self._samples:
+                self._samples[action] = deque(maxlen=self.window)
+                self._counts[action] = {'success': 0, 'error': 0, 'retry': 0, 'rejected': 0}
+            if outcome == 'success':
+                self._samples[action].append(seconds)
+            self._counts[action][outcome] += 1
+        record_upstream(action, outcome)
+
+    @staticmethod
+    def _percentile(ordered, fraction: float) -> float:
+        index = min(len(ordered) - 1, int(round(fraction * (len(ordered) - 1))))
+        return round(ordered[index] * 1000, 1)
+
+    def stats(self) -> Dict:
+        with self._lock:
+            snapshot = {action: (sorted(samples), dict(self._counts[action]))
+                        for action, samples in self._samples.items()}
+
+        stats = {}
+        for action, (ordered, counts) in snapshot.items():
+            entry = dict(counts)
+            if ordered:
+                entry.update({
+                    'p50_ms': self._percentile(ordered, 0.50),
+                    'p95_ms': self._percentile(ordered, 0.95),
+                    'p99_ms': self._percentile(ordered, 0.99)
+                })
+            stats[action] = entry
+        return stats
+
+
+class ResilientClient:
+    """Wrap upstream model calls with a deadline, retries and a circuit breaker"""
+
+    def __init__(self, timeout: float = 30, retries: int = 2, backoff: float = 0.5,
+                 breaker: CircuitBreaker = None, tracker: LatencyTracker = None):
+        self.timeout = timeout
+        self.retries = retries
+        self.backoff = backoff
+        self.breaker = breaker or CircuitBreaker()
+        self.tracker = tracker or LatencyTracker()
+
+    def available(self) -> bool:
+        """False while the breaker is open, so callers can go straight to a fallback"""
+        return not self.breaker.is_open()
+
+    def _delay(self, attempt: int) -> float:
+        # Full jitter: uniform in [0, backoff * 2^attempt]
+        return random.uniform(0, self.backoff * (2 ** attempt))
+
+    async def call(self, action: str, factory: Callable[[], Awaitable]):
+        """Await factory() with per-attempt deadline, retrying transient errors"""
+        attempt = 0
+        while True:
+            if not self.breaker.allow():
+                self.tracker.record(action, 0, 'rejected')
+                raise BackendUnavailable(f"Upstream unavailable for {action}")
+
+            start = time.perf_counter()
+            try:
+                result = await asyncio.wait_for(factory(), timeout=self.timeout)
+            except asyncio.CancelledError:
+                self.breaker.release()
+                raise
+            except TRANSIENT_ERRORS as e:
+                self.breaker.record_failure()
+                if attempt >= self.retries:
+                    self.tracker.record(action, time.perf_counter() - start, 'error')
+                    if isinstance(e, asyncio.TimeoutError):
+                        raise asyncio.TimeoutError(f"{action} timed out after {self.timeout}s") from e
+                    raise
+                self.tracker.record(action, time.perf_counter() - start, 'retry')
+                logger.warning(f"{action} transient error ({type(e).__name__}), retrying")
+                await asyncio.sleep(self._delay(attempt))
+                attempt += 1
+                continue
+            except Exception:
+                # Not an availability problem (bad request, parse error); don't trip the breaker
+                self.breaker.release()
+                self.tracker.record(action, time.perf_counter() - start, 'error')
+                raise
+
+            self.breaker.record_success()
+            self.tracker.record(action, time.perf_counter() - start, 'success')
+            return result
+
+    async def stream(self, action: str, factory: Callable[[], AsyncIterator]) -> AsyncIterator:
+        """
+        Iterate factory() with a deadline on each chunk.
+        Nothing is retried once output has been forwarded to the caller.
+        """
+        if not self.breaker.allow():
+            self.tracker.record(action, 0, 'rejected')
+            raise BackendUnavailable(f"Upstream unavailable for {action}")
+
+        start = time.perf_counter()
+        finished = False
+        try:
+            iterator = factory().__aiter__()
+            while True:
+                try:
+                    chunk = await asyncio.wait_for(iterator.__anext__(), timeout=self.timeout)
+                except StopAsyncIteration:
+                    break
+                yield chunk
+            finished = True
+        except TRANSIENT_ERRORS:
+            finished = True
+            self.breaker.record_failure()
+            self.tracker.record(action, time.perf_counter() - start, 'error')
+            raise
+        except Exception:
+            finished = True
+            self.breaker.release()
+            self.tracker.record(action, time.perf_counter() - start, 'error')
+            raise
+        finally:
+            if not finished:
+                # Consumer went away mid-stream; not an upstream failure
+                self.breaker.release()
+
+        self.breaker.record_success()
+        self.tracker.record(action, time.perf_counter() - start, 'success')
+
+    def stats(self) -> Dict:
+        return {
+            'breaker': self.breaker.stats(),
+            'timeout': self.timeout,
+            'retries': self.retries,
+            'actions': self.tracker.stats()
+        }
+
+    @classmethod
+    def from_env(cls) -> 'ResilientClient':
+        """Build the client from AI_CALL_* / AI_BREAKER_* environment variables"""
+        return cls(
+            timeout=float(os.getenv('AI_CALL_TIMEOUT', 30)),
+            retries=int(os.getenv('AI_CALL_RETRIES', 2)),
+            backoff=float(os.getenv('AI_CALL_BACKOFF', 0.5)),
+            breaker=CircuitBreaker(
+                failure_threshold=int(os.getenv('AI_BREAKER_THRESHOLD', 5)),
+                reset_timeout=float(os.getenv('AI_BREAKER_RESET', 30))
+            )
+        )
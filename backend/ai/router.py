@@ -0,0 +1,123 @@
+"""
+ContextGuard Backend - Backend Router
+Registry of AI providers and latency-aware selection between them
+"""
+
+import time
+import threading
+import logging
+from typing import Callable, Dict, Iterable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class Backend:
+    """
+    One provider able to serve a set of actions.
+    Latency is modelled as base_ms + per_char_ms * input_chars and refined from observations.
+    """
+
+    def __init__(self, name: str, actions: Iterable[str], quality: int,
+                 is_available: Callable[[], bool] = None, base_ms: float = 10.0,
+                 per_char_ms: float = 0.0, max_chars: int = None):
+        self.name = name
+        self.actions = frozenset(actions)
+        self.quality = quality
+        self.is_available = is_available or (lambda: True)
+        self.base_ms = base_ms
+        self.per_char_ms = per_char_ms
+        self.max_chars = max_chars
+        self.error_rate = 0.0
+        self.error_at = time.monotonic()
+        self.observations = 0
+
+    def estimate_ms(self, input_chars: int) -> float:
+        return self.base_ms + self.per_char_ms * input_chars
+
+    def current_error_rate(self, half_life: float) -> float:
+        """Error rate decayed by the time since the last observation"""
+        if not half_life:
+            return self.error_rate
+        return self.error_rate * 0.5 ** ((time.monotonic() - self.error_at) / half_life)
+
+    def stats(self, half_life: float = 0) -> Dict:
+        return {
+            'quality': self.quality,
+            'available': self.is_available(),
+            'estimated_base_ms': round(self.base_ms, 1),
+            'estimated_per_1k_chars_ms': round(self.per_char_ms * 1000, 1),
+            'error_rate': round(self.current_error_rate(half_life), 3),
+            'observations': self.observations
+        }
+
+
+class BackendRouter:
+    """
+    Pick a backend per request.
+    Without a latency budget the highest-quality healthy backend wins; with one, the
+    highest-quality backend whose estimated latency fits, else the fastest available.
+    Error rates decay with error_half_life seconds, since a backend that is skipped as
+    unhealthy gets no new observations that could otherwise bring its rate back down.
+    """
+
+    def __init__(self, smoothing: float = 0.2, max_error_rate: float = 0.5,
+                 error_half_life: float = 60.0):
+        self.smoothing = smoothing
+        self.max_error_rate = max_error_rate
+        self.error_half_life = error_half_life
+        self.backends: Dict[str, Backend] = {}
+        self._lock = threading.Lock()
+
+    def register(self, backend: Backend):
+        self.backends[backend.name] = backend
+
+    def candidates(self, action: str, input_chars: int) -> List[Backend]:
+        eligible = [
+            b for b in self.backends.values()
+            if action in b.actions and b.is_available()
+            and (b.max_chars is None or input_chars <= b.max_chars)
+        ]
+        healthy = [b for b in eligible if b.current_error_rate(self.error_half_life) <= self.max_error_rate]
+        return sorted(healthy or eligible, key=lambda b: b.quality, reverse=True)
+
+    def select(self, action: str, input_chars: int, budget_ms: float = None) -> Optional[Backend]:
+        candidates = self.candidates(action, input_chars)
+        if not candidates:
+            return None
+        if not budget_ms:
+            return candidates[0]
+
+        for backend in candidates:
+            if backend.estimate_ms(input_chars) <= budget_ms:
+                return backend
+        return min(candidates, key=lambda b: b.estimate_ms(input_chars))
+
+    def record(self, name: str, input_chars: int, seconds: float, ok: bool = True):
+        """Fold one observed call into the backend's latency and error estimates"""
+        backend = self.backends.get(name)
+        if backend is None:
+            return
+
+        alpha = self.smoothing
+        with self._lock:
+            backend.observations += 1
+            error_rate = backend.current_error_rate(self.error_half_life)
+            backend.error_rate = error_rate + alpha * ((0.0 if ok else 1.0) - error_rate)
+            backend.error_at = time.monotonic()
+            if not ok:
+                return
+
+            # Attribute the prediction error to base and per-char terms in proportion to their share
+            observed_ms = seconds * 1000
+            predicted_ms = backend.estimate_ms(input_chars)
+            error = observed_ms - predicted_ms
+            if predicted_ms > 0 and input_chars:
+                char_share = backend.per_char_ms * input_chars / predicted_ms
+            else:
+                char_share = 0.0
+            backend.base_ms = max(0.0, backend.base_ms + alpha * error * (1 - char_share))
+            if input_chars:
+                backend.per_char_ms = max(0.0, backend.per_char_ms + alpha * error * char_share / input_chars)
+
+    def stats(self) -> Dict:
+        return {name: backend.stats(self.error_half_life) for name, backend in self.backends.items()}
@@ -3,23 +3,98 @@ ContextGuard Backend - AI Routes
 API endpoints for AI operations
 """
 
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, Response, request, jsonify, session, stream_with_context
 from backend.ai.processor import ai_processor
+from backend.ai.langid import language_identifier
+from backend.analytics import analytics_tracker
+from backend.metrics import observe_action
+from backend import lazy
+from backend.ai.runtime import runtime
+from backend.ai.batch import BatchExecutor
+from backend.ai.incremental import IncrementalProofreader, StaleDocument
+import os
+import json
+import time
+import uuid
 import logging
-import asyncio
 
 ai_bp = Blueprint('ai', __name__)
 logger = logging.getLogger(__name__)
 
+BATCH_MAX_JOBS = int(os.getenv('AI_BATCH_MAX_JOBS', 50))
+batch_executor = BatchExecutor(ai_processor, concurrency=int(os.getenv('AI_BATCH_CONCURRENCY', 8)))
+incremental_proofreader = IncrementalProofreader(
+    ai_processor,
+    max_documents=int(os.getenv('PROOFREAD_MAX_DOCUMENTS', 1000)),
+    ttl=float(os.getenv('PROOFREAD_DOCUMENT_TTL', 3600)),
+    concurrency=int(os.getenv('AI_CHUNK_CONCURRENCY', 4)),
+    max_edits=int(os.getenv('PROOFREAD_MAX_EDITS', 200))
+)
+
+
+@ai_bp.after_request
+def track_usage(response):
+    """Queue a usage event for signed-in users; the store is written off the request path"""
+    user_id = session.get('user_id')
+    if not user_id or request.method != 'POST' or response.status_code >= 400:
+        return response
+    
+    data = request.get_json(silent=True) or {}
+    action = request.path.rsplit('/', 1)[-1]
+    if action == 'batch':
+        jobs = data.get('jobs') if isinstance(data.get('jobs'), list) else []
+        usage = [(job.get('action'), job.get('text')) for job in jobs
+                 if isinstance(job, dict) and job.get('action') in batch_executor.actions]
+    elif action == 'generate-alt-text':
+        usage = [(action, data.get('context'))]
+    elif request.path.endswith('/proofread/incremental'):
+        edits = data.get('edits') if isinstance(data.get('edits'), list) else []
+        text = data.get('text') or ' '.join(e.get('text', '') for e in edits if isinstance(e, dict))
+        usage = [('proofread', text)]
+    else:
+        usage = [(action, data.get('text'))]
+    
+    for job_action, text in usage:
+        if job_action:
+            word_count = len(text.split()) if isinstance(text, str) else 0
+            analytics_tracker.enqueue_action(user_id, job_action, word_count)
+    return response
+
 
 def run_async(coro):
-    """Helper to run async functions in sync context"""
-    try:
-        loop = asyncio.get_event_loop()
-    except RuntimeError:
-        loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(loop)
-    return loop.run_until_complete(coro)
+    """Run a processor coroutine on the shared AI event loop"""
+    return runtime.run(coro)
+
+
+def with_budget(data, options=None):
+    """Carry the optional per-request latency budget into processor options"""
+    if data.get('latencyBudgetMs'):
+        return {**(options or {}), 'latencyBudgetMs': float(data['latencyBudgetMs'])}
+    return options
+
+
+def wants_stream(data) -> bool:
+    """Client asked for incremental output via the body flag or Accept header"""
+    return bool(data.get('stream')) or 'text/event-stream' in request.headers.get('Accept', '')
+
+
+def stream_response(action, text, options=None):
+    """Server-Sent Events response forwarding partial output as it is produced"""
+    def generate():
+        start = time.perf_counter()
+        try:
+            for event in runtime.iterate(ai_processor.stream(action, text, options)):
+                if event.get('done'):
+                    observe_action(action, event, time.perf_counter() - start, len(text))
+                    yield f"event: done\ndata: {json.dumps(event)}\n\n"
+                else:
+                    yield f"data: {json.dumps(event)}\n\n"
+        except Exception as e:
+            logger.error(f"{action} stream error: {e}")
+            yield f"event: error\ndata: {json.dumps({'success': False, 'error': str(e)})}\n\n"
+    
+    return Response(stream_with_context(generate()), mimetype='text/event-stream',
+                    headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
 
 
 @ai_bp.route('/summarize', methods=['POST'])
@@ -40,8 +115,13 @@ def summarize():
         
         options = {
             'type': data.get('type', 'key-points'),
-            'length': data.get('length', 'medium')
+            'length': data.get('length', 'medium'),
+            'algorithm': data.get('algorithm', 'tfidf')
         }
+        options = with_budget(data, options)
+        
+        if wants_stream(data):
+            return stream_response('summarize', text, options)
         
         result = run_async(ai_processor.summarize(text, options))
         return jsonify(result)
@@ -68,6 +148,10 @@ def rewrite():
             'tone': data.get('tone', 'neutral'),
             'readingLevel': data.get('readingLevel', 'intermediate')
         }
+        options = with_budget(data, options)
+        
+        if wants_stream(data):
+            return stream_response('rewrite', text, options)
         
         result = run_async(ai_processor.rewrite(text, options))
         return jsonify(result)
@@ -90,7 +174,7 @@ def proofread():
         if len(text) < 5:
             return jsonify({'error': 'Text too short'}), 400
         
-        result = run_async(ai_processor.proofread(text))
+        result = run_async(ai_processor.proofread(text, with_budget(data)))
         return jsonify(result)
         
     except Exception as e:
@@ -98,6 +182,47 @@ def proofread():
         return jsonify({'error': str(e), 'success': False}), 500
 
 
+@ai_bp.route('/proofread/incremental', methods=['POST'])
+def proofread_incremental():
+    """
+    Proofread a document being edited: send {docId, text} once, then
+    {docId, version, edits: [{start, end, text}]}; returns correction spans
+    """
+    try:
+        data = request.get_json()
+        
+        doc_id = data.get('docId') if data else None
+        if not isinstance(doc_id, str) or not doc_id or len(doc_id) > 128:
+            return jsonify({'error': 'docId is required'}), 400
+        
+        text = data.get('text')
+        if text is None and 'edits' not in data:
+            return jsonify({'error': 'Text or edits are required'}), 400
+        if text is not None and not isinstance(text, str):
+            return jsonify({'error': 'Text must be a string'}), 400
+        if text is not None and len(text) > 50000:
+            return jsonify({'error': 'Text too long (maximum 50,000 characters)'}), 400
+        
+        # Document state belongs to the signed-in user, or to this browser session
+        owner = session.get('user_id')
+        if not owner:
+            owner = session.setdefault('proofread_owner', uuid.uuid4().hex)
+        
+        try:
+            result = run_async(incremental_proofreader.proofread(
+                owner, doc_id, text=text, edits=data.get('edits'), version=data.get('version'),
+                options=with_budget(data)))
+        except StaleDocument as e:
+            return jsonify({'error': str(e), 'resync': True, 'success': False}), 409
+        except ValueError as e:
+            return jsonify({'error': str(e), 'success': False}), 400
+        return jsonify(result)
+        
+    except Exception as e:
+        logger.error(f"Incremental proofread endpoint error: {e}")
+        return jsonify({'error': str(e), 'success': False}), 500
+
+
 @ai_bp.route('/translate', methods=['POST'])
 def translate():
     """Translate text endpoint"""
@@ -113,7 +238,7 @@ def translate():
         if len(text) < 1:
             return jsonify({'error': 'Text too short'}), 400
         
-        result = run_async(ai_processor.translate(text, target_lang))
+        result = run_async(ai_processor.translate(text, target_lang, with_budget(data)))
         return jsonify(result)
         
     except Exception as e:
@@ -130,7 +255,7 @@ def generate_alt_text():
         context = data.get('context', '')
         current_alt = data.get('currentAlt', '')
         
-        result = run_async(ai_processor.generate_alt_text(context, current_alt))
+        result = run_async(ai_processor.generate_alt_text(context, current_alt, with_budget(data)))
         return jsonify(result)
         
     except Exception as e:
@@ -151,7 +276,10 @@ def eli5():
         if len(text) < 10:
             return jsonify({'error': 'Text too short'}), 400
         
-        result = run_async(ai_processor.eli5(text))
+        if wants_stream(data):
+            return stream_response('eli5', text, with_budget(data))
+        
+        result = run_async(ai_processor.eli5(text, with_budget(data)))
         return jsonify(result)
         
     except Exception as e:
@@ -192,6 +320,7 @@ def generate_quiz():
         options = {
             'num_questions': data.get('num_questions', 5)
         }
+        options = with_budget(data, options)
         
         result = run_async(ai_processor.generate_quiz(text, options))
         return jsonify(result)
@@ -201,11 +330,57 @@ def generate_quiz():
         return jsonify({'error': str(e), 'success': False}), 500
 
 
+@ai_bp.route('/batch', methods=['POST'])
+def batch():
+    """Run several AI jobs in one request"""
+    try:
+        data = request.get_json()
+        
+        if not data or not isinstance(data.get('jobs'), list):
+            return jsonify({'error': 'Jobs list is required'}), 400
+        
+        jobs = data['jobs']
+        if not jobs:
+            return jsonify({'error': 'Jobs list is empty'}), 400
+        
+        if len(jobs) > BATCH_MAX_JOBS:
+            return jsonify({'error': f'Too many jobs (maximum {BATCH_MAX_JOBS})'}), 400
+        
+        try:
+            concurrency = max(1, int(data.get('concurrency') or batch_executor.concurrency))
+        except (TypeError, ValueError):
+            return jsonify({'error': 'Invalid concurrency'}), 400
+        
+        if data.get('stream'):
+            # NDJSON: one line per job, in completion order
+            def generate():
+                for index, result in runtime.iterate(batch_executor.stream(jobs, concurrency)):
+                    yield json.dumps({'index': index, **result}) + '\n'
+            
+            return Response(stream_with_context(generate()), mimetype='application/x-ndjson')
+        
+        results = run_async(batch_executor.run(jobs, concurrency))
+        return jsonify({'success': True, 'results': results})
+        
+    except Exception as e:
+        logger.error(f"Batch endpoint error: {e}")
+        return jsonify({'error': str(e), 'success': False}), 500
+
+
 @ai_bp.route('/status', methods=['GET'])
 def status():
     """Check AI service status"""
     return jsonify({
         'status': 'online',
         'gemini_available': ai_processor.gemini_available,
-        'methods': ['summarize', 'rewrite', 'proofread', 'translate', 'generate-alt-text', 'eli5', 'side-by-side-translate', 'generate-quiz']
+        'cache': ai_processor.cache.stats(),
+        'coalescing': ai_processor.flights.stats(),
+        'runtime': runtime.stats(),
+        'upstream': ai_processor.client.stats(),
+        'backends': ai_processor.router.stats(),
+        'analytics': analytics_tracker.ingestor.stats(),
+        'language_detection': language_identifier.stats(),
+        'proofread_documents': incremental_proofreader.stats(),
+        'dependencies': lazy.stats(),
+        'methods': ['summarize', 'rewrite', 'proofread', 'translate', 'generate-alt-text', 'eli5', 'side-by-side-translate', 'generate-quiz', 'batch']
     })
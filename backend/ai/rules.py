@@ -0,0 +1,129 @@
+"""
+ContextGuard Backend - Rewrite Rules
+Precompiled single-pass substitution engine for the heuristic rewrite/simplify paths
+"""
+
+import os
+import re
+import json
+import logging
+from functools import lru_cache
+from typing import Dict
+
+logger = logging.getLogger(__name__)
+
+# Built-in rule packs: phrase -> replacement, matched case-insensitively on word boundaries
+TONE_RULES = {
+    'formal': {
+        "don't": "do not", "can't": "cannot",
+        "won't": "will not", "it's": "it is",
+        "that's": "that is", "I'm": "I am"
+    },
+    'friendly': {
+        "do not": "don't", "cannot": "can't",
+        "will not": "won't", "it is": "it's",
+        "that is": "that's", "I am": "I'm"
+    }
+}
+
+READING_LEVEL_RULES = {
+    'basic': {
+        'utilize': 'use',
+        'commence': 'start',
+        'terminate': 'end',
+        'approximately': 'about',
+        'consequently': 'so',
+        'therefore': 'so',
+        'however': 'but',
+        'nevertheless': 'but',
+        'additionally': 'also',
+        'furthermore': 'also'
+    }
+}
+
+
+def _lookup_key(phrase: str) -> str:
+    """Canonical form used to map a matched phrase back to its replacement"""
+    return ' '.join(phrase.replace('’', "'").lower().split())
+
+
+def match_case(source: str, replacement: str) -> str:
+    """Carry the capitalisation of the matched text over to its replacement"""
+    if len(source) > 1 and source.isupper():
+        return replacement.upper()
+    if source[:1].isupper():
+        return replacement[:1].upper() + replacement[1:]
+    return replacement
+
+
+class RuleEngine:
+    """All substitutions of a rule pack compiled into one alternation regex"""
+
+    def __init__(self, rules: Dict[str, str]):
+        self.replacements = {_lookup_key(phrase): replacement for phrase, replacement in rules.items()}
+
+        if not self.replacements:
+            self.pattern = None
+            return
+
+        # Longest phrases first so "do not" wins over a shorter overlapping rule
+        alternatives = []
+        for phrase in sorted(self.replacements, key=len, reverse=True):
+            escaped = re.escape(phrase).replace("'", "['’]")
+            alternatives.append(re.sub(r'(?:\\ )+', r'\\s+', escaped))
+        self.pattern = re.compile(r'\b(?:' + '|'.join(alternatives) + r')\b', re.IGNORECASE)
+
+    def _substitute(self, match) -> str:
+        source = match.group(0)
+        return match_case(source, self.replacements[_lookup_key(source)])
+
+    def apply(self, text: str) -> str:
+        if self.pattern is None:
+            return text
+        return self.pattern.sub(self._substitute, text)
+
+
+def load_rule_packs(directory: str):
+    """
+    Merge JSON rule packs from a directory into the built-in ones.
+    Files are named tone-<name>.json or reading-level-<name>.json and hold
+    a phrase -> replacement object; unreadable or malformed packs are logged and skipped.
+    """
+    for filename in sorted(os.listdir(directory)):
+        if not filename.endswith('.json'):
+            continue
+
+        name = filename[:-len('.json')]
+        if name.startswith('tone-'):
+            packs, pack_name = TONE_RULES, name[len('tone-'):]
+        elif name.startswith('reading-level-'):
+            packs, pack_name = READING_LEVEL_RULES, name[len('reading-level-'):]
+        else:
+            continue
+
+        try:
+            with open(os.path.join(directory, filename), encoding='utf-8') as f:
+                rules = json.load(f)
+            if not isinstance(rules, dict) or not all(
+                    isinstance(phrase, str) and phrase.strip() and isinstance(replacement, str)
+                    for phrase, replacement in rules.items()):
+                raise ValueError('expected an object mapping non-empty phrases to strings')
+            packs.setdefault(pack_name, {}).update(rules)
+            logger.info(f"Loaded rule pack {filename} ({len(rules)} rules)")
+        except (OSError, ValueError) as e:
+            logger.warning(f"Failed to load rule pack {filename}: {e}")
+
+    get_engine.cache_clear()
+
+
+@lru_cache(maxsize=32)
+def get_engine(tone: str = None, reading_level: str = None) -> RuleEngine:
+    """Compiled engine for a tone/reading level combination, built once and reused"""
+    rules = {}
+    rules.update(READING_LEVEL_RULES.get(reading_level, {}))
+    rules.update(TONE_RULES.get(tone, {}))
+    return RuleEngine(rules)
+
+
+if os.getenv('RULE_PACKS_DIR') and os.path.isdir(os.getenv('RULE_PACKS_DIR')):
+    load_rule_packs(os.getenv('RULE_PACKS_DIR'))
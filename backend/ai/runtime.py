@@ -0,0 +1,87 @@
+"""
+ContextGuard Backend - Async Runtime
+Shared event loop and bounded thread pool for AI work
+"""
+
+import os
+import asyncio
+import logging
+import functools
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, AsyncIterator, Awaitable, Callable, Iterator
+
+from backend.lazy import ProcessLocal
+
+logger = logging.getLogger(__name__)
+
+
+class AsyncRuntime:
+    """
+    One long-lived event loop running in a background thread.
+    Request threads submit coroutines to it instead of spinning up a loop per
+    request, so awaiting upstream calls never pins more than the calling thread,
+    and blocking SDK calls are offloaded to a bounded thread pool.
+    """
+
+    def __init__(self, max_workers: int = 64):
+        self.max_workers = max_workers
+        self._loop = ProcessLocal(self._start)
+
+    def _start(self) -> asyncio.AbstractEventLoop:
+        loop = asyncio.new_event_loop()
+        loop.set_default_executor(ThreadPoolExecutor(max_workers=self.max_workers,
+                                                      thread_name_prefix='ai-offload'))
+        threading.Thread(target=self._run_loop, args=(loop,), name='ai-event-loop', daemon=True).start()
+        logger.info(f"AI runtime started with {self.max_workers} offload threads")
+        return loop
+
+    def _ensure_started(self) -> asyncio.AbstractEventLoop:
+        return self._loop.get()
+
+    @staticmethod
+    def _run_loop(loop: asyncio.AbstractEventLoop):
+        asyncio.set_event_loop(loop)
+        loop.run_forever()
+
+    @property
+    def loop(self) -> asyncio.AbstractEventLoop:
+        return self._ensure_started()
+
+    def run(self, coro: Awaitable, timeout: float = None) -> Any:
+        """
+        Run a coroutine on the shared loop and block the calling thread for its result.
+        The calling (request) thread stays busy until then, so the server's thread count
+        bounds how many requests can be in flight per worker.
+        """
+        future = asyncio.run_coroutine_threadsafe(coro, self._ensure_started())
+        return future.result(timeout)
+
+    def iterate(self, agen: AsyncIterator) -> Iterator:
+        """Consume an async generator on the shared loop from a synchronous caller"""
+        loop = self._ensure_started()
+        try:
+            while True:
+                try:
+                    yield asyncio.run_coroutine_threadsafe(agen.__anext__(), loop).result()
+                except StopAsyncIteration:
+                    return
+        finally:
+            asyncio.run_coroutine_threadsafe(agen.aclose(), loop).result()
+
+    async def offload(self, func: Callable, *args, **kwargs) -> Any:
+        """Run a blocking callable on the bounded thread pool"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, functools.partial(func, *args, **kwargs))
+
+    def stats(self) -> dict:
+        loop = self._loop.current()
+        return {
+            'running': loop is not None,
+            'max_workers': self.max_workers,
+            'pending_tasks': len(asyncio.all_tasks(loop)) if loop else 0
+        }
+
+
+# Global instance
+runtime = AsyncRuntime(max_workers=int(os.getenv('AI_MAX_CONCURRENCY', 64)))
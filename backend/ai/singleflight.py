@@ -0,0 +1,52 @@
+"""
+ContextGuard Backend - Request Coalescing
+Concurrent identical AI requests share one in-flight upstream call
+"""
+
+import asyncio
+import logging
+from typing import Awaitable, Callable, Dict
+
+logger = logging.getLogger(__name__)
+
+
+class SingleFlight:
+    """
+    Deduplicate concurrent calls by key.
+    The first caller starts the work as a task; callers arriving while it runs
+    await the same task. Work is shielded, so one caller disconnecting does not
+    cancel it for the others.
+    """
+
+    def __init__(self):
+        self._inflight: Dict[str, asyncio.Task] = {}
+        self.executed = 0
+        self.coalesced = 0
+
+    async def do(self, key: str, factory: Callable[[], Awaitable]):
+        loop = asyncio.get_running_loop()
+        task = self._inflight.get(key)
+
+        if task is not None and task.get_loop() is loop:
+            self.coalesced += 1
+        else:
+            task = loop.create_task(factory())
+            self._inflight[key] = task
+            self.executed += 1
+            task.add_done_callback(lambda finished: self._forget(key, finished))
+
+        return await asyncio.shield(task)
+
+    def _forget(self, key: str, task: asyncio.Task):
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        # Mark the outcome as retrieved even if every waiter went away
+        if not task.cancelled():
+            task.exception()
+
+    def stats(self) -> Dict:
+        return {
+            'executed': self.executed,
+            'coalesced': self.coalesced,
+            'in_flight': len(self._inflight)
+        }
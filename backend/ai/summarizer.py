@@ -0,0 +1,256 @@
+"""
+ContextGuard Backend - Extractive Summarizer
+Index-based TF-IDF and TextRank sentence scoring for the offline summary path
+"""
+
+import os
+import re
+import math
+import heapq
+import logging
+from functools import lru_cache
+from typing import Dict, FrozenSet, List
+
+from backend.lazy import lazy
+
+logger = logging.getLogger(__name__)
+
+
+def _load_nltk():
+    """Import NLTK and fetch its tokenizer/stop word data if missing"""
+    import nltk
+
+    # Download NLTK data if not present (skip in serverless)
+    if not os.environ.get('VERCEL'):
+        for resource, package in (('tokenizers/punkt', 'punkt'), ('corpora/stopwords', 'stopwords')):
+            try:
+                nltk.data.find(resource)
+            except LookupError:
+                try:
+                    nltk.download(package, quiet=True)
+                except Exception:
+                    pass
+    return nltk
+
+
+nltk_resource = lazy('nltk', _load_nltk)
+
+WORD_RE = re.compile(r'\w+')
+SENTENCE_RE = re.compile(r'[^.!?]+(?:[.!?]+|$)')
+
+# Basic English stop words, used when the NLTK corpus is unavailable
+BASIC_STOP_WORDS = frozenset({
+    'a', 'an', 'the', 'is', 'are', 'was', 'were', 'be', 'been',
+    'being', 'have', 'has', 'had', 'do', 'does', 'did', 'will',
+    'would', 'could', 'should', 'may', 'might', 'must', 'can',
+    'of', 'at', 'by', 'for', 'with', 'about', 'against', 'between',
+    'into', 'through', 'during', 'before', 'after', 'above', 'below',
+    'to', 'from', 'up', 'down', 'in', 'out', 'on', 'off', 'over',
+    'under', 'again', 'further', 'then', 'once', 'here', 'there',
+    'when', 'where', 'why', 'how', 'all', 'both', 'each', 'few',
+    'more', 'most', 'other', 'some', 'such', 'no', 'nor', 'not',
+    'only', 'own', 'same', 'so', 'than', 'too', 'very', 's', 't',
+    'just', 'don', 'now', 'and', 'but', 'or', 'if', 'because', 'as',
+    'until', 'while', 'that', 'this', 'these', 'those', 'i', 'you',
+    'he', 'she', 'it', 'we', 'they', 'them', 'their', 'what', 'which'
+})
+
+LENGTH_SENTENCES = {'short': 2, 'medium': 3, 'long': 5}
+
+
+@lru_cache(maxsize=1)
+def get_stop_words() -> FrozenSet[str]:
+    """Stop words, resolved once per process"""
+    nltk = nltk_resource.get()
+    if nltk is not None:
+        try:
+            from nltk.corpus import stopwords
+            return frozenset(stopwords.words('english'))
+        except LookupError:
+            pass
+    return BASIC_STOP_WORDS
+
+
+def split_sentences(text: str) -> List[str]:
+    """Split text into sentences with NLTK when its data is installed, else a regex"""
+    nltk = nltk_resource.get()
+    if nltk is not None:
+        try:
+            return nltk.sent_tokenize(text)
+        except LookupError:
+            pass
+    return [s.strip() for s in SENTENCE_RE.findall(text) if s.strip()]
+
+
+class TermSentenceMatrix:
+    """
+    Sparse term-sentence matrix built from a single tokenization pass.
+    rows[i] maps term id -> count for sentence i; df[t] is the document frequency of term t.
+    """
+
+    __slots__ = ('rows', 'df', 'vocab', 'lengths')
+
+    def __init__(self, sentences: List[str], stop_words: FrozenSet[str]):
+        self.vocab: Dict[str, int] = {}
+        self.df: List[int] = []
+        self.rows: List[Dict[int, int]] = []
+        self.lengths: List[int] = []
+
+        vocab = self.vocab
+        df = self.df
+        for sentence in sentences:
+            row: Dict[int, int] = {}
+            for word in WORD_RE.findall(sentence.lower()):
+                if word in stop_words:
+                    continue
+                term = vocab.get(word)
+                if term is None:
+                    term = vocab[word] = len(df)
+                    df.append(0)
+                if term in row:
+                    row[term] += 1
+                else:
+                    row[term] = 1
+                    df[term] += 1
+            self.rows.append(row)
+            self.lengths.append(sum(row.values()))
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    def idf(self) -> List[float]:
+        n = len(self.rows)
+        return [math.log((1 + n) / (1 + d)) + 1.0 for d in self.df]
+
+
+class ExtractiveSummarizer:
+    """Pick the highest-scoring sentences and return them in document order"""
+
+    def __init__(self, position_weight: float = 0.1, textrank_iterations: int = 30,
+                 textrank_damping: float = 0.85, textrank_window: int = 8,
+                 textrank_max_sentences: int = 2000):
+        self.position_weight = position_weight
+        self.textrank_iterations = textrank_iterations
+        self.textrank_damping = textrank_damping
+        # Each sentence links to at most this many later sentences per shared term,
+        # keeping the graph linear in the number of tokens instead of O(df^2)
+        self.textrank_window = textrank_window
+        # Larger documents run TextRank over the best TF-IDF candidates only
+        self.textrank_max_sentences = textrank_max_sentences
+
+    def score_tfidf(self, matrix: TermSentenceMatrix) -> List[float]:
+        idf = matrix.idf()
+        scores = []
+        for row, length in zip(matrix.rows, matrix.lengths):
+            if not length:
+                scores.append(0.0)
+                continue
+            weight = sum(count * idf[term] for term, count in row.items())
+            scores.append(weight / math.sqrt(length))
+        return scores
+
+    def score_textrank(self, matrix: TermSentenceMatrix) -> List[float]:
+        n = len(matrix)
+        if not n:
+            return []
+        idf = matrix.idf()
+
+        # Inverted index term -> sentences, skipping terms in most sentences
+        max_df = max(2, n // 2)
+        postings: Dict[int, List[int]] = {}
+        for i, row in enumerate(matrix.rows):
+            for term in row:
+                if matrix.df[term] <= max_df:
+                    postings.setdefault(term, []).append(i)
+
+        # Sparse similarity graph from shared terms
+        window = self.textrank_window
+        edges: List[Dict[int, float]] = [{} for _ in range(n)]
+        for term, sentences in postings.items():
+            count = len(sentences)
+            if count < 2:
+                continue
+            weight = idf[term]
+            for a in range(count):
+                i = sentences[a]
+                for b in range(a + 1, min(a + 1 + window, count)):
+                    j = sentences[b]
+                    edges[i][j] = edges[i].get(j, 0.0) + weight
+                    edges[j][i] = edges[j].get(i, 0.0) + weight
+
+        norms = [math.log(length + 1) + 1.0 for length in matrix.lengths]
+        for i, neighbours in enumerate(edges):
+            for j in neighbours:
+                neighbours[j] /= norms[i] + norms[j]
+        out_weight = [sum(neighbours.values()) for neighbours in edges]
+
+        damping = self.textrank_damping
+        base = (1.0 - damping) / n
+        scores = [1.0 / n] * n
+        for _ in range(self.textrank_iterations):
+            new_scores = [base] * n
+            for i, neighbours in enumerate(edges):
+                if not out_weight[i]:
+                    continue
+                share = damping * scores[i] / out_weight[i]
+                for j, weight in neighbours.items():
+                    new_scores[j] += share * weight
+            delta = sum(abs(a - b) for a, b in zip(new_scores, scores))
+            scores = new_scores
+            if delta < 1e-6:
+                break
+
+        return [score * n for score in scores]
+
+    def rank(self, sentences: List[str], method: str = 'tfidf') -> List[float]:
+        """Score every sentence; higher is more representative"""
+        stop_words = get_stop_words()
+        matrix = TermSentenceMatrix(sentences, stop_words)
+        n = len(sentences)
+
+        if method != 'textrank':
+            scores = self.score_tfidf(matrix)
+        elif n <= self.textrank_max_sentences:
+            scores = self.score_textrank(matrix)
+        else:
+            tfidf = self.score_tfidf(matrix)
+            candidates = sorted(heapq.nlargest(self.textrank_max_sentences, range(n), key=tfidf.__getitem__))
+            subset = TermSentenceMatrix([sentences[i] for i in candidates], stop_words)
+            scores = [0.0] * n
+            for i, score in zip(candidates, self.score_textrank(subset)):
+                scores[i] = score
+
+        # Earlier sentences get a small bonus, as lead sentences tend to carry the topic
+        if self.position_weight and n:
+            mean = (sum(scores) / n) or 1.0
+            scores = [s + self.position_weight * mean * (n - i) / n for i, s in enumerate(scores)]
+        return scores
+
+    def select(self, sentences: List[str], num_sentences: int, method: str = 'tfidf') -> List[int]:
+        """Indexes of the top sentences, in original order; repeated sentences are picked once"""
+        scores = self.rank(sentences, method)
+        heap = [(-score, i) for i, score in enumerate(scores)]
+        heapq.heapify(heap)
+
+        top = []
+        seen = set()
+        while heap and len(top) < num_sentences:
+            _, i = heapq.heappop(heap)
+            normalized = ' '.join(WORD_RE.findall(sentences[i].lower()))
+            if normalized in seen:
+                continue
+            seen.add(normalized)
+            top.append(i)
+        return sorted(top)
+
+    def summarize(self, text: str, length: str = 'medium', method: str = 'tfidf') -> str:
+        sentences = split_sentences(text)
+        if len(sentences) <= 3:
+            return text
+
+        num_sentences = min(LENGTH_SENTENCES.get(length, 3), len(sentences))
+        return ' '.join(sentences[i] for i in self.select(sentences, num_sentences, method))
+
+
+# Global instance
+extractive_summarizer = ExtractiveSummarizer()
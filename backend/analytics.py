@@ -3,55 +3,49 @@ ContextGuard Backend - Analytics Module
 Track usage statistics for users
 """
 
-from datetime import datetime, timedelta
+from datetime import date, datetime, timedelta
 from typing import Dict, List
+import os
+import time
 import logging
+import threading
+
+from backend.analytics_store import AnalyticsStore, UsageEvent, create_store
+from backend.analytics_ingest import AnalyticsIngestor
 
 logger = logging.getLogger(__name__)
 
+# Leaderboard windows: days of activity counted, None for all time
+LEADERBOARD_WINDOWS = {'all': None, 'daily': 1, 'weekly': 7}
+
 
 class AnalyticsTracker:
     """Track user analytics and usage statistics"""
     
-    def __init__(self):
-        # In production, use Redis or database
-        # For now, using in-memory storage
-        self.user_stats = {}
+    def __init__(self, store: AnalyticsStore = None, leaderboard_ttl: float = None,
+                 leaderboard_size: int = None):
+        # SQLite when ANALYTICS_DB_PATH is set (shared by all workers), otherwise in-memory
+        self.store = store or create_store()
+        self.ingestor = AnalyticsIngestor.from_env(self.store)
+        # Windowed leaderboards are materialized and refreshed at most every leaderboard_ttl seconds
+        self.leaderboard_ttl = leaderboard_ttl if leaderboard_ttl is not None else \
+            float(os.getenv('ANALYTICS_LEADERBOARD_TTL', 60))
+        self.leaderboard_size = leaderboard_size or int(os.getenv('ANALYTICS_LEADERBOARD_SIZE', 1000))
+        self._boards = {}
+        self._boards_lock = threading.Lock()
     
     def track_action(self, user_id: str, action: str, word_count: int):
         """Track a user action"""
-        if user_id not in self.user_stats:
-            self.user_stats[user_id] = {
-                'actions': [],
-                'total_words': 0,
-                'total_actions': 0,
-                'actions_by_type': {},
-                'first_use': datetime.now(),
-                'last_use': datetime.now()
-            }
-        
-        stats = self.user_stats[user_id]
-        
-        # Record action
-        stats['actions'].append({
-            'type': action,
-            'word_count': word_count,
-            'timestamp': datetime.now()
-        })
-        
-        # Update totals
-        stats['total_words'] += word_count
-        stats['total_actions'] += 1
-        stats['last_use'] = datetime.now()
-        
-        # Update action counts
-        if action not in stats['actions_by_type']:
-            stats['actions_by_type'][action] = 0
-        stats['actions_by_type'][action] += 1
+        self.store.append([UsageEvent(user_id, action, word_count, datetime.now())])
+    
+    def enqueue_action(self, user_id: str, action: str, word_count: int) -> bool:
+        """Record an action asynchronously; safe to call from request handlers"""
+        return self.ingestor.submit(UsageEvent(user_id, action, word_count, datetime.now()))
     
     def get_user_stats(self, user_id: str) -> Dict:
         """Get statistics for a user"""
-        if user_id not in self.user_stats:
+        stats = self.store.get_user(user_id)
+        if stats is None:
             return {
                 'total_words': 0,
                 'total_actions': 0,
@@ -61,14 +55,9 @@ class AnalyticsTracker:
                 'level': 'Beginner'
             }
         
-        stats = self.user_stats[user_id]
-        
         # Calculate time saved (estimate: 30 seconds per 100 words)
         time_saved_minutes = (stats['total_words'] / 100) * 0.5
         
-        # Calculate streak days
-        streak_days = self._calculate_streak(stats['actions'])
-        
         # Determine user level
         level = self._determine_level(stats['total_actions'])
         
@@ -77,33 +66,12 @@ class AnalyticsTracker:
             'total_actions': stats['total_actions'],
             'time_saved': round(time_saved_minutes, 1),
             'actions_by_type': stats['actions_by_type'],
-            'streak_days': streak_days,
+            'streak_days': stats['streak_days'],
             'level': level,
             'first_use': stats['first_use'].strftime('%Y-%m-%d'),
             'last_use': stats['last_use'].strftime('%Y-%m-%d')
         }
     
-    def _calculate_streak(self, actions: List[Dict]) -> int:
-        """Calculate consecutive days of usage"""
-        if not actions:
-            return 0
-        
-        # Get unique dates
-        dates = sorted(set(action['timestamp'].date() for action in actions), reverse=True)
-        
-        if not dates:
-            return 0
-        
-        # Count consecutive days
-        streak = 1
-        for i in range(len(dates) - 1):
-            if (dates[i] - dates[i + 1]).days == 1:
-                streak += 1
-            else:
-                break
-        
-        return streak
-    
     def _determine_level(self, total_actions: int) -> str:
         """Determine user level based on actions"""
         if total_actions < 10:
@@ -115,23 +83,44 @@ class AnalyticsTracker:
         else:
             return 'Expert'
     
-    def get_leaderboard(self, limit: int = 10) -> List[Dict]:
-        """Get top users by actions"""
-        leaderboard = []
-        
-        for user_id, stats in self.user_stats.items():
-            leaderboard.append({
-                'user_id': user_id[:8] + '...',  # Anonymize
-                'total_actions': stats['total_actions'],
-                'total_words': stats['total_words'],
-                'level': self._determine_level(stats['total_actions'])
-            })
-        
-        # Sort by total actions
-        leaderboard.sort(key=lambda x: x['total_actions'], reverse=True)
-        
-        return leaderboard[:limit]
-
+    def get_leaderboard(self, limit: int = 10, offset: int = 0, window: str = 'all') -> List[Dict]:
+        """Get top users by actions, all time or over the daily/weekly window"""
+        if window not in LEADERBOARD_WINDOWS:
+            raise ValueError(f"Unknown leaderboard window: {window}")
+        
+        if window == 'all' or offset + limit > self.leaderboard_size:
+            since = self._window_start(window)
+            entries = self.store.get_top_users(limit, offset, since)
+        else:
+            entries = self._materialized(window)[offset:offset + limit]
+        
+        return [
+            {
+                'rank': offset + position + 1,
+                'user_id': entry['user_id'][:8] + '...',  # Anonymize
+                'total_actions': entry['total_actions'],
+                'total_words': entry['total_words'],
+                'level': self._determine_level(entry['total_actions'])
+            }
+            for position, entry in enumerate(entries)
+        ]
+    
+    def _window_start(self, window: str):
+        days = LEADERBOARD_WINDOWS[window]
+        return date.today() - timedelta(days=days - 1) if days else None
+    
+    def _materialized(self, window: str) -> List[Dict]:
+        """Top leaderboard_size entries for a window, recomputed once the TTL lapses"""
+        since = self._window_start(window)
+        with self._boards_lock:
+            cached = self._boards.get(window)
+            if cached and cached[0] == since and time.monotonic() - cached[1] < self.leaderboard_ttl:
+                return cached[2]
+        
+        board = self.store.get_top_users(self.leaderboard_size, 0, since)
+        with self._boards_lock:
+            self._boards[window] = (since, time.monotonic(), board)
+        return board
 
 # Global instance
 analytics_tracker = AnalyticsTracker()
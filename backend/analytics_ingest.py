@@ -0,0 +1,157 @@
+"""
+ContextGuard Backend - Analytics Ingestion
+Bounded in-process queue with a background worker that batches events into the store
+"""
+
+import os
+import time
+import queue
+import atexit
+import logging
+import threading
+from typing import Dict, List
+
+from backend.analytics_store import AnalyticsStore, UsageEvent
+from backend.lazy import ProcessLocal
+
+logger = logging.getLogger(__name__)
+
+# What submit() does when the queue is full
+DROP_NEW = 'drop_new'          # discard the incoming event
+DROP_OLDEST = 'drop_oldest'    # evict the oldest queued event to make room
+BLOCK = 'block'                # wait up to block_timeout for room, then discard
+DROP_POLICIES = (DROP_NEW, DROP_OLDEST, BLOCK)
+
+
+class AnalyticsIngestor:
+    """
+    Decouple event recording from the request path.
+    submit() only enqueues; a daemon thread drains the queue in batches of up to
+    batch_size, or whatever arrived within flush_interval, and appends them to the store.
+    """
+
+    def __init__(self, store: AnalyticsStore, max_queue: int = 10000, batch_size: int = 500,
+                 flush_interval: float = 1.0, policy: str = DROP_NEW, block_timeout: float = 0.05):
+        if policy not in DROP_POLICIES:
+            raise ValueError(f"Unknown drop policy: {policy}")
+        self.store = store
+        self.max_queue = max_queue
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.policy = policy
+        self.block_timeout = block_timeout
+
+        self.enqueued = 0
+        self.dropped = 0
+        self.written = 0
+        self.failed = 0
+        self.batches = 0
+        # Counters are bumped from every request thread; += on an attribute is not atomic
+        self._counts_lock = threading.Lock()
+
+        self._queue = ProcessLocal(self._start)
+        atexit.register(self.flush)
+
+    def _start(self) -> queue.Queue:
+        events = queue.Queue(maxsize=self.max_queue)
+        threading.Thread(target=self._run, args=(events,), name='analytics-ingest', daemon=True).start()
+        return events
+
+    def submit(self, event: UsageEvent) -> bool:
+        """Enqueue an event without touching the store; False if it was dropped"""
+        accepted = self._enqueue(self._queue.get(), event)
+        with self._counts_lock:
+            if accepted:
+                self.enqueued += 1
+            else:
+                self.dropped += 1
+        return accepted
+
+    def _enqueue(self, events: queue.Queue, event: UsageEvent) -> bool:
+        try:
+            if self.policy == BLOCK:
+                events.put(event, timeout=self.block_timeout)
+            else:
+                events.put_nowait(event)
+            return True
+        except queue.Full:
+            if self.policy != DROP_OLDEST:
+                return False
+        try:
+            events.get_nowait()
+            events.task_done()
+        except queue.Empty:
+            pass
+        else:
+            with self._counts_lock:
+                self.dropped += 1
+        try:
+            events.put_nowait(event)
+            return True
+        except queue.Full:
+            return False
+
+    def _run(self, events: queue.Queue):
+        while True:
+            batch = [events.get()]
+            deadline = time.monotonic() + self.flush_interval
+            while len(batch) < self.batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(events.get(timeout=remaining))
+                except queue.Empty:
+                    break
+            self._write(batch)
+            for _ in batch:
+                events.task_done()
+
+    def _write(self, batch: List[UsageEvent]):
+        try:
+            self.store.append(batch)
+            with self._counts_lock:
+                self.written += len(batch)
+                self.batches += 1
+        except Exception as e:
+            with self._counts_lock:
+                self.failed += len(batch)
+            logger.error(f"Failed to write {len(batch)} analytics events: {e}")
+
+    def flush(self, timeout: float = 5.0) -> bool:
+        """Wait until everything queued so far has been written; False on timeout"""
+        events = self._queue.current()
+        if events is None:
+            return True
+        deadline = time.monotonic() + timeout
+        while events.unfinished_tasks:
+            if time.monotonic() >= deadline:
+                return False
+            time.sleep(0.01)
+        return True
+
+    def stats(self) -> Dict:
+        events = self._queue.current()
+        with self._counts_lock:
+            return {
+                'policy': self.policy,
+                'queued': events.qsize() if events is not None else 0,
+                'max_queue': self.max_queue,
+                'enqueued': self.enqueued,
+                'dropped': self.dropped,
+                'written': self.written,
+                'failed': self.failed,
+                'batches': self.batches
+            }
+
+    @classmethod
+    def from_env(cls, store: AnalyticsStore) -> 'AnalyticsIngestor':
+        """Build the ingestor from ANALYTICS_* environment variables"""
+        return cls(
+            store,
+            max_queue=int(os.getenv('ANALYTICS_QUEUE_SIZE', 10000)),
+            batch_size=int(os.getenv('ANALYTICS_BATCH_SIZE', 500)),
+            flush_interval=float(os.getenv('ANALYTICS_FLUSH_INTERVAL', 1.0)),
+            policy=os.getenv('ANALYTICS_DROP_POLICY', DROP_NEW),
+            block_timeout=float(os.getenv('ANALYTICS_BLOCK_TIMEOUT', 0.05))
+        )
@@ -0,0 +1,437 @@
+"""
+ContextGuard Backend - Analytics Storage
+Append-only usage event log with pre-aggregated per-user/per-day rollups
+"""
+
+import os
+import abc
+import sqlite3
+import heapq
+import logging
+import threading
+from array import array
+from datetime import date, datetime
+from typing import Callable, Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class UsageEvent(NamedTuple):
+    """One tracked action"""
+    user_id: str
+    action: str
+    word_count: int
+    timestamp: datetime
+
+
+def advance_streak(last_day: Optional[int], streak: int, day: int,
+                   is_active: Callable[[int], bool]) -> Tuple[int, int]:
+    """
+    Fold one active day (a date ordinal) into (last_day, streak), where streak is the
+    run of consecutive active days ending at last_day.
+    Late events are handled too: a day just before the current run extends it, and
+    is_active() lets the run absorb earlier days it now connects to.
+    """
+    if last_day is None:
+        return day, 1
+    if day > last_day:
+        return day, (streak + 1 if day == last_day + 1 else 1)
+    if day == last_day - streak:
+        streak += 1
+        while is_active(day - 1):
+            day -= 1
+            streak += 1
+    return last_day, streak
+
+
+class UserSummary:
+    """Running totals for one user; day_counts[i] is the action count on first_day + i"""
+
+    __slots__ = ('total_actions', 'total_words', 'actions_by_type', 'first_use', 'last_use',
+                 'first_day', 'last_day', 'streak', 'day_counts')
+
+    def __init__(self, timestamp: datetime):
+        self.total_actions = 0
+        self.total_words = 0
+        self.actions_by_type: Dict[str, int] = {}
+        self.first_use = timestamp
+        self.last_use = timestamp
+        self.first_day = timestamp.toordinal()
+        self.last_day = None
+        self.streak = 0
+        self.day_counts = array('I')
+
+    def _bucket(self, day: int) -> int:
+        if day < self.first_day:
+            self.day_counts = array('I', [0]) * (self.first_day - day) + self.day_counts
+            self.first_day = day
+        index = day - self.first_day
+        if index >= len(self.day_counts):
+            self.day_counts.extend(array('I', [0]) * (index + 1 - len(self.day_counts)))
+        return index
+
+    def count_on(self, day: int) -> int:
+        index = day - self.first_day
+        return self.day_counts[index] if 0 <= index < len(self.day_counts) else 0
+
+    def add(self, event: 'UsageEvent'):
+        self.total_actions += 1
+        self.total_words += event.word_count
+        self.actions_by_type[event.action] = self.actions_by_type.get(event.action, 0) + 1
+        self.first_use = min(self.first_use, event.timestamp)
+        self.last_use = max(self.last_use, event.timestamp)
+
+        day = event.timestamp.toordinal()
+        index = self._bucket(day)
+        first_of_day = self.day_counts[index] == 0
+        self.day_counts[index] += 1
+        if first_of_day:
+            self.last_day, self.streak = advance_streak(
+                self.last_day, self.streak, day, lambda d: self.count_on(d) > 0
+            )
+
+
+class AnalyticsStore(abc.ABC):
+    """
+    Storage backend interface.
+    append() records events and updates rollups; the read methods only touch rollups,
+    so their cost does not depend on how many events a user has produced.
+    """
+
+    @abc.abstractmethod
+    def append(self, events: Iterable[UsageEvent]):
+        """Record events and fold them into the rollups"""
+
+    @abc.abstractmethod
+    def get_user(self, user_id: str) -> Optional[Dict]:
+        """
+        Totals for one user: total_actions, total_words, actions_by_type,
+        first_use, last_use, last_active_day, streak_days
+        """
+
+    @abc.abstractmethod
+    def get_daily_counts(self, user_id: str, since: date) -> Dict[date, int]:
+        """Actions per active day from `since` onwards"""
+
+    @abc.abstractmethod
+    def count_active_users(self, since: date) -> int:
+        """Distinct users with activity from `since` onwards"""
+
+    @abc.abstractmethod
+    def get_top_users(self, limit: int, offset: int = 0, since: date = None) -> List[Dict]:
+        """
+        Users ordered by actions (ties by user_id): user_id, total_actions, total_words.
+        With `since`, only activity from that day onwards counts.
+        """
+
+
+class MemoryStore(AnalyticsStore):
+    """
+    Single-process store keeping a UserSummary per user, never the raw events.
+    Appends are O(1) per event. Top-K reads pick the K largest totals with a heap
+    (O(U log K)) and reuse that ranking until the next append; per-user counts for
+    the last `recent_days` days back windowed rankings.
+    """
+
+    def __init__(self, recent_days: int = 7):
+        self.users: Dict[str, UserSummary] = {}
+        self.recent_days = recent_days
+        # Top of the all-time ranking as (-total_actions, user_id), cut at _ranked_depth
+        self._ranked: Optional[List[Tuple[int, str]]] = None
+        self._ranked_depth = 0
+        self._recent: Dict[int, Dict[str, List[int]]] = {}
+        self._lock = threading.Lock()
+
+    def append(self, events: Iterable[UsageEvent]):
+        with self._lock:
+            for event in events:
+                summary = self.users.get(event.user_id)
+                if summary is None:
+                    summary = self.users[event.user_id] = UserSummary(event.timestamp)
+                summary.add(event)
+                self._add_recent(event)
+            self._ranked = None
+
+    def _add_recent(self, event: UsageEvent):
+        day = event.timestamp.toordinal()
+        newest = max(self._recent, default=day)
+        if day <= newest - self.recent_days:
+            return
+        counts = self._recent.setdefault(day, {}).setdefault(event.user_id, [0, 0])
+        counts[0] += 1
+        counts[1] += event.word_count
+        if day > newest:
+            for old in [d for d in self._recent if d <= day - self.recent_days]:
+                del self._recent[old]
+
+    def get_user(self, user_id: str) -> Optional[Dict]:
+        with self._lock:
+            summary = self.users.get(user_id)
+            if summary is None:
+                return None
+            return {
+                'total_words': summary.total_words,
+                'total_actions': summary.total_actions,
+                'actions_by_type': dict(summary.actions_by_type),
+                'first_use': summary.first_use,
+                'last_use': summary.last_use,
+                'last_active_day': date.fromordinal(summary.last_day),
+                'streak_days': summary.streak
+            }
+
+    def get_daily_counts(self, user_id: str, since: date) -> Dict[date, int]:
+        with self._lock:
+            summary = self.users.get(user_id)
+            if summary is None:
+                return {}
+            start = max(since.toordinal(), summary.first_day)
+            end = summary.first_day + len(summary.day_counts)
+            return {date.fromordinal(day): summary.count_on(day)
+                    for day in range(start, end) if summary.count_on(day)}
+
+    def count_active_users(self, since: date) -> int:
+        with self._lock:
+            if since.toordinal() < min(self._recent, default=0):
+                # Older than the retained window; fall back to each user's last active day
+                return sum(1 for s in self.users.values() if s.last_day >= since.toordinal())
+            active = set()
+            for day, users in self._recent.items():
+                if day >= since.toordinal():
+                    active.update(users)
+            return len(active)
+
+    def get_top_users(self, limit: int, offset: int = 0, since: date = None) -> List[Dict]:
+        with self._lock:
+            if since is None:
+                depth = offset + limit
+                if self._ranked is None or self._ranked_depth < depth:
+                    self._ranked = heapq.nsmallest(
+                        depth, ((-summary.total_actions, user_id) for user_id, summary in self.users.items())
+                    )
+                    self._ranked_depth = depth
+                return [
+                    {'user_id': user_id, 'total_actions': -actions,
+                     'total_words': self.users[user_id].total_words}
+                    for actions, user_id in self._ranked[offset:depth]
+                ]
+
+            # Windows are bounded by recent_days, so this only touches recently active users
+            totals: Dict[str, List[int]] = {}
+            for day, users in self._recent.items():
+                if day < since.toordinal():
+                    continue
+                for user_id, (actions, words) in users.items():
+                    entry = totals.setdefault(user_id, [0, 0])
+                    entry[0] += actions
+                    entry[1] += words
+        ranked = sorted(totals.items(), key=lambda item: (-item[1][0], item[0]))
+        return [
+            {'user_id': user_id, 'total_actions': actions, 'total_words': words}
+            for user_id, (actions, words) in ranked[offset:offset + limit]
+        ]
+
+
+class SQLiteStore(AnalyticsStore):
+    """
+    SQLite (WAL) store shared by every worker process on the host.
+    Events and rollups are written in the same transaction; user_totals carries the
+    running streak so reads never scan history.
+    """
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS events (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            user_id TEXT NOT NULL,
+            action TEXT NOT NULL,
+            word_count INTEGER NOT NULL,
+            ts TEXT NOT NULL
+        );
+        CREATE TABLE IF NOT EXISTS user_totals (
+            user_id TEXT PRIMARY KEY,
+            total_actions INTEGER NOT NULL,
+            total_words INTEGER NOT NULL,
+            first_use TEXT NOT NULL,
+            last_use TEXT NOT NULL,
+            last_day INTEGER,
+            streak INTEGER NOT NULL DEFAULT 0
+        );
+        CREATE TABLE IF NOT EXISTS user_daily (
+            user_id TEXT NOT NULL,
+            day INTEGER NOT NULL,
+            action TEXT NOT NULL,
+            actions INTEGER NOT NULL,
+            words INTEGER NOT NULL,
+            PRIMARY KEY (user_id, day, action)
+        );
+        CREATE TABLE IF NOT EXISTS user_actions (
+            user_id TEXT NOT NULL,
+            action TEXT NOT NULL,
+            actions INTEGER NOT NULL,
+            PRIMARY KEY (user_id, action)
+        );
+        DROP INDEX IF EXISTS idx_user_totals_actions;
+        CREATE INDEX IF NOT EXISTS idx_user_totals_rank ON user_totals (total_actions DESC, user_id);
+        CREATE INDEX IF NOT EXISTS idx_user_daily_day ON user_daily (day);
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._local = threading.local()
+        self._conn().executescript(self.SCHEMA)
+
+    def _conn(self) -> sqlite3.Connection:
+        # sqlite3 connections are not shareable across threads; keep one per thread
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            # Autocommit mode; append() manages its own transaction
+            conn = sqlite3.connect(self.path, timeout=10, isolation_level=None)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            self._local.conn = conn
+        return conn
+
+    def append(self, events: Iterable[UsageEvent]):
+        events = list(events)
+        if not events:
+            return
+
+        conn = self._conn()
+        # IMMEDIATE takes the write lock up front so the read-modify-write of
+        # user_totals cannot interleave with another worker
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            self._append(conn, events)
+            conn.execute('COMMIT')
+        except Exception:
+            conn.execute('ROLLBACK')
+            raise
+
+    def _append(self, conn: sqlite3.Connection, events: List[UsageEvent]):
+        conn.executemany(
+            'INSERT INTO events (user_id, action, word_count, ts) VALUES (?, ?, ?, ?)',
+            [(e.user_id, e.action, e.word_count, e.timestamp.isoformat(timespec='seconds')) for e in events]
+        )
+
+        by_user: Dict[str, List[UsageEvent]] = {}
+        for event in events:
+            by_user.setdefault(event.user_id, []).append(event)
+
+        for user_id, user_events in by_user.items():
+            row = conn.execute(
+                'SELECT total_actions, total_words, first_use, last_use, last_day, streak '
+                'FROM user_totals WHERE user_id = ?', (user_id,)
+            ).fetchone()
+            if row is None:
+                first = user_events[0].timestamp
+                total_actions, total_words, first_use, last_use, last_day, streak = 0, 0, first, first, None, 0
+            else:
+                total_actions, total_words, first_use, last_use, last_day, streak = row
+                first_use, last_use = datetime.fromisoformat(first_use), datetime.fromisoformat(last_use)
+
+            def is_active(day: int) -> bool:
+                return conn.execute(
+                    'SELECT 1 FROM user_daily WHERE user_id = ? AND day = ? LIMIT 1', (user_id, day)
+                ).fetchone() is not None
+
+            for event in user_events:
+                day = event.timestamp.toordinal()
+                first_of_day = not is_active(day)
+                conn.execute(
+                    """INSERT INTO user_daily (user_id, day, action, actions, words)
+                       VALUES (?, ?, ?, 1, ?)
+                       ON CONFLICT (user_id, day, action) DO UPDATE SET
+                           actions = actions + 1,
+                           words = words + excluded.words""",
+                    (user_id, day, event.action, event.word_count)
+                )
+                conn.execute(
+                    """INSERT INTO user_actions (user_id, action, actions) VALUES (?, ?, 1)
+                       ON CONFLICT (user_id, action) DO UPDATE SET actions = actions + 1""",
+                    (user_id, event.action)
+                )
+                if first_of_day:
+                    last_day, streak = advance_streak(last_day, streak, day, is_active)
+
+                total_actions += 1
+                total_words += event.word_count
+                first_use = min(first_use, event.timestamp)
+                last_use = max(last_use, event.timestamp)
+
+            conn.execute(
+                """INSERT INTO user_totals
+                       (user_id, total_actions, total_words, first_use, last_use, last_day, streak)
+                   VALUES (?, ?, ?, ?, ?, ?, ?)
+                   ON CONFLICT (user_id) DO UPDATE SET
+                       total_actions = excluded.total_actions,
+                       total_words = excluded.total_words,
+                       first_use = excluded.first_use,
+                       last_use = excluded.last_use,
+                       last_day = excluded.last_day,
+                       streak = excluded.streak""",
+                (user_id, total_actions, total_words, first_use.isoformat(timespec='seconds'),
+                 last_use.isoformat(timespec='seconds'), last_day, streak)
+            )
+
+    def get_user(self, user_id: str) -> Optional[Dict]:
+        conn = self._conn()
+        row = conn.execute(
+            'SELECT total_actions, total_words, first_use, last_use, last_day, streak '
+            'FROM user_totals WHERE user_id = ?', (user_id,)
+        ).fetchone()
+        if row is None:
+            return None
+
+        by_type = conn.execute(
+            'SELECT action, actions FROM user_actions WHERE user_id = ?', (user_id,)
+        ).fetchall()
+        return {
+            'total_actions': row[0],
+            'total_words': row[1],
+            'actions_by_type': dict(by_type),
+            'first_use': datetime.fromisoformat(row[2]),
+            'last_use': datetime.fromisoformat(row[3]),
+            'last_active_day': date.fromordinal(row[4]),
+            'streak_days': row[5]
+        }
+
+    def get_daily_counts(self, user_id: str, since: date) -> Dict[date, int]:
+        rows = self._conn().execute(
+            'SELECT day, SUM(actions) FROM user_daily WHERE user_id = ? AND day >= ? GROUP BY day ORDER BY day',
+            (user_id, since.toordinal())
+        ).fetchall()
+        return {date.fromordinal(day): count for day, count in rows}
+
+    def count_active_users(self, since: date) -> int:
+        row = self._conn().execute(
+            'SELECT COUNT(DISTINCT user_id) FROM user_daily WHERE day >= ?', (since.toordinal(),)
+        ).fetchone()
+        return row[0]
+
+    def get_top_users(self, limit: int, offset: int = 0, since: date = None) -> List[Dict]:
+        if since is None:
+            # Walks idx_user_totals_rank, reading only offset + limit rows
+            rows = self._conn().execute(
+                'SELECT user_id, total_actions, total_words FROM user_totals '
+                'ORDER BY total_actions DESC, user_id LIMIT ? OFFSET ?',
+                (limit, offset)
+            ).fetchall()
+        else:
+            rows = self._conn().execute(
+                'SELECT user_id, SUM(actions) AS total, SUM(words) FROM user_daily WHERE day >= ? '
+                'GROUP BY user_id ORDER BY total DESC, user_id LIMIT ? OFFSET ?',
+                (since.toordinal(), limit, offset)
+            ).fetchall()
+        return [{'user_id': r[0], 'total_actions': r[1], 'total_words': r[2]} for r in rows]
+
+
+def create_store() -> AnalyticsStore:
+    """SQLite store when ANALYTICS_DB_PATH is set, otherwise in-memory"""
+    db_path = os.getenv('ANALYTICS_DB_PATH')
+    if db_path:
+        try:
+            store = SQLiteStore(db_path)
+            logger.info(f"Analytics stored in {db_path}")
+            return store
+        except sqlite3.Error as e:
+            logger.error(f"Analytics database unavailable, falling back to memory: {e}")
+    return MemoryStore()
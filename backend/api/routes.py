@@ -3,14 +3,55 @@ ContextGuard Backend - API Routes
 General API endpoints
 """
 
-from flask import Blueprint, request, jsonify, send_file
+from flask import Blueprint, Response, request, jsonify, send_file, stream_with_context, url_for
+from datetime import date
+import os
 import logging
-import io
-from ..export import export_manager
+import time
+from ..export import EXPORT_FORMATS, export_manager, normalize_format, safe_filename
+from ..export_jobs import export_jobs, DONE
+from ..analytics import analytics_tracker
+from .. import metrics
 
 api_bp = Blueprint('api', __name__)
 logger = logging.getLogger(__name__)
 
+EXPORT_BULK_MAX_ITEMS = int(os.getenv('EXPORT_BULK_MAX_ITEMS', 200))
+
+
+def export_content_from(data):
+    """The exportable fields of one request item"""
+    return {
+        'action': data.get('action', 'Unknown'),
+        'original': data.get('original', ''),
+        'result': data.get('result', ''),
+        'metadata': data.get('metadata', {})
+    }
+
+
+def bulk_contents_from(data):
+    """Validated items and default format of a bulk export request; raises ValueError"""
+    items = data.get('items')
+    if not isinstance(items, list):
+        raise ValueError('Items list is required')
+    if not items:
+        raise ValueError('Items list is empty')
+    if len(items) > EXPORT_BULK_MAX_ITEMS:
+        raise ValueError(f'Too many items (maximum {EXPORT_BULK_MAX_ITEMS})')
+    
+    default_format = normalize_format(data.get('format', 'markdown'))
+    if not default_format:
+        raise ValueError(f"Unsupported format: {data.get('format')}")
+    
+    contents = []
+    for index, item in enumerate(items):
+        if not isinstance(item, dict):
+            raise ValueError(f'Item {index} must be an object')
+        if item.get('format') and not normalize_format(item['format']):
+            raise ValueError(f"Item {index}: unsupported format: {item['format']}")
+        contents.append({**export_content_from(item), 'format': item.get('format')})
+    return contents, default_format
+
 
 @api_bp.route('/ping', methods=['GET'])
 def ping():
@@ -31,11 +72,13 @@ def version():
 @api_bp.route('/stats', methods=['GET'])
 def stats():
     """Get service statistics"""
-    # In production, you'd track actual usage stats
+    totals = metrics.totals()
     return jsonify({
-        'total_requests': 0,
-        'active_users': 0,
-        'uptime': '100%'
+        'total_requests': totals['requests'],
+        'server_errors': totals['errors'],
+        'active_users': analytics_tracker.store.count_active_users(date.today()),
+        'uptime_seconds': int(time.time() - metrics.STARTED_AT),
+        'metrics_scope': 'all workers' if metrics.multiprocess_enabled() else 'this worker'
     })
 
 
@@ -48,56 +91,131 @@ def export_content():
         if not data:
             return jsonify({'error': 'No data provided'}), 400
         
-        export_format = data.get('format', 'markdown').lower()
-        content = {
-            'action': data.get('action', 'Unknown'),
-            'original': data.get('original', ''),
-            'result': data.get('result', ''),
-            'metadata': data.get('metadata', {})
-        }
+        requested = data.get('format', 'markdown')
+        export_format = normalize_format(requested)
+        if not export_format:
+            return jsonify({'error': f'Unsupported format: {requested.lower()}'}), 400
         
-        if export_format == 'markdown' or export_format == 'md':
-            md_content = export_manager.export_markdown(content)
-            buffer = io.BytesIO(md_content.encode('utf-8'))
-            return send_file(
-                buffer,
-                as_attachment=True,
-                download_name=f'contextguard_export_{content["action"]}.md',
-                mimetype='text/markdown'
-            )
+        content = export_content_from(data)
+        extension, mimetype = EXPORT_FORMATS[export_format]
+        download_name = f'contextguard_export_{safe_filename(content["action"])}.{extension}'
         
-        elif export_format == 'pdf':
-            pdf_buffer = export_manager.export_pdf(content)
+        if export_format == 'pdf':
             return send_file(
-                pdf_buffer,
+                export_manager.export_pdf(content),
                 as_attachment=True,
-                download_name=f'contextguard_export_{content["action"]}.pdf',
-                mimetype='application/pdf'
+                download_name=download_name,
+                mimetype=mimetype
             )
         
-        elif export_format == 'json':
-            json_content = export_manager.export_json(content)
-            buffer = io.BytesIO(json_content.encode('utf-8'))
-            return send_file(
-                buffer,
-                as_attachment=True,
-                download_name=f'contextguard_export_{content["action"]}.json',
-                mimetype='application/json'
-            )
+        # Text formats are encoded and sent chunk by chunk
+        return Response(
+            stream_with_context(export_manager.iter_entry(content, export_format)),
+            mimetype=mimetype,
+            headers={'Content-Disposition': f'attachment; filename={download_name}'}
+        )
+    
+    except Exception as e:
+        logger.error(f"Export error: {e}")
+        return jsonify({'error': str(e)}), 500
+
+
+@api_bp.route('/export/bulk', methods=['POST'])
+def export_bulk():
+    """Export many results as a streamed ZIP archive, or one NDJSON stream for format=ndjson"""
+    try:
+        data = request.get_json()
         
-        elif export_format == 'txt' or export_format == 'text':
-            txt_content = export_manager.export_txt(content)
-            buffer = io.BytesIO(txt_content.encode('utf-8'))
-            return send_file(
-                buffer,
-                as_attachment=True,
-                download_name=f'contextguard_export_{content["action"]}.txt',
-                mimetype='text/plain'
-            )
+        if not data:
+            return jsonify({'error': 'No data provided'}), 400
+        
+        try:
+            contents, default_format = bulk_contents_from(data)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
         
+        extension, mimetype = export_manager.bulk_output(default_format)
+        return Response(
+            stream_with_context(export_manager.iter_bulk(contents, default_format)),
+            mimetype=mimetype,
+            headers={'Content-Disposition': f'attachment; filename=contextguard_export.{extension}'}
+        )
+    
+    except Exception as e:
+        logger.error(f"Bulk export error: {e}")
+        return jsonify({'error': str(e)}), 500
+
+
+def job_response(job):
+    """Public view of an export job"""
+    view = {
+        'job_id': job['id'],
+        'status': job['status'],
+        'kind': job['kind'],
+        'format': job['format'],
+        'status_url': url_for('api.export_job_status', job_id=job['id'])
+    }
+    if job['status'] == DONE:
+        view['size'] = job.get('size')
+        view['download_url'] = url_for('api.export_job_download', job_id=job['id'])
+    if job.get('error'):
+        view['error'] = job['error']
+    return view
+
+
+@api_bp.route('/export/jobs', methods=['POST'])
+def create_export_job():
+    """Queue an export (single result, or a ZIP when 'items' is given) in the worker pool"""
+    try:
+        data = request.get_json()
+        
+        if not data:
+            return jsonify({'error': 'No data provided'}), 400
+        
+        if 'items' in data:
+            try:
+                contents, default_format = bulk_contents_from(data)
+            except ValueError as e:
+                return jsonify({'error': str(e)}), 400
+            payload = {'kind': 'bulk', 'items': contents, 'format': default_format}
+            download_name = 'contextguard_export'
         else:
-            return jsonify({'error': f'Unsupported format: {export_format}'}), 400
+            export_format = normalize_format(data.get('format', 'markdown'))
+            if not export_format:
+                return jsonify({'error': f"Unsupported format: {data.get('format')}"}), 400
+            content = export_content_from(data)
+            payload = {'kind': 'single', 'content': content, 'format': export_format}
+            download_name = f'contextguard_export_{safe_filename(content["action"])}'
+        
+        job = export_jobs.submit(payload, download_name)
+        return jsonify(job_response(job)), 202
     
     except Exception as e:
-        logger.error(f"Export error: {e}")
+        logger.error(f"Export job error: {e}")
         return jsonify({'error': str(e)}), 500
+
+
+@api_bp.route('/export/jobs/<job_id>', methods=['GET'])
+def export_job_status(job_id):
+    """Status of an export job"""
+    job = export_jobs.get(job_id)
+    if job is None:
+        return jsonify({'error': 'Job not found'}), 404
+    return jsonify(job_response(job))
+
+
+@api_bp.route('/export/jobs/<job_id>/download', methods=['GET'])
+def export_job_download(job_id):
+    """Download the output of a finished export job"""
+    job = export_jobs.get(job_id)
+    if job is None:
+        return jsonify({'error': 'Job not found'}), 404
+    if job['status'] != DONE:
+        return jsonify({'error': f"Job is {job['status']}"}), 409
+    
+    if job['kind'] == 'bulk':
+        mimetype = export_manager.bulk_output(job['format'])[1]
+    else:
+        mimetype = EXPORT_FORMATS[job['format']][1]
+    return send_file(export_jobs.output_path(job), as_attachment=True,
+                     download_name=job['download_name'], mimetype=mimetype)
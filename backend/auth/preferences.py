@@ -0,0 +1,99 @@
+"""
+ContextGuard Backend - User Preferences
+Read-through cache in front of the Firestore users collection
+"""
+
+import os
+import sqlite3
+import logging
+from typing import Any, Dict
+
+from backend.ai.cache import LRUCache, ResultCache, SQLiteCache
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_PREFERENCES = {
+    'tone': 'neutral',
+    'readingLevel': 'intermediate',
+    'targetLanguage': 'es'
+}
+
+
+class PreferencesCache:
+    """
+    Preferences by user id, loaded from Firestore on a miss and written through on save.
+    The in-process tier keeps a short TTL; the optional SQLite tier is shared by the
+    workers on the host and is updated on every save, so a change made through one
+    worker reaches the others within the in-process TTL.
+    """
+
+    def __init__(self, cache: ResultCache):
+        self.cache = cache
+        self.reads = 0
+
+    @staticmethod
+    def _key(user_id: str) -> str:
+        return f"prefs:{user_id}"
+
+    @staticmethod
+    def _document(db: Any, user_id: str):
+        return db.collection('users').document(user_id)
+
+    def get(self, db: Any, user_id: str) -> Dict:
+        """Preferences of a user; db is a Firestore client (or the emulator, or a fake)"""
+        key = self._key(user_id)
+        prefs = self.cache.get(key)
+        if prefs is not None:
+            return prefs
+
+        self.reads += 1
+        doc = self._document(db, user_id).get()
+        prefs = doc.to_dict().get('preferences', {}) if doc.exists else dict(DEFAULT_PREFERENCES)
+        self.cache.set(key, prefs)
+        return prefs
+
+    def save(self, db: Any, user_id: str, preferences: Dict, fields: Dict = None):
+        """Write preferences (plus any other document fields) to Firestore, then to the cache"""
+        try:
+            self._document(db, user_id).set({'preferences': preferences, **(fields or {})}, merge=True)
+        except Exception:
+            # The write may or may not have landed; make the next read go to Firestore
+            self.invalidate(user_id)
+            raise
+        # Saves always carry every preference, so the merged document matches this value
+        self.cache.set(self._key(user_id), dict(preferences))
+
+    def invalidate(self, user_id: str):
+        try:
+            self.cache.delete(self._key(user_id))
+        except sqlite3.Error as e:
+            logger.warning(f"Preferences cache invalidation failed: {e}")
+
+    def stats(self) -> Dict:
+        return {**self.cache.stats(), 'firestore_reads': self.reads}
+
+    @classmethod
+    def from_env(cls) -> 'PreferencesCache':
+        """Build the cache from PREFS_CACHE_* environment variables"""
+        enabled = os.getenv('PREFS_CACHE_ENABLED', 'true').lower() == 'true'
+        memory = LRUCache(
+            max_entries=int(os.getenv('PREFS_CACHE_MAX_ENTRIES', 10000)),
+            max_bytes=int(os.getenv('PREFS_CACHE_MAX_BYTES', 4 * 1024 * 1024)),
+            ttl=float(os.getenv('PREFS_CACHE_TTL', 60))
+        )
+
+        shared = None
+        db_path = os.getenv('PREFS_CACHE_DB_PATH')
+        if enabled and db_path:
+            try:
+                shared = SQLiteCache(db_path, ttl=float(os.getenv('PREFS_CACHE_SHARED_TTL', 86400)),
+                                     table='preferences_cache')
+                logger.info(f"Preferences cache shared tier at {db_path}")
+            except sqlite3.Error as e:
+                logger.warning(f"Preferences shared cache unavailable: {e}")
+
+        return cls(ResultCache(memory, shared, enabled=enabled))
+
+
+# Global instance
+preferences_cache = PreferencesCache.from_env()
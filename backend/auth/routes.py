@@ -6,34 +6,52 @@ Handles Firebase auth integration
 import os
 import json
 import logging
+from typing import Any, NamedTuple
 from flask import Blueprint, request, jsonify, session
-import firebase_admin
-from firebase_admin import credentials, auth, firestore
+
+from backend.lazy import lazy
+from backend.auth.preferences import DEFAULT_PREFERENCES, preferences_cache
+from backend.auth.tokens import token_verifier
 
 auth_bp = Blueprint('auth', __name__)
 logger = logging.getLogger(__name__)
 
-# Initialize Firebase Admin SDK
-try:
+
+class Firebase(NamedTuple):
+    """Initialized Firebase Admin handles"""
+    auth: Any
+    firestore: Any
+    db: Any
+
+
+def _init_firebase():
+    """Import and initialize the Firebase Admin SDK; None when not configured"""
     cred_path = os.getenv('FIREBASE_ADMIN_CREDENTIALS', 'firebase-adminsdk.json')
-    if os.path.exists(cred_path):
-        cred = credentials.Certificate(cred_path)
-        firebase_admin.initialize_app(cred)
-        db = firestore.client()
-        logger.info("Firebase initialized successfully")
-    else:
+    if not os.path.exists(cred_path):
         logger.warning(f"Firebase credentials not found at {cred_path}. Auth features disabled.")
-        db = None
-except Exception as e:
-    logger.error(f"Firebase initialization error: {e}")
-    db = None
+        return None
+    
+    import firebase_admin
+    from firebase_admin import credentials, auth, firestore
+    
+    cred = credentials.Certificate(cred_path)
+    firebase_admin.initialize_app(cred)
+    db = firestore.client()
+    logger.info("Firebase initialized successfully")
+    token_verifier.start_key_refresh(auth)
+    return Firebase(auth, firestore, db)
+
+
+# Initialized on the first request that needs it
+firebase = lazy('firebase', _init_firebase)
 
 
 @auth_bp.route('/verify-token', methods=['POST'])
 def verify_token():
     """Verify Firebase ID token"""
     try:
-        if not db:
+        fb = firebase.get()
+        if not fb:
             return jsonify({'error': 'Firebase not configured'}), 503
         
         data = request.get_json()
@@ -42,8 +60,8 @@ def verify_token():
         if not id_token:
             return jsonify({'error': 'Token required'}), 400
         
-        # Verify the token
-        decoded_token = auth.verify_id_token(id_token)
+        # Verify the token (cached until it expires)
+        decoded_token = token_verifier.verify(fb.auth, id_token)
         uid = decoded_token['uid']
         
         # Store user session
@@ -76,29 +94,14 @@ def get_preferences():
         
         if not user_id:
             # Return default preferences for non-logged in users
-            return jsonify({
-                'tone': 'neutral',
-                'readingLevel': 'intermediate',
-                'targetLanguage': 'es'
-            })
+            return jsonify(DEFAULT_PREFERENCES)
         
-        if not db:
+        fb = firebase.get()
+        if not fb:
             return jsonify({'error': 'Firebase not configured'}), 503
         
-        # Get from Firestore
-        doc_ref = db.collection('users').document(user_id)
-        doc = doc_ref.get()
-        
-        if doc.exists:
-            prefs = doc.to_dict().get('preferences', {})
-            return jsonify(prefs)
-        else:
-            # Return defaults
-            return jsonify({
-                'tone': 'neutral',
-                'readingLevel': 'intermediate',
-                'targetLanguage': 'es'
-            })
+        # Cached, falling back to Firestore (defaults when the user has no document)
+        return jsonify(preferences_cache.get(fb.db, user_id))
             
     except Exception as e:
         logger.error(f"Get preferences error: {e}")
@@ -114,7 +117,8 @@ def save_preferences():
         if not user_id:
             return jsonify({'error': 'Not authenticated'}), 401
         
-        if not db:
+        fb = firebase.get()
+        if not fb:
             return jsonify({'error': 'Firebase not configured'}), 503
         
         data = request.get_json()
@@ -135,13 +139,11 @@ def save_preferences():
         if preferences['readingLevel'] not in valid_levels:
             return jsonify({'error': 'Invalid reading level'}), 400
         
-        # Save to Firestore
-        doc_ref = db.collection('users').document(user_id)
-        doc_ref.set({
-            'preferences': preferences,
+        # Save to Firestore and write through to the cache
+        preferences_cache.save(fb.db, user_id, preferences, {
             'email': session.get('email'),
-            'updated_at': firestore.SERVER_TIMESTAMP
-        }, merge=True)
+            'updated_at': fb.firestore.SERVER_TIMESTAMP
+        })
         
         return jsonify({
             'success': True,
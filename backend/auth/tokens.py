@@ -0,0 +1,121 @@
+"""
+ContextGuard Backend - ID Token Verification
+Cache of verified Firebase ID token claims, with background signing-key refresh
+"""
+
+import os
+import time
+import hashlib
+import logging
+import threading
+from typing import Any, Callable, Dict, Optional
+
+from backend.ai.cache import LRUCache
+from backend.lazy import ProcessLocal
+
+logger = logging.getLogger(__name__)
+
+
+def _key_fetcher(auth: Any) -> Optional[Callable[[], Any]]:
+    """
+    Callable that fetches the ID token signing certificates through the same cached
+    HTTP session firebase-admin verifies with, so a refresh lands in its cache.
+    firebase-admin has no public API for this; None when its internals differ.
+    """
+    try:
+        from firebase_admin import _token_gen
+        request = auth._get_client(None)._token_verifier.request
+        url = _token_gen.ID_TOKEN_CERT_URI
+    except (ImportError, AttributeError) as e:
+        logger.warning(f"Signing key prefetch unavailable: {e}")
+        return None
+    return lambda: request(url, method='GET')
+
+
+class TokenVerifier:
+    """
+    Verify ID tokens once and reuse the claims until the token expires.
+    Claims are cached by the SHA-256 of the token, never the token itself, for
+    min(exp - now, max_ttl) seconds; failed verifications are not cached.
+    A daemon thread re-requests the signing certificates every refresh_interval
+    seconds, so once the cached certificates go stale they are re-fetched off the
+    request path (a request can still pay for the fetch within that interval).
+    """
+
+    def __init__(self, cache: LRUCache, max_ttl: float = 3600, refresh_interval: float = 600):
+        self.cache = cache
+        self.max_ttl = max_ttl
+        self.refresh_interval = refresh_interval
+        self.verifications = 0
+        self.key_refreshes = 0
+        self.key_refresh_failures = 0
+        self._auth = None
+        self._refresher = ProcessLocal(self._start_refresh)
+
+    @staticmethod
+    def _key(id_token: str) -> str:
+        return hashlib.sha256(id_token.encode('utf-8')).hexdigest()
+
+    def verify(self, auth: Any, id_token: str) -> Dict:
+        """Claims of a valid token; raises whatever auth.verify_id_token raises"""
+        key = self._key(id_token)
+        claims = self.cache.get(key)
+        if claims is not None:
+            return claims
+
+        self.start_key_refresh(auth)
+        claims = auth.verify_id_token(id_token)
+        self.verifications += 1
+
+        ttl = min(claims.get('exp', 0) - time.time(), self.max_ttl)
+        if ttl > 0:
+            self.cache.set(key, claims, ttl=ttl)
+        return claims
+
+    def start_key_refresh(self, auth: Any):
+        """Prefetch signing keys now and keep them fresh (once per process)"""
+        if self.refresh_interval <= 0:
+            return
+        self._auth = auth
+        self._refresher.get()
+
+    def _start_refresh(self) -> Optional[threading.Thread]:
+        fetch = _key_fetcher(self._auth)
+        if fetch is None:
+            return None
+        thread = threading.Thread(target=self._refresh_keys, args=(fetch,),
+                                  name='token-key-refresh', daemon=True)
+        thread.start()
+        return thread
+
+    def _refresh_keys(self, fetch: Callable[[], Any]):
+        while True:
+            try:
+                fetch()
+                self.key_refreshes += 1
+            except Exception as e:
+                self.key_refresh_failures += 1
+                logger.warning(f"Signing key refresh failed: {e}")
+            time.sleep(self.refresh_interval)
+
+    def stats(self) -> Dict:
+        return {
+            **self.cache.stats(),
+            'verifications': self.verifications,
+            'key_refreshes': self.key_refreshes,
+            'key_refresh_failures': self.key_refresh_failures
+        }
+
+    @classmethod
+    def from_env(cls) -> 'TokenVerifier':
+        """Build the verifier from TOKEN_CACHE_* environment variables"""
+        return cls(
+            LRUCache(max_entries=int(os.getenv('TOKEN_CACHE_MAX_ENTRIES', 10000)),
+                     max_bytes=int(os.getenv('TOKEN_CACHE_MAX_BYTES', 8 * 1024 * 1024))),
+            max_ttl=float(os.getenv('TOKEN_CACHE_MAX_TTL', 3600)),
+            refresh_interval=float(os.getenv('TOKEN_KEYS_REFRESH_INTERVAL', 600))
+        )
+
+
+# Global instance
+token_verifier = TokenVerifier.from_env()
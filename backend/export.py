@@ -4,92 +4,127 @@ Export processed text in various formats
 """
 
 import io
+import re
 import json
+import zipfile
 from datetime import datetime
-from typing import Dict
-from flask import send_file
-from reportlab.lib.pagesizes import letter
-from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer
-from reportlab.lib.units import inch
+from typing import Dict, IO, Iterable, Iterator, Optional
 import logging
 
+from backend.lazy import lazy
+
 logger = logging.getLogger(__name__)
 
+# Export format -> (file extension, MIME type)
+EXPORT_FORMATS = {
+    'markdown': ('md', 'text/markdown'),
+    'pdf': ('pdf', 'application/pdf'),
+    'json': ('json', 'application/json'),
+    'txt': ('txt', 'text/plain'),
+    'ndjson': ('ndjson', 'application/x-ndjson')
+}
+FORMAT_ALIASES = {'md': 'markdown', 'text': 'txt'}
+READ_CHUNK_BYTES = 64 * 1024
+# Large texts are encoded this many characters at a time
+ENCODE_CHUNK_CHARS = 64 * 1024
+FOOTER = 'Generated by ContextGuard - Privacy-first AI Assistant'
+UNSAFE_FILENAME_RE = re.compile(r'[^A-Za-z0-9._-]+')
+
+
+def normalize_format(name: str) -> Optional[str]:
+    """Canonical export format name, or None if unsupported"""
+    name = (name or '').lower()
+    name = FORMAT_ALIASES.get(name, name)
+    return name if name in EXPORT_FORMATS else None
+
+
+def safe_filename(name: str) -> str:
+    """Restrict a name to characters safe in download and archive file names"""
+    return UNSAFE_FILENAME_RE.sub('_', str(name))[:40]
+
+
+def _iter_encoded(text: str) -> Iterator[bytes]:
+    """UTF-8 encode a string in slices so no full-size copy is made"""
+    for start in range(0, len(text), ENCODE_CHUNK_CHARS):
+        yield text[start:start + ENCODE_CHUNK_CHARS].encode('utf-8')
+
+
+def _iter_json_value(value, level: int) -> Iterator[bytes]:
+    """Pretty-printed JSON for one value, streaming long strings in escaped slices"""
+    if isinstance(value, str) and len(value) > ENCODE_CHUNK_CHARS:
+        yield b'"'
+        for start in range(0, len(value), ENCODE_CHUNK_CHARS):
+            piece = json.dumps(value[start:start + ENCODE_CHUNK_CHARS], ensure_ascii=False)
+            yield piece[1:-1].encode('utf-8')
+        yield b'"'
+    else:
+        encoded = json.dumps(value, indent=2, ensure_ascii=False)
+        yield encoded.replace('\n', '\n' + '  ' * level).encode('utf-8')
+
+
+class _ZipSink(io.RawIOBase):
+    """Unseekable sink that collects what ZipFile writes so it can be streamed out"""
+    
+    def __init__(self):
+        super().__init__()
+        self._chunks = []
+    
+    def writable(self) -> bool:
+        return True
+    
+    def write(self, data) -> int:
+        self._chunks.append(bytes(data))
+        return len(data)
+    
+    def drain(self) -> bytes:
+        data = b''.join(self._chunks)
+        self._chunks.clear()
+        return data
+
 
 class ExportManager:
     """Handle text export in various formats"""
     
+    def __init__(self):
+        # ReportLab is imported, and styles/layout built, on the first PDF export
+        self._pdf = lazy('reportlab', self._load_pdf_renderer)
+    
+    @staticmethod
+    def _load_pdf_renderer():
+        from backend.pdf_renderer import PDFRenderer
+        return PDFRenderer.from_env()
+    
+    @property
+    def pdf(self):
+        renderer = self._pdf.get()
+        if renderer is None:
+            raise RuntimeError(f"PDF export unavailable: {self._pdf.error}")
+        return renderer
+    
+    @staticmethod
+    def _stamp() -> str:
+        return datetime.now().strftime('%Y-%m-%d %H:%M')
+    
+    def iter_markdown(self, content: Dict) -> Iterator[bytes]:
+        """Export as Markdown, yielding encoded chunks"""
+        yield (f"# ContextGuard Export\n"
+               f"**Date:** {self._stamp()}\n"
+               f"**Action:** {content.get('action', 'Unknown')}\n\n"
+               f"---\n\n## Original Text\n").encode('utf-8')
+        yield from _iter_encoded(str(content.get('original', 'N/A')))
+        yield b"\n\n---\n\n## Processed Result\n"
+        yield from _iter_encoded(str(content.get('result', 'N/A')))
+        yield f"\n\n---\n\n*{FOOTER}*\n".encode('utf-8')
+    
     def export_markdown(self, content: Dict) -> str:
         """Export as Markdown"""
-        md = f"""# ContextGuard Export
-**Date:** {datetime.now().strftime('%Y-%m-%d %H:%M')}
-**Action:** {content.get('action', 'Unknown')}
-
----
-
-## Original Text
-{content.get('original', 'N/A')}
-
----
-
-## Processed Result
-{content.get('result', 'N/A')}
-
----
-
-*Generated by ContextGuard - Privacy-first AI Assistant*
-"""
-        return md
+        return b''.join(self.iter_markdown(content)).decode('utf-8')
     
-    def export_pdf(self, content: Dict) -> io.BytesIO:
+    def export_pdf(self, content: Dict) -> IO[bytes]:
         """Export as PDF"""
-        buffer = io.BytesIO()
-        
         try:
-            # Create PDF document
-            doc = SimpleDocTemplate(buffer, pagesize=letter)
-            styles = getSampleStyleSheet()
-            story = []
-            
-            # Title
-            title_style = ParagraphStyle(
-                'CustomTitle',
-                parent=styles['Heading1'],
-                fontSize=24,
-                textColor='#667eea'
-            )
-            story.append(Paragraph("ContextGuard Export", title_style))
-            story.append(Spacer(1, 0.2*inch))
-            
-            # Metadata
-            meta_text = f"<b>Date:</b> {datetime.now().strftime('%Y-%m-%d %H:%M')}<br/>"
-            meta_text += f"<b>Action:</b> {content.get('action', 'Unknown')}"
-            story.append(Paragraph(meta_text, styles['Normal']))
-            story.append(Spacer(1, 0.3*inch))
-            
-            # Original text
-            if content.get('original'):
-                story.append(Paragraph("<b>Original Text</b>", styles['Heading2']))
-                story.append(Spacer(1, 0.1*inch))
-                story.append(Paragraph(content['original'], styles['Normal']))
-                story.append(Spacer(1, 0.3*inch))
-            
-            # Processed result
-            story.append(Paragraph("<b>Processed Result</b>", styles['Heading2']))
-            story.append(Spacer(1, 0.1*inch))
-            story.append(Paragraph(content.get('result', 'N/A'), styles['Normal']))
-            story.append(Spacer(1, 0.5*inch))
-            
-            # Footer
-            footer_text = "<i>Generated by ContextGuard - Privacy-first AI Assistant</i>"
-            story.append(Paragraph(footer_text, styles['Normal']))
-            
-            # Build PDF
-            doc.build(story)
-            buffer.seek(0)
-            
-            return buffer
+            # Dated by day so the rendered file can be served from cache all day
+            return self.pdf.render(content, datetime.now().strftime('%Y-%m-%d'))
             
         except Exception as e:
             logger.error(f"PDF export error: {e}")
@@ -99,9 +134,8 @@ class ExportManager:
             buffer.seek(0)
             return buffer
     
-    def export_json(self, content: Dict) -> str:
-        """Export as JSON"""
-        export_data = {
+    def _record(self, content: Dict) -> Dict:
+        return {
             'timestamp': datetime.now().isoformat(),
             'action': content.get('action', 'Unknown'),
             'original': content.get('original', ''),
@@ -109,30 +143,99 @@ class ExportManager:
             'metadata': content.get('metadata', {}),
             'source': 'ContextGuard'
         }
-        
-        return json.dumps(export_data, indent=2, ensure_ascii=False)
+    
+    def iter_json(self, content: Dict) -> Iterator[bytes]:
+        """Export as pretty-printed JSON, yielding encoded chunks"""
+        record = self._record(content)
+        yield b'{'
+        for position, (key, value) in enumerate(record.items()):
+            yield (',\n  ' if position else '\n  ').encode('utf-8') + json.dumps(key).encode('utf-8') + b': '
+            yield from _iter_json_value(value, 1)
+        yield b'\n}'
+    
+    def export_json(self, content: Dict) -> str:
+        """Export as JSON"""
+        return b''.join(self.iter_json(content)).decode('utf-8')
+    
+    def iter_ndjson(self, contents: Iterable[Dict]) -> Iterator[bytes]:
+        """One compact JSON record per line, for multi-record exports"""
+        for content in contents:
+            yield (json.dumps(self._record(content), ensure_ascii=False) + '\n').encode('utf-8')
+    
+    def iter_txt(self, content: Dict) -> Iterator[bytes]:
+        """Export as plain text, yielding encoded chunks"""
+        rule = '=' * 60
+        yield (f"ContextGuard Export\n"
+               f"Date: {self._stamp()}\n"
+               f"Action: {content.get('action', 'Unknown')}\n\n"
+               f"{rule}\n\nORIGINAL TEXT:\n").encode('utf-8')
+        yield from _iter_encoded(str(content.get('original', 'N/A')))
+        yield f"\n\n{rule}\n\nPROCESSED RESULT:\n".encode('utf-8')
+        yield from _iter_encoded(str(content.get('result', 'N/A')))
+        yield f"\n\n{rule}\n\n{FOOTER}\n".encode('utf-8')
     
     def export_txt(self, content: Dict) -> str:
         """Export as plain text"""
-        txt = f"""ContextGuard Export
-Date: {datetime.now().strftime('%Y-%m-%d %H:%M')}
-Action: {content.get('action', 'Unknown')}
-
-{'='*60}
-
-ORIGINAL TEXT:
-{content.get('original', 'N/A')}
-
-{'='*60}
-
-PROCESSED RESULT:
-{content.get('result', 'N/A')}
-
-{'='*60}
-
-Generated by ContextGuard - Privacy-first AI Assistant
-"""
-        return txt
+        return b''.join(self.iter_txt(content)).decode('utf-8')
+    
+    def iter_entry(self, content: Dict, export_format: str) -> Iterator[bytes]:
+        """Encoded export of one result, in pieces"""
+        if export_format == 'pdf':
+            output = self.export_pdf(content)
+            try:
+                while True:
+                    piece = output.read(READ_CHUNK_BYTES)
+                    if not piece:
+                        break
+                    yield piece
+            finally:
+                output.close()
+        elif export_format == 'markdown':
+            yield from self.iter_markdown(content)
+        elif export_format == 'json':
+            yield from self.iter_json(content)
+        elif export_format == 'ndjson':
+            yield from self.iter_ndjson([content])
+        else:
+            yield from self.iter_txt(content)
+    
+    def iter_zip(self, items: Iterable[Dict], default_format: str = 'markdown') -> Iterator[bytes]:
+        """
+        Stream a ZIP archive with one file per item.
+        Each entry is compressed and yielded as it is generated; ZipFile writes data
+        descriptors for the unseekable sink, so the archive is never held in full.
+        """
+        sink = _ZipSink()
+        with zipfile.ZipFile(sink, 'w', compression=zipfile.ZIP_DEFLATED) as archive:
+            for index, content in enumerate(items, 1):
+                export_format = normalize_format(content.get('format') or default_format) or 'markdown'
+                action = safe_filename(content.get('action', 'Unknown'))
+                name = f"{index:03d}_{action}.{EXPORT_FORMATS[export_format][0]}"
+                
+                with archive.open(name, 'w') as entry:
+                    for piece in self.iter_entry(content, export_format):
+                        entry.write(piece)
+                        data = sink.drain()
+                        if data:
+                            yield data
+                # Closing the entry writes its trailing data descriptor
+                data = sink.drain()
+                if data:
+                    yield data
+        # Central directory
+        yield sink.drain()
+    
+    def bulk_output(self, export_format: str):
+        """(extension, MIME type) of a bulk export: NDJSON stays one stream, anything else is zipped"""
+        if export_format == 'ndjson':
+            return EXPORT_FORMATS['ndjson']
+        return 'zip', 'application/zip'
+    
+    def iter_bulk(self, items: Iterable[Dict], export_format: str) -> Iterator[bytes]:
+        """Multi-record export as NDJSON lines or a ZIP with one file per item"""
+        if export_format == 'ndjson':
+            return self.iter_ndjson(items)
+        return self.iter_zip(items, export_format)
 
 
 # Global instance
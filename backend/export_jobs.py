@@ -0,0 +1,190 @@
+"""
+ContextGuard Backend - Export Jobs
+Run heavy exports in a process pool and track them through a shared job directory
+"""
+
+import os
+import re
+import json
+import time
+import uuid
+import logging
+import tempfile
+import threading
+import multiprocessing
+from concurrent.futures import Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Dict, Optional
+
+from backend.export import EXPORT_FORMATS, export_manager
+from backend.lazy import ProcessLocal
+
+logger = logging.getLogger(__name__)
+
+JOB_ID_RE = re.compile(r'^[0-9a-f]{32}$')
+QUEUED, RUNNING, DONE, FAILED = 'queued', 'running', 'done', 'failed'
+
+
+def _write_json(path: str, data: Dict, replace: bool = True):
+    # Write-then-rename so readers in other workers never see a partial file;
+    # with replace=False an existing file is left alone
+    tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(tmp, 'w', encoding='utf-8') as f:
+        json.dump(data, f)
+    if replace:
+        os.replace(tmp, path)
+        return
+    try:
+        os.link(tmp, path)
+    except FileExistsError:
+        pass
+    finally:
+        os.remove(tmp)
+
+
+def _run_job(jobs_dir: str, job: Dict, payload: Dict):
+    """Executed in a pool process: render the export to a file and record the outcome"""
+    status_path = os.path.join(jobs_dir, f"{job['id']}.json")
+    output_path = os.path.join(jobs_dir, job['output'])
+    _write_json(status_path, {**job, 'status': RUNNING, 'started_at': time.time()})
+
+    try:
+        if payload['kind'] == 'bulk':
+            pieces = export_manager.iter_bulk(payload['items'], payload['format'])
+        else:
+            pieces = export_manager.iter_entry(payload['content'], payload['format'])
+
+        tmp = f"{output_path}.tmp"
+        with open(tmp, 'wb') as f:
+            for piece in pieces:
+                f.write(piece)
+        os.replace(tmp, output_path)
+        _write_json(status_path, {**job, 'status': DONE, 'finished_at': time.time(),
+                                  'size': os.path.getsize(output_path)})
+    except Exception as e:
+        logger.error(f"Export job {job['id']} failed: {e}")
+        _write_json(status_path, {**job, 'status': FAILED, 'finished_at': time.time(), 'error': str(e)})
+
+
+class ExportJobManager:
+    """
+    Submit exports to a pool of worker processes so rendering never blocks a web worker.
+    Job state and output live as files in jobs_dir, so any worker on the host can
+    report status or serve the download; finished jobs are purged after ttl seconds.
+    """
+
+    def __init__(self, jobs_dir: str, max_workers: int = None, ttl: float = 3600,
+                 start_method: str = 'spawn'):
+        self.jobs_dir = jobs_dir
+        self.max_workers = max_workers or os.cpu_count() or 2
+        self.ttl = ttl
+        self.start_method = start_method
+        self._submits = 0
+        self._pool = ProcessLocal(self._new_pool)
+        os.makedirs(jobs_dir, exist_ok=True)
+
+    def _new_pool(self) -> Executor:
+        try:
+            # spawn rather than fork: web workers run threads (AI event loop, ingestion)
+            context = multiprocessing.get_context(self.start_method)
+            return ProcessPoolExecutor(max_workers=self.max_workers, mp_context=context)
+        except (OSError, ValueError, NotImplementedError) as e:
+            # e.g. serverless sandboxes without /dev/shm semaphores
+            logger.warning(f"Process pool unavailable ({e}), running export jobs in threads")
+            return ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='export-job')
+
+    def _status_path(self, job_id: str) -> str:
+        return os.path.join(self.jobs_dir, f"{job_id}.json")
+
+    def _discard_pool(self, executor: Executor):
+        """Drop a broken pool so the next submit builds a new one"""
+        self._pool.discard(executor)
+        executor.shutdown(wait=False)
+
+    def _job_finished(self, job: Dict, executor: Executor, future: Future):
+        # _run_job records its own failures; an exception here means the worker died
+        error = future.exception()
+        if error is None:
+            return
+        logger.error(f"Export job {job['id']} lost: {error!r}")
+        status = self.get(job['id']) or {}
+        if status.get('status') not in (DONE, FAILED):
+            _write_json(self._status_path(job['id']), {**job, 'status': FAILED, 'finished_at': time.time(),
+                                                       'error': 'Export worker stopped unexpectedly'})
+        if isinstance(error, BrokenProcessPool):
+            self._discard_pool(executor)
+
+    def submit(self, payload: Dict, download_name: str) -> Dict:
+        """
+        Queue an export. payload is {'kind': 'single', 'content', 'format'} or
+        {'kind': 'bulk', 'items', 'format'}; bulk jobs produce a ZIP, or NDJSON.
+        """
+        job_id = uuid.uuid4().hex
+        if payload['kind'] == 'bulk':
+            extension = export_manager.bulk_output(payload['format'])[0]
+        else:
+            extension = EXPORT_FORMATS[payload['format']][0]
+        job = {
+            'id': job_id,
+            'kind': payload['kind'],
+            'format': payload['format'],
+            'output': f"{job_id}.{extension}",
+            'download_name': f"{download_name}.{extension}",
+            'created_at': time.time()
+        }
+        for attempt in range(2):
+            executor = self._pool.get()
+            try:
+                future = executor.submit(_run_job, self.jobs_dir, job, payload)
+                break
+            except BrokenProcessPool:
+                self._discard_pool(executor)
+                if attempt:
+                    raise
+        # The job may already have started; its own status then takes precedence
+        _write_json(self._status_path(job_id), {**job, 'status': QUEUED}, replace=False)
+        future.add_done_callback(lambda done: self._job_finished(job, executor, done))
+
+        self._submits += 1
+        if self._submits % 50 == 0:
+            self.purge_expired()
+        return {**job, 'status': QUEUED}
+
+    def get(self, job_id: str) -> Optional[Dict]:
+        if not JOB_ID_RE.match(job_id or ''):
+            return None
+        try:
+            with open(self._status_path(job_id), encoding='utf-8') as f:
+                return json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return None
+
+    def output_path(self, job: Dict) -> str:
+        return os.path.join(self.jobs_dir, job['output'])
+
+    def purge_expired(self):
+        """Delete status and output of jobs finished more than ttl seconds ago"""
+        cutoff = time.time() - self.ttl
+        for name in os.listdir(self.jobs_dir):
+            if not name.endswith('.json'):
+                continue
+            job = self.get(name[:-5])
+            if job and job.get('finished_at', float('inf')) < cutoff:
+                for path in (self.output_path(job), self._status_path(job['id'])):
+                    try:
+                        os.remove(path)
+                    except FileNotFoundError:
+                        pass
+
+    @classmethod
+    def from_env(cls) -> 'ExportJobManager':
+        """Build the manager from EXPORT_JOBS_* environment variables"""
+        return cls(
+            jobs_dir=os.getenv('EXPORT_JOBS_DIR') or os.path.join(tempfile.gettempdir(), 'contextguard-export-jobs'),
+            max_workers=int(os.getenv('EXPORT_JOBS_WORKERS', 0)) or None,
+            ttl=float(os.getenv('EXPORT_JOBS_TTL', 3600))
+        )
+
+
+# Global instance
+export_jobs = ExportJobManager.from_env()
@@ -0,0 +1,144 @@
+"""
+ContextGuard Backend - Lazy Initialization
+Heavy optional dependencies loaded on first use, with an opt-in warm-up
+"""
+
+import os
+import time
+import logging
+import threading
+from typing import Any, Callable, Dict, Iterable, List
+
+logger = logging.getLogger(__name__)
+
+_UNSET = object()
+
+
+class LazyResource:
+    """
+    A value produced by `loader` the first time get() is called.
+    Loading happens once per process even under concurrent first use. A loader that
+    raises is logged and remembered as unavailable, so get() returns None from then on.
+    """
+
+    def __init__(self, name: str, loader: Callable[[], Any]):
+        self.name = name
+        self.loader = loader
+        self.load_seconds = None
+        self.error = None
+        self._value = _UNSET
+        self._lock = threading.Lock()
+
+    @property
+    def loaded(self) -> bool:
+        return self._value is not _UNSET
+
+    def get(self) -> Any:
+        if self._value is not _UNSET:
+            return self._value
+
+        with self._lock:
+            if self._value is _UNSET:
+                start = time.perf_counter()
+                try:
+                    value = self.loader()
+                except Exception as e:
+                    value = None
+                    self.error = str(e)
+                    logger.warning(f"{self.name} unavailable: {e}")
+                self.load_seconds = time.perf_counter() - start
+                self._value = value
+                logger.info(f"Loaded {self.name} in {self.load_seconds * 1000:.0f}ms")
+        return self._value
+
+    def set(self, value: Any):
+        """Provide the value directly (e.g. an injected fake), skipping the loader"""
+        with self._lock:
+            self._value = value
+            self.load_seconds = 0.0
+
+    def stats(self) -> Dict:
+        return {
+            'loaded': self.loaded,
+            'available': self.loaded and self._value is not None,
+            'load_ms': round(self.load_seconds * 1000, 1) if self.load_seconds is not None else None,
+            'error': self.error
+        }
+
+
+class ProcessLocal:
+    """
+    A value built by `factory` on first use in each process.
+    Threads, queues and pools do not survive a fork (gunicorn --preload), so a forked
+    child builds its own on first use instead of inheriting the parent's.
+    """
+
+    def __init__(self, factory: Callable[[], Any]):
+        self.factory = factory
+        self._value = None
+        self._pid = None
+        self._lock = threading.Lock()
+
+    def get(self) -> Any:
+        if self._pid == os.getpid():
+            return self._value
+
+        with self._lock:
+            if self._pid != os.getpid():
+                self._value = self.factory()
+                self._pid = os.getpid()
+            return self._value
+
+    def current(self) -> Any:
+        """The value if it was built in this process, else None (without building it)"""
+        return self._value if self._pid == os.getpid() else None
+
+    def discard(self, value: Any):
+        """Forget `value` (e.g. a broken pool) so the next get() builds a new one"""
+        with self._lock:
+            if self._value is value:
+                self._value = None
+                self._pid = None
+
+
+_registry: Dict[str, LazyResource] = {}
+
+
+def lazy(name: str, loader: Callable[[], Any]) -> LazyResource:
+    """Create and register a lazily loaded resource"""
+    resource = LazyResource(name, loader)
+    _registry[name] = resource
+    return resource
+
+
+def warm_up(names: Iterable[str] = None) -> Dict[str, Dict]:
+    """Load the named resources (all registered ones by default) now"""
+    selected = list(_registry) if names is None else [n for n in names if n in _registry]
+    for name in selected:
+        _registry[name].get()
+    return {name: _registry[name].stats() for name in selected}
+
+
+def warm_up_from_env(background: bool = True):
+    """
+    Warm-up hook for long-running servers, driven by LAZY_WARMUP:
+    unset/'0' keeps everything lazy (serverless cold starts), '1'/'all' loads every
+    resource, or a comma-separated list of resource names.
+    """
+    setting = os.getenv('LAZY_WARMUP', '').strip().lower()
+    if setting in ('', '0', 'false', 'no'):
+        return
+    names = None if setting in ('1', 'all', 'true', 'yes') else [n.strip() for n in setting.split(',')]
+
+    if background:
+        threading.Thread(target=warm_up, args=(names,), name='lazy-warmup', daemon=True).start()
+    else:
+        warm_up(names)
+
+
+def resources() -> List[str]:
+    return list(_registry)
+
+
+def stats() -> Dict[str, Dict]:
+    return {name: resource.stats() for name, resource in _registry.items()}
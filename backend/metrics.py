@@ -0,0 +1,180 @@
+"""
+ContextGuard Backend - Metrics
+Prometheus instrumentation for HTTP routes and AI actions
+"""
+
+import os
+import time
+import logging
+import functools
+import threading
+from typing import Dict, Tuple
+
+from flask import Flask, Response, g, request
+
+logger = logging.getLogger(__name__)
+
+try:
+    from prometheus_client import (
+        CONTENT_TYPE_LATEST, REGISTRY, CollectorRegistry, Counter, Histogram, generate_latest, multiprocess
+    )
+    PROMETHEUS_AVAILABLE = True
+except ImportError:
+    PROMETHEUS_AVAILABLE = False
+    logger.warning("prometheus_client not installed, /metrics disabled")
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+INPUT_CHAR_BUCKETS = (100, 500, 1000, 2500, 5000, 10000, 25000, 50000, 100000)
+
+
+class _NullMetric:
+    """Stand-in when prometheus_client is missing"""
+
+    def labels(self, *args, **kwargs):
+        return self
+
+    def inc(self, amount: float = 1):
+        pass
+
+    def observe(self, value: float):
+        pass
+
+
+if PROMETHEUS_AVAILABLE:
+    HTTP_REQUESTS = Counter(
+        'contextguard_http_requests_total', 'HTTP requests', ['method', 'route', 'status']
+    )
+    HTTP_LATENCY = Histogram(
+        'contextguard_http_request_duration_seconds', 'HTTP request latency until the response is returned',
+        ['method', 'route'], buckets=LATENCY_BUCKETS
+    )
+    AI_ACTION_LATENCY = Histogram(
+        'contextguard_ai_action_duration_seconds', 'AIProcessor action latency by serving backend',
+        ['action', 'backend'], buckets=LATENCY_BUCKETS
+    )
+    AI_INPUT_CHARS = Histogram(
+        'contextguard_ai_input_chars', 'AIProcessor input size in characters',
+        ['action'], buckets=INPUT_CHAR_BUCKETS
+    )
+    AI_CACHE_LOOKUPS = Counter(
+        'contextguard_ai_cache_lookups_total', 'AI result cache lookups', ['action', 'result']
+    )
+    AI_ACTION_FAILURES = Counter(
+        'contextguard_ai_action_failures_total', 'AIProcessor actions returning success=False', ['action']
+    )
+    AI_UPSTREAM_CALLS = Counter(
+        'contextguard_ai_upstream_calls_total', 'Upstream model call attempts by outcome', ['action', 'outcome']
+    )
+else:
+    HTTP_REQUESTS = HTTP_LATENCY = AI_ACTION_LATENCY = AI_INPUT_CHARS = _NullMetric()
+    AI_CACHE_LOOKUPS = AI_ACTION_FAILURES = AI_UPSTREAM_CALLS = _NullMetric()
+
+STARTED_AT = time.time()
+
+# Process-local totals so /api/stats has numbers even without prometheus_client
+_local_totals = {'requests': 0, 'errors': 0}
+_local_lock = threading.Lock()
+
+
+def observe_action(action: str, result, seconds: float, input_chars: int, cacheable: bool = True):
+    """Record one AIProcessor call; cached results are attributed to the 'cache' backend"""
+    cached = isinstance(result, dict) and result.get('cached')
+    backend = 'cache' if cached else (result.get('method') if isinstance(result, dict) else None) or 'unknown'
+
+    AI_ACTION_LATENCY.labels(action, backend).observe(seconds)
+    AI_INPUT_CHARS.labels(action).observe(input_chars)
+    if cacheable:
+        AI_CACHE_LOOKUPS.labels(action, 'hit' if cached else 'miss').inc()
+    if isinstance(result, dict) and not result.get('success', True):
+        AI_ACTION_FAILURES.labels(action).inc()
+
+
+def record_upstream(action: str, outcome: str):
+    AI_UPSTREAM_CALLS.labels(action, outcome).inc()
+
+
+def instrumented(action: str, cacheable: bool = True):
+    """Time an async AIProcessor action whose first argument is the input text"""
+    def decorator(func):
+        @functools.wraps(func)
+        async def wrapper(self, text, *args, **kwargs):
+            start = time.perf_counter()
+            result = await func(self, text, *args, **kwargs)
+            observe_action(action, result, time.perf_counter() - start, len(text or ''), cacheable)
+            return result
+        return wrapper
+    return decorator
+
+
+def multiprocess_enabled() -> bool:
+    # With PROMETHEUS_MULTIPROC_DIR set, every gunicorn worker writes its samples to that
+    # directory and a scrape aggregates all of them
+    return PROMETHEUS_AVAILABLE and bool(os.getenv('PROMETHEUS_MULTIPROC_DIR'))
+
+
+def _registry():
+    if multiprocess_enabled():
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        return registry
+    return REGISTRY
+
+
+def render() -> Tuple[bytes, str]:
+    """Prometheus text exposition of all metrics"""
+    return generate_latest(_registry()), CONTENT_TYPE_LATEST
+
+
+def totals() -> Dict:
+    """Request and error totals, across workers when multiprocess mode is on"""
+    if not PROMETHEUS_AVAILABLE:
+        with _local_lock:
+            return dict(_local_totals)
+
+    requests, errors = 0, 0
+    for metric in _registry().collect():
+        if metric.name != 'contextguard_http_requests':
+            continue
+        for sample in metric.samples:
+            if sample.name.endswith('_total'):
+                requests += sample.value
+                if sample.labels.get('status', '').startswith('5'):
+                    errors += sample.value
+    return {'requests': int(requests), 'errors': int(errors)}
+
+
+def mark_process_dead(pid: int):
+    """Called from gunicorn's child_exit hook so dead workers' live data is cleaned up"""
+    if multiprocess_enabled():
+        multiprocess.mark_process_dead(pid)
+
+
+def init_metrics(app: Flask):
+    """Instrument every request of the app and expose GET /metrics"""
+
+    @app.before_request
+    def _start_timer():
+        g.metrics_start = time.perf_counter()
+
+    @app.after_request
+    def _record_request(response):
+        start = g.pop('metrics_start', None)
+        if start is None:
+            return response
+        # Route templates keep label cardinality bounded
+        route = request.url_rule.rule if request.url_rule else 'unmatched'
+        HTTP_REQUESTS.labels(request.method, route, str(response.status_code)).inc()
+        HTTP_LATENCY.labels(request.method, route).observe(time.perf_counter() - start)
+        if not PROMETHEUS_AVAILABLE:
+            with _local_lock:
+                _local_totals['requests'] += 1
+                _local_totals['errors'] += response.status_code >= 500
+        return response
+
+    @app.route('/metrics')
+    def metrics():
+        """Prometheus scrape endpoint"""
+        if not PROMETHEUS_AVAILABLE:
+            return Response('prometheus_client not installed\n', status=503, mimetype='text/plain')
+        body, content_type = render()
+        return Response(body, content_type=content_type)
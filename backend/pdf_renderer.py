@@ -0,0 +1,142 @@
+"""
+ContextGuard Backend - PDF Rendering
+Reusable ReportLab styles and layout with a content-addressed output cache
+"""
+
+import os
+import io
+import re
+import hashlib
+import logging
+import tempfile
+from typing import Dict, List, IO
+from xml.sax.saxutils import escape
+
+from reportlab.lib.pagesizes import letter
+from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+from reportlab.lib.units import inch
+from reportlab.platypus import BaseDocTemplate, Frame, PageTemplate, Paragraph, Spacer
+
+from backend.ai.cache import LRUCache
+from backend.ai.chunking import split_into_chunks
+
+logger = logging.getLogger(__name__)
+
+PARAGRAPH_SPLIT_RE = re.compile(r'\n\s*\n')
+# Very long paragraphs are laid out in pieces of this size so wrapping stays cheap
+MAX_PARAGRAPH_CHARS = 4000
+FOOTER_TEXT = "<i>Generated by ContextGuard - Privacy-first AI Assistant</i>"
+
+
+def text_flowables(text: str, style: ParagraphStyle) -> List[Paragraph]:
+    """One escaped Paragraph per paragraph of plain text, keeping line breaks"""
+    flowables = []
+    for block in PARAGRAPH_SPLIT_RE.split(text.strip()):
+        if not block.strip():
+            continue
+        for chunk in split_into_chunks(block, MAX_PARAGRAPH_CHARS):
+            flowables.append(Paragraph(escape(chunk.text).replace('\n', '<br/>'), style))
+    return flowables
+
+
+class PDFRenderer:
+    """
+    Build export PDFs without per-request setup.
+    Styles and page geometry are created once. Rendered documents are cached by a hash
+    of their content; the date stamp in the body only changes once a day, so a cached
+    PDF is reused for the rest of that day. Output beyond spool_bytes is written to a
+    temporary file rather than held in memory.
+    """
+
+    def __init__(self, cache: LRUCache = None, spool_bytes: int = 1024 * 1024,
+                 max_cached_bytes: int = 2 * 1024 * 1024):
+        self.cache = cache or LRUCache(max_entries=256, max_bytes=32 * 1024 * 1024)
+        self.spool_bytes = spool_bytes
+        self.max_cached_bytes = max_cached_bytes
+
+        sheet = getSampleStyleSheet()
+        self.styles = {
+            'title': ParagraphStyle('ExportTitle', parent=sheet['Heading1'], fontSize=24, textColor='#667eea'),
+            'heading': sheet['Heading2'],
+            'body': sheet['Normal']
+        }
+
+        self.pagesize = letter
+        margin = inch
+        self.frame_bounds = (margin, margin, letter[0] - 2 * margin, letter[1] - 2 * margin)
+
+    def _new_doc(self, output: IO) -> BaseDocTemplate:
+        # Frames carry layout state while a document is built, so each build gets its own
+        doc = BaseDocTemplate(output, pagesize=self.pagesize)
+        frame = Frame(*self.frame_bounds, id='body')
+        doc.addPageTemplates([PageTemplate(id='page', frames=[frame])])
+        return doc
+
+    def _story(self, content: Dict, stamp: str) -> List:
+        styles = self.styles
+        story = [
+            Paragraph("ContextGuard Export", styles['title']),
+            Spacer(1, 0.2 * inch),
+            Paragraph(f"<b>Date:</b> {stamp}<br/>"
+                      f"<b>Action:</b> {escape(str(content.get('action', 'Unknown')))}", styles['body']),
+            Spacer(1, 0.3 * inch)
+        ]
+
+        if content.get('original'):
+            story.append(Paragraph("<b>Original Text</b>", styles['heading']))
+            story.append(Spacer(1, 0.1 * inch))
+            story.extend(text_flowables(str(content['original']), styles['body']))
+            story.append(Spacer(1, 0.3 * inch))
+
+        story.append(Paragraph("<b>Processed Result</b>", styles['heading']))
+        story.append(Spacer(1, 0.1 * inch))
+        story.extend(text_flowables(str(content.get('result') or 'N/A'), styles['body']))
+        story.append(Spacer(1, 0.5 * inch))
+
+        story.append(Paragraph(FOOTER_TEXT, styles['body']))
+        return story
+
+    @staticmethod
+    def cache_key(content: Dict) -> str:
+        digest = hashlib.sha256()
+        for part in (content.get('action', 'Unknown'), content.get('original') or '', content.get('result') or ''):
+            data = str(part).encode('utf-8')
+            digest.update(len(data).to_bytes(8, 'big'))
+            digest.update(data)
+        return digest.hexdigest()
+
+    def render(self, content: Dict, stamp: str) -> IO[bytes]:
+        """Rendered PDF as a readable file object positioned at the start; stamp is the day"""
+        key = f"{self.cache_key(content)}:{stamp}"
+        cached = self.cache.get(key)
+        if cached is not None:
+            return io.BytesIO(cached)
+
+        output = tempfile.SpooledTemporaryFile(max_size=self.spool_bytes)
+        try:
+            self._new_doc(output).build(self._story(content, stamp))
+        except Exception:
+            output.close()
+            raise
+
+        size = output.tell()
+        output.seek(0)
+        if size <= self.max_cached_bytes:
+            self.cache.set(key, output.read())
+            output.seek(0)
+        return output
+
+    def stats(self) -> Dict:
+        return self.cache.stats()
+
+    @classmethod
+    def from_env(cls) -> 'PDFRenderer':
+        """Build the renderer from PDF_* environment variables"""
+        return cls(
+            cache=LRUCache(
+                max_entries=int(os.getenv('PDF_CACHE_MAX_ENTRIES', 256)),
+                max_bytes=int(os.getenv('PDF_CACHE_MAX_BYTES', 32 * 1024 * 1024)),
+                ttl=float(os.getenv('PDF_CACHE_TTL', 3600))
+            ),
+            spool_bytes=int(os.getenv('PDF_SPOOL_BYTES', 1024 * 1024))
+        )
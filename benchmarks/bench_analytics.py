@@ -0,0 +1,74 @@
+"""
+ContextGuard - Analytics tracker benchmark
+Records a long history for one user and times ingestion and stats reads.
+
+Usage: python benchmarks/bench_analytics.py [--actions 1000000] [--days 1095] [--sqlite PATH]
+"""
+
+import os
+import sys
+import time
+import random
+import argparse
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from backend.analytics import AnalyticsTracker
+from backend.analytics_store import MemoryStore, SQLiteStore, UsageEvent
+
+ACTIONS = ['summarize', 'rewrite', 'proofread', 'translate', 'eli5']
+
+
+def make_events(count: int, days: int, seed: int = 42):
+    rng = random.Random(seed)
+    start = datetime.now() - timedelta(days=days)
+    step = timedelta(days=days) / count
+    for i in range(count):
+        yield UsageEvent('bench-user', rng.choice(ACTIONS), rng.randint(20, 800), start + step * i)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--actions', type=int, default=1000000)
+    parser.add_argument('--days', type=int, default=3 * 365)
+    parser.add_argument('--batch', type=int, default=1000)
+    parser.add_argument('--sqlite', help='benchmark SQLiteStore at this path instead of MemoryStore')
+    args = parser.parse_args()
+
+    store = SQLiteStore(args.sqlite) if args.sqlite else MemoryStore()
+    tracker = AnalyticsTracker(store)
+
+    start = time.perf_counter()
+    batch = []
+    for event in make_events(args.actions, args.days):
+        batch.append(event)
+        if len(batch) >= args.batch:
+            store.append(batch)
+            batch = []
+    store.append(batch)
+    ingest_time = time.perf_counter() - start
+
+    reads = 1000
+    start = time.perf_counter()
+    for _ in range(reads):
+        stats = tracker.get_user_stats('bench-user')
+    read_time = (time.perf_counter() - start) / reads
+
+    start = time.perf_counter()
+    for _ in range(reads):
+        tracker.track_action('bench-user', 'summarize', 100)
+    track_time = (time.perf_counter() - start) / reads
+
+    print(f"store:            {type(store).__name__}")
+    print(f"actions:          {stats['total_actions']:,} over {args.days} days (streak {stats['streak_days']})")
+    print(f"ingest:           {ingest_time:.2f}s ({args.actions / ingest_time:,.0f} actions/s)")
+    if isinstance(store, MemoryStore):
+        buckets = store.users['bench-user'].day_counts
+        print(f"day buckets:      {len(buckets)} days, {len(buckets) * buckets.itemsize / 1024:.1f} KiB")
+    print(f"track_action:     {track_time * 1e6:.1f} us")
+    print(f"get_user_stats:   {read_time * 1e6:.1f} us")
+
+
+if __name__ == '__main__':
+    main()
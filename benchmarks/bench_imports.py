@@ -0,0 +1,87 @@
+"""
+ContextGuard - Cold-start import benchmark
+Imports each module in a fresh interpreter and reports its cold-start cost, then the
+cost of warming up every lazily loaded dependency.
+
+Usage: python benchmarks/bench_imports.py [--runs 5] [--modules app backend.export ...]
+"""
+
+import os
+import sys
+import json
+import argparse
+import statistics
+import subprocess
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+DEFAULT_MODULES = [
+    'app',
+    'backend.ai.routes',
+    'backend.ai.processor',
+    'backend.auth.routes',
+    'backend.api.routes',
+    'backend.export',
+    'backend.analytics',
+    # Heavy third-party dependencies, for reference
+    'nltk',
+    'langdetect',
+    'reportlab.platypus',
+    'firebase_admin',
+    'google.generativeai'
+]
+
+IMPORT_SNIPPET = """
+import time, importlib
+start = time.perf_counter()
+importlib.import_module({module!r})
+print(time.perf_counter() - start)
+"""
+
+WARMUP_SNIPPET = """
+import json, app
+from backend import lazy
+print(json.dumps(lazy.warm_up()))
+"""
+
+
+def run(snippet: str) -> subprocess.CompletedProcess:
+    env = dict(os.environ, PYTHONPATH=ROOT, LAZY_WARMUP='0', PYTHONDONTWRITEBYTECODE='1')
+    return subprocess.run([sys.executable, '-c', snippet], cwd=ROOT, env=env,
+                          capture_output=True, text=True)
+
+
+def time_import(module: str, runs: int):
+    samples = []
+    for _ in range(runs):
+        result = run(IMPORT_SNIPPET.format(module=module))
+        if result.returncode != 0:
+            return None, result.stderr.strip().splitlines()[-1]
+        samples.append(float(result.stdout.strip().splitlines()[-1]))
+    return statistics.median(samples), None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--modules', nargs='+', default=DEFAULT_MODULES)
+    args = parser.parse_args()
+
+    print(f"{'module':<24} {'import (median)':>16}")
+    for module in args.modules:
+        seconds, error = time_import(module, args.runs)
+        if error:
+            print(f"{module:<24} {'unavailable':>16}  ({error[:60]})")
+        else:
+            print(f"{module:<24} {seconds * 1000:>14.1f}ms")
+
+    result = run(WARMUP_SNIPPET)
+    if result.returncode == 0:
+        print(f"\n{'lazy resource':<24} {'first use':>16}")
+        for name, stats in json.loads(result.stdout.strip().splitlines()[-1]).items():
+            state = f"{stats['load_ms']:>14.1f}ms" if stats['available'] else f"{'unavailable':>16}"
+            print(f"{name:<24} {state}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,80 @@
+"""
+ContextGuard - Language identification benchmark
+Measures detections/sec on a mixed-language corpus, uncached and cached.
+
+Usage: python benchmarks/bench_langid.py [--texts 2000] [--words 30]
+"""
+
+import os
+import sys
+import time
+import random
+import argparse
+from collections import Counter
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from backend.ai.cache import LRUCache
+from backend.ai.langid import LanguageIdentifier, detector
+
+# A few common words per language; texts are random draws from one list
+WORDS = {
+    'en': 'the people would like to know what this time about because there which their work other'.split(),
+    'es': 'el los que una por para como pero sus tiene cuando también porque trabajo donde hemos'.split(),
+    'fr': 'les des une pour dans qui sur avec pas mais nous vous leur cette aussi travail toujours'.split(),
+    'de': 'die der und nicht das ist mit sich auch auf eine wird werden nach noch wenn zwischen'.split(),
+    'it': 'della che non per una sono questo anche come nella loro quando perché lavoro sempre'.split(),
+    'pt': 'não uma para com mais como mas foi pelo também quando muito trabalho isso sempre'.split(),
+    'ru': 'что это как они его было она если когда только очень работа может время всегда'.split(),
+    'ja': 'これは 日本語 の 文章 です 私 は 東京 に 住んで います 今日 は 天気 が いい'.split(),
+    'ko': '이것은 한국어 문장 입니다 저는 서울에 살고 있습니다 오늘 날씨가 좋습니다'.split(),
+    'ar': 'هذا في من على إلى التي الذي كان عن مع هذه بين كل العمل دائما'.split(),
+    'zh': '这是 中文 句子 我们 今天 工作 时间 因为 所以 他们 可以 没有 什么 已经'.split()
+}
+# Written without spaces between words
+UNSPACED = {'ja', 'zh'}
+
+
+def make_corpus(count: int, words: int, seed: int = 42) -> list:
+    rng = random.Random(seed)
+    corpus = []
+    for _ in range(count):
+        language = rng.choice(list(WORDS))
+        separator = '' if language in UNSPACED else ' '
+        corpus.append((language, separator.join(rng.choice(WORDS[language]) for _ in range(words))))
+    return corpus
+
+
+def run(identifier: LanguageIdentifier, corpus: list):
+    start = time.perf_counter()
+    results = [identifier.detect(text) for _, text in corpus]
+    elapsed = time.perf_counter() - start
+    correct = sum(result['language'] == language for (language, _), result in zip(corpus, results))
+    return elapsed, correct / len(corpus), Counter(result['language'] for result in results)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--texts', type=int, default=2000)
+    parser.add_argument('--words', type=int, default=30)
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    detector.get()
+    print(f"profile load: {(time.perf_counter() - start) * 1000:.0f}ms")
+
+    corpus = make_corpus(args.texts, args.words)
+    identifier = LanguageIdentifier(LRUCache(max_entries=args.texts * 2, ttl=0))
+
+    print(f"{'pass':<10} {'detections/s':>13} {'accuracy':>9}")
+    for label in ('uncached', 'cached'):
+        elapsed, accuracy, _ = run(identifier, corpus)
+        print(f"{label:<10} {len(corpus) / elapsed:>13,.0f} {accuracy:>9.1%}")
+
+    short = [(language, text[:3] if language in UNSPACED else text.split()[0]) for language, text in corpus[:500]]
+    elapsed, _, languages = run(LanguageIdentifier(LRUCache(ttl=0)), short)
+    print(f"\nsingle words: {len(short) / elapsed:,.0f}/s, {dict(languages.most_common())}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,60 @@
+"""
+ContextGuard - Extractive summarizer benchmark
+Times the index-based summarizer on synthetic documents of increasing size.
+
+Usage: python benchmarks/bench_summarizer.py [--sizes 1000 10000 100000]
+"""
+
+import os
+import sys
+import time
+import random
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from backend.ai.summarizer import ExtractiveSummarizer, TermSentenceMatrix, get_stop_words
+
+VOCABULARY = [f"term{i}" for i in range(5000)]
+FILLER = ['the', 'a', 'of', 'and', 'to', 'in', 'is', 'that', 'for', 'with']
+
+
+def make_sentences(count: int, seed: int = 42) -> list:
+    rng = random.Random(seed)
+    sentences = []
+    for _ in range(count):
+        words = [rng.choice(VOCABULARY) if rng.random() < 0.6 else rng.choice(FILLER)
+                 for _ in range(rng.randint(8, 24))]
+        sentences.append(' '.join(words).capitalize() + '.')
+    return sentences
+
+
+def timed(func, *args):
+    start = time.perf_counter()
+    func(*args)
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 10000, 100000])
+    args = parser.parse_args()
+
+    summarizer = ExtractiveSummarizer()
+    stop_words = get_stop_words()
+
+    print(f"{'sentences':>10} {'matrix':>10} {'tfidf':>10} {'textrank':>10} {'end-to-end':>11}")
+    for size in args.sizes:
+        sentences = make_sentences(size)
+        text = ' '.join(sentences)
+
+        matrix_time = timed(TermSentenceMatrix, sentences, stop_words)
+        tfidf_time = timed(summarizer.select, sentences, 5, 'tfidf')
+        textrank_time = timed(summarizer.select, sentences, 5, 'textrank')
+        total_time = timed(summarizer.summarize, text, 'long')
+
+        print(f"{size:>10} {matrix_time:>9.3f}s {tfidf_time:>9.3f}s {textrank_time:>9.3f}s {total_time:>10.3f}s")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,10 @@
+"""
+ContextGuard - Gunicorn configuration
+Loaded automatically by gunicorn from the working directory
+"""
+
+
+def child_exit(server, worker):
+    """Drop a dead worker's live metrics when PROMETHEUS_MULTIPROC_DIR is in use"""
+    from backend.metrics import mark_process_dead
+    mark_process_dead(worker.pid)
@@ -0,0 +1,68 @@
+"""
+ContextGuard - Analytics ingestion tests
+"""
+
+import time
+import threading
+from datetime import datetime
+
+from backend.analytics_ingest import DROP_NEW, DROP_OLDEST, AnalyticsIngestor
+from backend.analytics_store import MemoryStore, UsageEvent
+
+
+class GatedStore(MemoryStore):
+    """Holds every append until `gate` is set, so the queue fills up"""
+
+    def __init__(self):
+        super().__init__()
+        self.gate = threading.Event()
+
+    def append(self, events):
+        self.gate.wait()
+        super().append(events)
+
+
+def event(user_id='alice'):
+    return UsageEvent(user_id, 'summarize', 10, datetime(2024, 3, 10, 12, 0))
+
+
+def test_counters_are_exact_under_concurrent_submits():
+    store = GatedStore()
+    ingestor = AnalyticsIngestor(store, max_queue=50, batch_size=10, flush_interval=0.01, policy=DROP_NEW)
+    threads, per_thread = 16, 500
+
+    def submit_many():
+        for _ in range(per_thread):
+            ingestor.submit(event())
+
+    workers = [threading.Thread(target=submit_many) for _ in range(threads)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    store.gate.set()
+    assert ingestor.flush()
+
+    stats = ingestor.stats()
+    assert stats['enqueued'] + stats['dropped'] == threads * per_thread
+    assert stats['written'] == stats['enqueued']
+    assert store.get_user('alice')['total_actions'] == stats['written']
+
+
+def test_drop_oldest_counts_evicted_events():
+    store = GatedStore()
+    ingestor = AnalyticsIngestor(store, max_queue=2, batch_size=1, flush_interval=0.01, policy=DROP_OLDEST)
+
+    # The writer takes the first event and waits on the store; the queue then holds two
+    assert ingestor.submit(event('first'))
+    while ingestor.stats()['queued']:
+        time.sleep(0.001)
+    for user_id in ('a', 'b', 'c', 'd'):
+        assert ingestor.submit(event(user_id))
+    store.gate.set()
+    assert ingestor.flush()
+
+    stats = ingestor.stats()
+    assert stats['enqueued'] == 5
+    assert stats['dropped'] == 2
+    assert {user_id for user_id in ('first', 'a', 'b', 'c', 'd') if store.get_user(user_id)} == {'first', 'c', 'd'}
@@ -0,0 +1,104 @@
+"""
+ContextGuard - Analytics store tests
+"""
+
+from datetime import date, datetime, timedelta
+
+import pytest
+
+from backend.analytics_store import (AnalyticsStore, MemoryStore, SQLiteStore, UsageEvent,
+                                     advance_streak)
+
+DAY = datetime(2024, 3, 10, 12, 0)
+
+
+def event(user_id, days=0, action='summarize', words=10):
+    return UsageEvent(user_id, action, words, DAY + timedelta(days=days))
+
+
+@pytest.fixture(params=['memory', 'sqlite'])
+def store(request, tmp_path):
+    if request.param == 'memory':
+        return MemoryStore()
+    return SQLiteStore(str(tmp_path / 'analytics.db'))
+
+
+def test_interface_is_abstract():
+    with pytest.raises(TypeError):
+        AnalyticsStore()
+
+
+def test_user_rollup(store):
+    store.append([event('alice', words=5), event('alice', action='rewrite', words=7),
+                  event('alice', days=1, words=3)])
+
+    user = store.get_user('alice')
+    assert user['total_actions'] == 3
+    assert user['total_words'] == 15
+    assert user['actions_by_type'] == {'summarize': 2, 'rewrite': 1}
+    assert user['first_use'] == DAY
+    assert user['last_use'] == DAY + timedelta(days=1)
+    assert user['last_active_day'] == (DAY + timedelta(days=1)).date()
+    assert store.get_user('nobody') is None
+
+
+def test_daily_counts_and_active_users(store):
+    store.append([event('alice'), event('alice'), event('alice', days=2), event('bob', days=2)])
+
+    assert store.get_daily_counts('alice', DAY.date()) == {DAY.date(): 2,
+                                                           DAY.date() + timedelta(days=2): 1}
+    assert store.get_daily_counts('alice', DAY.date() + timedelta(days=1)) == {
+        DAY.date() + timedelta(days=2): 1}
+    assert store.count_active_users(DAY.date()) == 2
+    assert store.count_active_users(DAY.date() + timedelta(days=3)) == 0
+
+
+def test_top_users(store):
+    store.append([event('carol')] * 3 + [event('alice')] * 2 + [event('bob')] * 2
+                 + [event('dave', days=5)])
+
+    top = store.get_top_users(3)
+    assert [u['user_id'] for u in top] == ['carol', 'alice', 'bob']
+    assert top[0] == {'user_id': 'carol', 'total_actions': 3, 'total_words': 30}
+    assert [u['user_id'] for u in store.get_top_users(2, offset=2)] == ['bob', 'dave']
+
+    # A later event moves a user up
+    store.append([event('dave', days=5)] * 3)
+    assert store.get_top_users(1)[0] == {'user_id': 'dave', 'total_actions': 4, 'total_words': 40}
+
+    recent = store.get_top_users(10, since=(DAY + timedelta(days=5)).date())
+    assert recent == [{'user_id': 'dave', 'total_actions': 4, 'total_words': 40}]
+
+
+def test_streak_is_incremental(store):
+    store.append([event('alice', days=0), event('alice', days=1), event('alice', days=1)])
+    assert store.get_user('alice')['streak_days'] == 2
+
+    store.append([event('alice', days=2)])
+    assert store.get_user('alice')['streak_days'] == 3
+
+    # A gap restarts the run
+    store.append([event('alice', days=5)])
+    assert store.get_user('alice')['streak_days'] == 1
+
+
+def test_late_event_joins_runs(store):
+    store.append([event('alice', days=0), event('alice', days=2), event('alice', days=3)])
+    assert store.get_user('alice')['streak_days'] == 2
+
+    # The missing day arrives late and connects the earlier day to the current run
+    store.append([event('alice', days=1)])
+    user = store.get_user('alice')
+    assert user['streak_days'] == 4
+    assert user['last_active_day'] == (DAY + timedelta(days=3)).date()
+
+
+def test_advance_streak():
+    active = {10, 11}
+    assert advance_streak(None, 0, 10, active.__contains__) == (10, 1)
+    assert advance_streak(10, 1, 11, active.__contains__) == (11, 2)
+    assert advance_streak(11, 2, 13, active.__contains__) == (13, 1)
+    # Day 12 closes the gap between 10-11 and 13
+    assert advance_streak(13, 1, 12, active.__contains__) == (13, 4)
+    # Days inside the current run change nothing
+    assert advance_streak(13, 4, 11, active.__contains__) == (13, 4)
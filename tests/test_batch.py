@@ -0,0 +1,46 @@
+"""
+ContextGuard - Batch executor tests
+"""
+
+import asyncio
+
+from backend.ai.batch import BatchExecutor
+
+
+class FakeProcessor:
+    def __init__(self):
+        self.calls = []
+
+    async def summarize(self, text, options=None):
+        self.calls.append((text, options))
+        return {'success': True, 'result': text[:10], 'method': 'gemini'}
+
+
+def test_null_options_are_accepted():
+    processor = FakeProcessor()
+    executor = BatchExecutor(processor)
+    jobs = [{'action': 'summarize', 'text': 'Some text.', 'options': None},
+            {'action': 'summarize', 'text': 'Some text.'}]
+
+    assert executor.validate(jobs[0]) == ''
+    results = asyncio.run(executor.run(jobs))
+    assert all(result['success'] for result in results)
+    # Both jobs normalize to the same options, so they run once
+    assert len(processor.calls) == 1
+
+
+def test_invalid_options_are_rejected():
+    executor = BatchExecutor(FakeProcessor())
+    assert executor.validate({'action': 'summarize', 'text': 'Some text.', 'options': [1]}) == \
+        'Options must be an object'
+
+
+def test_jobs_differing_only_in_budget_run_once():
+    processor = FakeProcessor()
+    executor = BatchExecutor(processor)
+    jobs = [{'action': 'summarize', 'text': 'Some text.', 'options': {'latencyBudgetMs': 500}},
+            {'action': 'summarize', 'text': 'Some text.', 'options': {'latencyBudgetMs': 2000}}]
+
+    results = asyncio.run(executor.run(jobs))
+    assert results[0] == results[1]
+    assert len(processor.calls) == 1
@@ -0,0 +1,60 @@
+"""
+ContextGuard - Incremental proofreading tests
+"""
+
+import asyncio
+
+import pytest
+
+from backend.ai.incremental import IncrementalProofreader, apply_edits
+
+
+class FakeProcessor:
+    def __init__(self):
+        self.calls = 0
+
+    async def proofread(self, text, options=None):
+        self.calls += 1
+        return {'success': True, 'result': text.replace('teh', 'the'), 'method': 'gemini'}
+
+
+def proofread(proofreader, **kwargs):
+    return asyncio.run(proofreader.proofread('owner', 'doc', **kwargs))
+
+
+def test_edits_recheck_only_changed_paragraphs():
+    processor = FakeProcessor()
+    proofreader = IncrementalProofreader(processor)
+
+    first = proofread(proofreader, text='teh first line\nsecond line')
+    assert processor.calls == 2
+    assert first['corrections'][0]['replacement'] == 'the'
+
+    second = proofread(proofreader, edits=[{'start': 15, 'end': 21, 'text': 'teh'}], version=first['version'])
+    assert processor.calls == 3
+    assert second['paragraphs'] == {'total': 2, 'rechecked': 1}
+    assert [c['paragraph'] for c in second['corrections']] == [0, 1]
+
+
+def test_text_over_limit_is_rejected():
+    proofreader = IncrementalProofreader(FakeProcessor(), max_chars=20)
+    with pytest.raises(ValueError, match='too long'):
+        proofread(proofreader, text='x' * 21)
+
+
+def test_edits_growing_document_over_limit_are_rejected():
+    proofreader = IncrementalProofreader(FakeProcessor(), max_chars=20)
+    state = proofread(proofreader, text='short text')
+    with pytest.raises(ValueError, match='too long'):
+        proofread(proofreader, edits=[{'start': 0, 'end': 0, 'text': 'y' * 11}], version=state['version'])
+
+    with pytest.raises(ValueError):
+        apply_edits('abc', [{'start': 3, 'text': 'd' * 5}] * 3, max_chars=10)
+
+
+def test_edit_count_is_capped():
+    proofreader = IncrementalProofreader(FakeProcessor(), max_edits=2)
+    state = proofread(proofreader, text='some text')
+    edits = [{'start': 0, 'end': 0, 'text': 'a'}] * 3
+    with pytest.raises(ValueError, match='Too many edits'):
+        proofread(proofreader, edits=edits, version=state['version'])
@@ -0,0 +1,109 @@
+"""
+ContextGuard - Preferences cache tests against a fake Firestore client
+"""
+
+import pytest
+
+from backend.ai.cache import LRUCache, ResultCache, SQLiteCache
+from backend.auth.preferences import DEFAULT_PREFERENCES, PreferencesCache
+
+
+class FakeSnapshot:
+    def __init__(self, data):
+        self.exists = data is not None
+        self._data = data
+
+    def to_dict(self):
+        return dict(self._data)
+
+
+class FakeDocument:
+    def __init__(self, db, user_id):
+        self.db = db
+        self.user_id = user_id
+
+    def get(self):
+        self.db.reads += 1
+        return FakeSnapshot(self.db.documents.get(self.user_id))
+
+    def set(self, data, merge=False):
+        self.db.writes += 1
+        if self.db.fail_writes:
+            raise ConnectionError('Firestore unavailable')
+        current = self.db.documents.get(self.user_id, {}) if merge else {}
+        self.db.documents[self.user_id] = {**current, **data}
+
+
+class FakeFirestore:
+    """The slice of the Firestore client the cache uses: collection('users').document(id)"""
+
+    def __init__(self, documents=None):
+        self.documents = documents or {}
+        self.reads = 0
+        self.writes = 0
+        self.fail_writes = False
+
+    def collection(self, name):
+        assert name == 'users'
+        return self
+
+    def document(self, user_id):
+        return FakeDocument(self, user_id)
+
+
+PREFS = {'tone': 'formal', 'readingLevel': 'advanced', 'targetLanguage': 'fr'}
+
+
+def make_cache(shared=None):
+    return PreferencesCache(ResultCache(LRUCache(max_entries=100, ttl=60), shared))
+
+
+def test_read_through():
+    db = FakeFirestore({'alice': {'preferences': PREFS}})
+    cache = make_cache()
+
+    assert cache.get(db, 'alice') == PREFS
+    assert cache.get(db, 'alice') == PREFS
+    assert db.reads == 1
+
+    # Users without a document get the defaults, also cached
+    assert cache.get(db, 'bob') == DEFAULT_PREFERENCES
+    assert cache.get(db, 'bob') == DEFAULT_PREFERENCES
+    assert db.reads == 2
+
+
+def test_write_through():
+    db = FakeFirestore({'alice': {'preferences': PREFS, 'email': 'a@example.com'}})
+    cache = make_cache()
+    cache.get(db, 'alice')
+
+    updated = {**PREFS, 'tone': 'casual'}
+    cache.save(db, 'alice', updated, {'updated_at': 1})
+    assert db.documents['alice'] == {'preferences': updated, 'email': 'a@example.com', 'updated_at': 1}
+    assert cache.get(db, 'alice') == updated
+    assert db.reads == 1
+
+
+def test_write_through_reaches_other_workers(tmp_path):
+    shared = SQLiteCache(str(tmp_path / 'prefs.db'), table='preferences_cache')
+    db = FakeFirestore({'alice': {'preferences': PREFS}})
+    first, second = make_cache(shared), make_cache(shared)
+
+    updated = {**PREFS, 'tone': 'casual'}
+    first.save(db, 'alice', updated)
+    assert second.get(db, 'alice') == updated
+    assert db.reads == 0
+
+
+def test_failed_write_invalidates():
+    db = FakeFirestore({'alice': {'preferences': PREFS}})
+    cache = make_cache()
+    cache.get(db, 'alice')
+
+    db.fail_writes = True
+    with pytest.raises(ConnectionError):
+        cache.save(db, 'alice', {**PREFS, 'tone': 'casual'})
+
+    # The cached value is dropped, so the next read goes back to Firestore
+    assert cache.get(db, 'alice') == PREFS
+    assert db.reads == 2
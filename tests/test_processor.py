@@ -0,0 +1,184 @@
+"""
+ContextGuard - AI processor tests against a local fake model
+"""
+
+import asyncio
+
+from backend.ai import resilience
+from backend.ai.cache import LRUCache, ResultCache
+from backend.ai.processor import AIProcessor
+from backend.ai.resilience import CircuitBreaker, ResilientClient
+
+TEXT = ("The river rose overnight after heavy rain. Residents near the bank were moved to "
+        "higher ground. Officials expect the water to fall by the weekend.")
+
+
+class FakeResponse:
+    def __init__(self, text):
+        self.text = text
+
+
+class FakeModel:
+    """Stands in for the Gemini model; fails with `error` while it is set"""
+
+    def __init__(self, reply='Model summary.', error=None, gate=None):
+        self.reply = reply
+        self.error = error
+        self.gate = gate
+        self.calls = 0
+
+    async def generate_content_async(self, prompt, stream=False):
+        self.calls += 1
+        if self.gate is not None:
+            await self.gate.wait()
+        if self.error is not None:
+            raise self.error
+        return FakeResponse(self.reply)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self):
+        return self.now
+
+
+def make_processor(model, retries=1, failure_threshold=2):
+    processor = AIProcessor(model=model)
+    processor.cache = ResultCache(LRUCache(max_entries=100))
+    processor.client = ResilientClient(timeout=5, retries=retries, backoff=0,
+                                       breaker=CircuitBreaker(failure_threshold=failure_threshold,
+                                                              reset_timeout=30))
+    return processor
+
+
+def test_retry_then_breaker_opens_then_half_open(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(resilience.time, 'monotonic', clock.monotonic)
+    model = FakeModel(error=ConnectionError('upstream down'))
+    processor = make_processor(model)
+
+    # One call: the first attempt fails, the retry fails too and the breaker opens
+    result = asyncio.run(processor.summarize(TEXT))
+    assert model.calls == 2
+    assert not result['success']
+    assert processor.client.breaker.state == CircuitBreaker.OPEN
+
+    # While open, requests go straight to the fallback without calling upstream
+    result = asyncio.run(processor.summarize(TEXT + ' Again.'))
+    assert model.calls == 2
+    assert result['method'] == 'extractive'
+    assert result['degraded']
+
+    # After the reset timeout one trial call goes through; its success closes the breaker
+    model.error = None
+    clock.now += 31
+    result = asyncio.run(processor.summarize(TEXT + ' Once more.'))
+    assert model.calls == 3
+    assert result['method'] == 'gemini'
+    assert processor.client.breaker.state == CircuitBreaker.CLOSED
+
+
+def test_half_open_failure_reopens_breaker(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(resilience.time, 'monotonic', clock.monotonic)
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=30)
+    breaker.record_failure()
+    assert not breaker.allow()
+
+    clock.now += 31
+    assert breaker.allow()
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    assert not breaker.allow()
+
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.OPEN
+    assert not breaker.allow()
+
+
+def test_degraded_fallback_is_not_cached(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(resilience.time, 'monotonic', clock.monotonic)
+    model = FakeModel(error=ConnectionError('upstream down'))
+    processor = make_processor(model, retries=0, failure_threshold=1)
+    asyncio.run(processor.summarize('Warm-up text that trips the breaker. It fails.'))
+
+    first = asyncio.run(processor.summarize(TEXT))
+    assert first['degraded']
+    second = asyncio.run(processor.summarize(TEXT))
+    assert not second.get('cached')
+
+    # Once the model is back, the same text gets (and caches) the model's answer
+    model.error = None
+    clock.now += 31
+    third = asyncio.run(processor.summarize(TEXT))
+    assert third['method'] == 'gemini'
+    assert asyncio.run(processor.summarize(TEXT))['cached']
+
+
+def test_concurrent_identical_requests_share_one_call():
+    async def scenario():
+        gate = asyncio.Event()
+        model = FakeModel(gate=gate)
+        processor = make_processor(model)
+        pending = [asyncio.ensure_future(processor.summarize(TEXT)) for _ in range(5)]
+        await asyncio.sleep(0)
+        gate.set()
+        return model, processor, await asyncio.gather(*pending)
+
+    model, processor, results = asyncio.run(scenario())
+    assert model.calls == 1
+    assert processor.flights.coalesced == 4
+    assert all(result['result'] == 'Model summary.' for result in results)
+
+
+def test_repeat_request_hits_cache():
+    model = FakeModel()
+    processor = make_processor(model)
+
+    first = asyncio.run(processor.summarize(TEXT, {'length': 'short'}))
+    second = asyncio.run(processor.summarize(TEXT, {'length': 'short'}))
+    assert model.calls == 1
+    assert not first.get('cached')
+    assert second['cached']
+    assert second['result'] == first['result']
+
+    # Different options are a different request
+    asyncio.run(processor.summarize(TEXT, {'length': 'long'}))
+    assert model.calls == 2
+
+
+def test_latency_budget_is_not_part_of_cache_key():
+    model = FakeModel()
+    processor = make_processor(model)
+
+    first = asyncio.run(processor.summarize(TEXT, {'length': 'short', 'latencyBudgetMs': 60000}))
+    second = asyncio.run(processor.summarize(TEXT, {'length': 'short', 'latencyBudgetMs': 30000}))
+    third = asyncio.run(processor.summarize(TEXT, {'length': 'short'}))
+    assert model.calls == 1
+    assert first['method'] == 'gemini'
+    assert second['cached'] and third['cached']
+
+
+def test_translate_reports_unavailable_while_breaker_is_open(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(resilience.time, 'monotonic', clock.monotonic)
+    model = FakeModel(error=ConnectionError('upstream down'))
+    processor = make_processor(model, retries=0, failure_threshold=1)
+    asyncio.run(processor.summarize(TEXT))
+
+    result = asyncio.run(processor.translate('Good morning', 'fr'))
+    assert not result['success']
+    assert 'temporarily unavailable' in result['result']
+    assert 'API key' not in result['result']
+
+
+def test_translate_without_model_asks_for_api_key(monkeypatch):
+    monkeypatch.delenv('GOOGLE_API_KEY', raising=False)
+    monkeypatch.delenv('GEMINI_API_KEY', raising=False)
+    processor = AIProcessor()
+
+    result = asyncio.run(processor.translate('Good morning', 'fr'))
+    assert not result['success']
+    assert 'requires API key' in result['result']
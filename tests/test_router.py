@@ -0,0 +1,58 @@
+"""
+ContextGuard - Backend router tests
+"""
+
+from backend.ai import router as router_module
+from backend.ai.router import Backend, BackendRouter
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self):
+        return self.now
+
+
+def make_router(monkeypatch, clock):
+    monkeypatch.setattr(router_module.time, 'monotonic', clock.monotonic)
+    router = BackendRouter(error_half_life=60)
+    router.register(Backend('gemini', ['summarize'], quality=2))
+    router.register(Backend('heuristic', ['summarize'], quality=0))
+    return router
+
+
+def test_failing_backend_is_skipped(monkeypatch):
+    router = make_router(monkeypatch, FakeClock())
+    for _ in range(4):
+        router.record('gemini', 100, 1.0, ok=False)
+
+    assert router.backends['gemini'].error_rate > router.max_error_rate
+    assert router.select('summarize', 100).name == 'heuristic'
+
+
+def test_backend_recovers_after_failures(monkeypatch):
+    clock = FakeClock()
+    router = make_router(monkeypatch, clock)
+    for _ in range(4):
+        router.record('gemini', 100, 1.0, ok=False)
+    assert router.select('summarize', 100).name == 'heuristic'
+
+    # No further gemini observations: the error rate still decays below the threshold
+    clock.now += 30
+    assert router.select('summarize', 100).name == 'gemini'
+
+    # The probe succeeds and the rate keeps falling
+    rate = router.backends['gemini'].current_error_rate(60)
+    router.record('gemini', 100, 1.0, ok=True)
+    assert router.backends['gemini'].error_rate < rate
+    assert router.select('summarize', 100).name == 'gemini'
+
+
+def test_decay_disabled_keeps_error_rate(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(router_module.time, 'monotonic', clock.monotonic)
+    backend = Backend('gemini', ['summarize'], quality=2)
+    backend.error_rate = 0.6
+    clock.now += 3600
+    assert backend.current_error_rate(0) == 0.6
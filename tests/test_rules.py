@@ -0,0 +1,41 @@
+"""
+ContextGuard - Rewrite rule pack tests
+"""
+
+import json
+
+import pytest
+
+from backend.ai import rules
+from backend.ai.rules import get_engine, load_rule_packs
+
+
+@pytest.fixture
+def packs(monkeypatch):
+    monkeypatch.setattr(rules, 'TONE_RULES', {name: dict(pack) for name, pack in rules.TONE_RULES.items()})
+    yield rules.TONE_RULES
+    get_engine.cache_clear()
+
+
+@pytest.mark.parametrize('content', [
+    ['not', 'an', 'object'],
+    {'phrase': 1},
+    {'phrase': ['list']},
+    {'': 'empty phrase'},
+    '"just a string"',
+    '{broken json'
+])
+def test_malformed_pack_is_skipped(tmp_path, packs, content):
+    (tmp_path / 'tone-custom.json').write_text(content if isinstance(content, str) else json.dumps(content))
+    (tmp_path / 'tone-formal.json').write_text(json.dumps({'gonna': 'going to'}))
+
+    load_rule_packs(str(tmp_path))
+
+    assert 'custom' not in packs
+    assert get_engine('formal').apply("I'm gonna go") == 'I am going to go'
+
+
+def test_valid_pack_is_merged(tmp_path, packs):
+    (tmp_path / 'tone-pirate.json').write_text(json.dumps({'hello': 'ahoy'}))
+    load_rule_packs(str(tmp_path))
+    assert get_engine('pirate').apply('Hello there') == 'Ahoy there'
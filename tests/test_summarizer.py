@@ -0,0 +1,31 @@
+"""
+ContextGuard - Extractive summarizer tests
+"""
+
+import pytest
+
+from backend.ai.summarizer import ExtractiveSummarizer
+
+SENTENCES = [
+    'Cats are great pets.',
+    'Cats are great pets!',
+    'Dogs bark loudly at night.',
+    'cats are   great pets.',
+    'The weather today is mild.',
+    'Birds sing in spring.'
+]
+
+
+@pytest.mark.parametrize('method', ['tfidf', 'textrank'])
+def test_repeated_sentences_are_selected_once(method):
+    selected = ExtractiveSummarizer().select(SENTENCES, 3, method)
+
+    assert len(selected) == 3
+    assert selected == sorted(selected)
+    normalized = {' '.join(SENTENCES[i].lower().rstrip('.!').split()) for i in selected}
+    assert len(normalized) == 3
+
+
+def test_fewer_distinct_sentences_than_requested():
+    sentences = ['Same sentence here.'] * 4 + ['Another one entirely.']
+    assert ExtractiveSummarizer().select(sentences, 3) == [0, 4]